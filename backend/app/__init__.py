@@ -63,9 +63,19 @@ def create_app(config_name='default'):
     register_blueprints(app)
 
     # Request logging middleware
-    from app.middleware import request_logger
+    from app.middleware import request_logger, server_timing_middleware, query_guard
     request_logger.init_app(app)
 
+    # Per-request db/cache/ai/serialize breakdown (Server-Timing header)
+    server_timing_middleware.init_app(app)
+
+    # Query counts / repeated statements (QUERY_GUARD_ENABLED or X-Query-Guard in debug/tests)
+    query_guard.init_app(app)
+
+    # Buffered analytics ingestion (flushed in the background and at exit)
+    from app.services.analytics_service import analytics_service
+    analytics_service.init_app(app)
+
     from app.utils.errors import APIError
     from app.utils.responses import error_response
 
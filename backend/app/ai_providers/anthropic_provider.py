@@ -15,6 +15,7 @@ import httpx
 from typing import Dict, Any, Optional, List
 
 from app.utils.retry import retry_with_backoff
+from app.utils.server_timing import track
 
 logger = logging.getLogger(__name__)
 
@@ -81,7 +82,7 @@ class AnthropicProvider:
             payload["system"] = system
 
         try:
-            with httpx.Client(timeout=self.timeout) as client:
+            with httpx.Client(timeout=self.timeout) as client, track('ai'):
                 response = client.post(
                     self.base_url,
                     headers=headers,
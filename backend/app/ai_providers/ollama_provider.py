@@ -13,6 +13,8 @@ import logging
 import httpx
 from typing import Dict, Any, Optional, List
 
+from app.utils.server_timing import track
+
 logger = logging.getLogger(__name__)
 
 
@@ -57,7 +59,7 @@ class OllamaProvider:
             if system:
                 payload["system"] = system
 
-            with httpx.Client(timeout=self.timeout) as client:
+            with httpx.Client(timeout=self.timeout) as client, track('ai'):
                 response = client.post(
                     f"{self.base_url}/api/generate",
                     json=payload
@@ -20,9 +20,24 @@ from .constants import (
     # Limits
     ACTION_LIMITS,
     PLAN_LIMITS,
+    PLAN_STEP_TIMEOUTS,
     OTHER_LIMITS,
     # Cache
     CACHE_TTL,
+    CACHE_L1,
+    CACHE_L1_TTL,
+    CACHE_MEMORY_FALLBACK,
+    CURATION_POOL,
+    CURATION_IMPRESSIONS,
+    CACHE_REDIS,
+    CACHE_SINGLE_FLIGHT,
+    # Analytics
+    ANALYTICS_BUFFER,
+    REQUEST_LOG_BUFFER,
+    LATENCY_HISTOGRAMS,
+    LOG_PARTITIONS,
+    SERVER_TIMING,
+    QUERY_GUARD,
     # Difficulty
     DIFFICULTY,
     # Content
@@ -46,8 +61,22 @@ __all__ = [
     'AI_DEFAULTS',
     'ACTION_LIMITS',
     'PLAN_LIMITS',
+    'PLAN_STEP_TIMEOUTS',
     'OTHER_LIMITS',
     'CACHE_TTL',
+    'CACHE_L1',
+    'CACHE_L1_TTL',
+    'CACHE_MEMORY_FALLBACK',
+    'CURATION_POOL',
+    'CURATION_IMPRESSIONS',
+    'CACHE_REDIS',
+    'CACHE_SINGLE_FLIGHT',
+    'ANALYTICS_BUFFER',
+    'REQUEST_LOG_BUFFER',
+    'LATENCY_HISTOGRAMS',
+    'LOG_PARTITIONS',
+    'SERVER_TIMING',
+    'QUERY_GUARD',
     'DIFFICULTY',
     'CONTENT_FILTERS',
     'SEED_CREATORS',
@@ -96,6 +96,14 @@ PLAN_LIMITS: Dict[str, int] = {
     'max_per_page': 100,
 }
 
+# Per-step deadline (seconds) when assembling a plan v2; a step that misses
+# its deadline is returned empty instead of failing the whole plan
+PLAN_STEP_TIMEOUTS: Dict[str, float] = {
+    'clear': 2.0,
+    'watch': 3.0,
+    'reinforce': 1.0,
+}
+
 # =============================================================================
 # LIMITS - Other
 # =============================================================================
@@ -117,6 +125,130 @@ CACHE_TTL: Dict[str, int] = {
     'rate_limit': 60,                 # 1 minute
 }
 
+# In-process L1 cache in front of Redis (per worker).
+# TTLs are intentionally shorter than the Redis tier: L1 is not invalidated
+# across workers, so its TTL bounds how stale another worker can be.
+CACHE_L1: Dict[str, int] = {
+    'max_entries': 2048,
+}
+
+CACHE_L1_TTL: Dict[str, int] = {
+    'settings': 60,                   # 1 minute
+    'categories': 60,                 # 1 minute
+    'user_cats': 30,                  # 30 seconds
+    'guided_plan': 5 * 60,            # 5 minutes
+}
+
+# Redis client: connection pool + circuit breaker
+CACHE_REDIS: Dict[str, float] = {
+    'max_connections': 50,
+    'socket_timeout': 0.5,            # seconds (connect and read)
+    'retries': 2,                     # retries per command on connection errors
+    'failure_threshold': 3,           # consecutive errors before opening the circuit
+    'reset_timeout': 15,              # seconds before a half-open probe
+    'max_pending_invalidations': 10000,  # keys remembered while Redis is down (then whole prefixes)
+}
+
+# Single-flight (dogpile) protection for cache misses
+CACHE_SINGLE_FLIGHT: Dict[str, float] = {
+    'lock_ttl': 60,                   # seconds; must exceed the slowest generation
+    'wait_timeout': 30,               # seconds a waiter blocks before computing itself
+    'poll_interval': 0.05,            # seconds between cache polls across workers
+}
+
+# In-memory fallback used while Redis is unavailable (per worker)
+CACHE_MEMORY_FALLBACK: Dict[str, int] = {
+    'max_entries': 10000,
+    'max_bytes': 64 * 1024 * 1024,    # 64 MB of JSON payload
+    'sweep_interval': 60,             # seconds between expiry sweeps
+}
+
+# Per-worker curation pool (top candidates per category + per-user exclusions)
+CURATION_POOL: Dict[str, int] = {
+    'size': 500,                      # candidates kept per category
+    'refresh_interval': 5 * 60,       # seconds before a category is reloaded
+    'exclusion_ttl': 60,              # seconds a user's blocked/watched sets are reused
+    'max_users': 5000,                # users whose exclusions are kept per worker
+}
+
+# Impression log: videos shown to a user are skipped by curation for a while
+CURATION_IMPRESSIONS: Dict[str, int] = {
+    'window_days': 3,                 # "shown recently" window
+    'max_per_user': 500,              # newest impressions kept in Redis per user
+    'reinforce_window_days': 7,       # Reinforce step avoids favorites shown this recently
+    'prune_batch_size': 10000,        # Rows per DELETE when pruning impressions past both windows
+}
+
+# =============================================================================
+# BUFFERED WRITES - Analytics events and request logs
+# =============================================================================
+
+ANALYTICS_BUFFER: Dict[str, float] = {
+    'max_batch': 500,                 # Events per multi-row INSERT
+    'flush_interval': 1.0,            # Seconds before a partial batch is flushed
+    'max_queue': 10000,               # Pending events per worker; extra events are dropped
+}
+
+REQUEST_LOG_BUFFER: Dict[str, float] = {
+    'max_batch': 200,                 # request_logs rows per multi-row INSERT
+    'flush_interval': 0.5,            # Seconds before a partial batch is flushed
+    'max_queue': 5000,                # Pending rows per worker; extra rows are dropped
+}
+
+# =============================================================================
+# PARTITIONING - Time-partitioned log tables (see app.tasks.partition_tasks)
+# =============================================================================
+
+# interval_days: partition width (7 = Monday-aligned weeks)
+# premake_days: partitions are created this far ahead
+# retention_days: partitions ending before now - retention are removed (0 = keep forever)
+# archive: 1 = DETACH expired partitions (kept as standalone tables), 0 = DROP them
+LOG_PARTITIONS: Dict[str, Dict[str, int]] = {
+    'request_logs': {
+        'interval_days': 1,
+        'premake_days': 7,
+        'retention_days': 30,
+        'archive': 0,
+    },
+    'analytics_events': {
+        'interval_days': 7,
+        'premake_days': 28,
+        # Funnel rollups look up each user's earlier events; keep raw history
+        # unless metrics_daily already covers everything you need
+        'retention_days': 0,
+        'archive': 1,
+    },
+}
+
+# =============================================================================
+# LATENCY - Streaming per-endpoint histograms (merged through Redis)
+# =============================================================================
+
+LATENCY_HISTOGRAMS: Dict[str, int] = {
+    'flush_interval': 60,             # Seconds between pushes of a worker's histograms to Redis
+    'window_minutes': 60,             # Default window for p50/p95/p99
+    'retention_minutes': 180,         # Per-minute Redis hashes expire after this
+}
+
+# =============================================================================
+# SERVER TIMING - Per-request db/cache/ai/serialize breakdown
+# =============================================================================
+
+SERVER_TIMING: Dict[str, float] = {
+    'sample_rate': 0.01,              # Share of requests logged to the slow-request log with their queries
+    'max_queries': 100,               # Statements kept per sampled request
+    'statement_chars': 500,           # Each statement is truncated to this length
+}
+
+# =============================================================================
+# QUERY GUARD - Per-request SQL statement counting (see app.middleware.query_guard)
+# =============================================================================
+
+QUERY_GUARD: Dict[str, int] = {
+    'repeat_threshold': 5,            # Same statement this many times in one request is flagged (N+1)
+    'report_limit': 10,               # Repeated statements kept per route in stats/logs
+}
+
 # =============================================================================
 # DIFFICULTY (Flow State)
 # =============================================================================
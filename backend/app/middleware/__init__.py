@@ -1,5 +1,7 @@
 """Middleware package."""
 
 from .request_logger import request_logger
+from .server_timing import server_timing_middleware
+from .query_guard import query_guard
 
-__all__ = ['request_logger']
+__all__ = ['request_logger', 'server_timing_middleware', 'query_guard']
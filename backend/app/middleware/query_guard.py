@@ -0,0 +1,132 @@
+"""
+Query Guard Middleware - Count SQL statements per request and flag N+1 patterns.
+
+When active for a request:
+- adds an X-Query-Count header
+- logs a warning when one statement runs QUERY_GUARD['repeat_threshold']
+  times or more (same SQL text, any parameters)
+- aggregates per-route query counts and repeated statements (see stats())
+
+Active for every request with QUERY_GUARD_ENABLED=true; otherwise, in debug
+or testing apps, only for requests sending 'X-Query-Guard: 1'.
+"""
+
+import os
+import threading
+import logging
+from typing import Any, Dict, Tuple
+
+from flask import request, g
+
+from app.config.constants import QUERY_GUARD
+from app.utils import query_counter
+
+logger = logging.getLogger(__name__)
+
+
+class QueryGuardMiddleware:
+    """Per-request query counting with per-route aggregates."""
+
+    def __init__(self, app=None):
+        self.app = app
+        self._always = False
+        self._allow_header = False
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Initialize middleware with Flask app."""
+        self._always = os.environ.get('QUERY_GUARD_ENABLED', 'false').lower() == 'true'
+        self._allow_header = self._always or app.debug or app.config.get('TESTING', False)
+        if not self._allow_header:
+            return
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    def _before_request(self):
+        """Start counting if the guard is on for this request."""
+        if self._always or request.headers.get('X-Query-Guard') == '1':
+            g.query_guard_token = query_counter.start()
+
+    def _after_request(self, response):
+        """Emit the count, flag repeated statements and update per-route stats."""
+        token = g.pop('query_guard_token', None)
+        if token is None:
+            return response
+
+        try:
+            counter = query_counter.stop(token)
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            repeated = counter.repeated(QUERY_GUARD['repeat_threshold'])
+
+            response.headers['X-Query-Count'] = str(counter.total)
+            if repeated:
+                logger.warning(
+                    f"[QUERY GUARD] {request.method} {route}: {counter.total} queries, "
+                    f"repeated: {counter.report(limit=QUERY_GUARD['report_limit'])['repeated']}"
+                )
+            self._observe(request.method, route, counter.total, repeated)
+        except Exception as e:
+            logger.error(f"Query guard failed: {e}")
+
+        return response
+
+    def _teardown_request(self, exc=None):
+        """Deactivate the counter if the request failed before after_request."""
+        token = g.pop('query_guard_token', None)
+        if token is not None:
+            query_counter.stop(token)
+
+    def _observe(self, method: str, route: str, total: int, repeated: Dict[str, int]) -> None:
+        """Add one request to the per-route aggregates."""
+        with self._lock:
+            stats = self._stats.get((method, route))
+            if stats is None:
+                stats = self._stats[(method, route)] = {
+                    'requests': 0, 'queries': 0, 'max_queries': 0, 'repeated': {},
+                }
+            stats['requests'] += 1
+            stats['queries'] += total
+            stats['max_queries'] = max(stats['max_queries'], total)
+            for sql, count in repeated.items():
+                stats['repeated'][sql] = max(stats['repeated'].get(sql, 0), count)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Per-route query counts for this worker since start.
+
+        Returns:
+            {'routes': [{method, route, requests, avg_queries, max_queries, repeated}]}
+            ordered by average query count, highest first
+        """
+        limit = QUERY_GUARD['report_limit']
+        with self._lock:
+            routes = [
+                {
+                    'method': method,
+                    'route': route,
+                    'requests': s['requests'],
+                    'avg_queries': round(s['queries'] / s['requests'], 1),
+                    'max_queries': s['max_queries'],
+                    'repeated': [
+                        {'sql': sql[:200], 'count': count}
+                        for sql, count in sorted(s['repeated'].items(), key=lambda kv: -kv[1])[:limit]
+                    ],
+                }
+                for (method, route), s in self._stats.items()
+            ]
+
+        routes.sort(key=lambda r: r['avg_queries'], reverse=True)
+        return {'routes': routes}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+# Singleton instance
+query_guard = QueryGuardMiddleware()
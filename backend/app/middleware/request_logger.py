@@ -8,12 +8,25 @@ Records:
 - latency_ms
 - user_id (if authenticated)
 - ip_address
+
+Rows are queued and bulk-inserted by a background BatchWriter, so logging
+adds no database work to the request and never touches the handler's
+session. Buffering is off under TESTING or with
+REQUEST_LOG_BUFFER_ENABLED=false (rows are then inserted immediately).
 """
 
+import os
 import time
 import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
 from flask import request, g
 
+from app.config.constants import REQUEST_LOG_BUFFER
+from app.services.latency_service import latency_service
+from app.utils.batch_writer import BatchWriter
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,6 +35,14 @@ class RequestLoggerMiddleware:
 
     def __init__(self, app=None):
         self.app = app
+        self._writer = BatchWriter(
+            'request_logs',
+            flush_fn=self._insert_logs,
+            max_batch=int(REQUEST_LOG_BUFFER['max_batch']),
+            flush_interval=REQUEST_LOG_BUFFER['flush_interval'],
+            max_queue=int(REQUEST_LOG_BUFFER['max_queue'])
+        )
+        self._buffered = False
         if app is not None:
             self.init_app(app)
 
@@ -30,12 +51,31 @@ class RequestLoggerMiddleware:
         app.before_request(self._before_request)
         app.after_request(self._after_request)
 
+        enabled = os.environ.get('REQUEST_LOG_BUFFER_ENABLED', 'true').lower() == 'true'
+        self._buffered = enabled and not app.config.get('TESTING', False)
+        if self._buffered:
+            self._writer.init_app(app)
+
+    @staticmethod
+    def _insert_logs(rows: List[Dict[str, Any]]) -> None:
+        """Write request log rows with one multi-row INSERT and commit."""
+        from sqlalchemy import insert
+        from app import db
+        from app.models import RequestLog
+
+        db.session.execute(insert(RequestLog).values(rows))
+        db.session.commit()
+
+    def get_buffer_stats(self) -> Dict[str, Any]:
+        """Buffer counters (pending, written, dropped, failed)."""
+        return self._writer.stats()
+
     def _before_request(self):
         """Record request start time."""
         g.request_start_time = time.time()
 
     def _after_request(self, response):
-        """Log request to database after response."""
+        """Queue a log row for the request after the response is built."""
         # Skip logging for static files and health checks
         if request.path.startswith('/static') or request.path == '/api/health':
             return response
@@ -43,10 +83,12 @@ class RequestLoggerMiddleware:
         try:
             # Calculate latency
             start_time = getattr(g, 'request_start_time', None)
-            if start_time:
-                latency_ms = int((time.time() - start_time) * 1000)
-            else:
-                latency_ms = 0
+            elapsed_ms = (time.time() - start_time) * 1000 if start_time else 0.0
+            latency_ms = int(elapsed_ms)
+
+            # Streaming per-route histogram (route template keeps cardinality bounded)
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            latency_service.observe(request.method, route, elapsed_ms)
 
             # Get user ID if authenticated
             user_id = getattr(g, 'current_user_id', None)
@@ -59,22 +101,20 @@ class RequestLoggerMiddleware:
             # Truncate endpoint to fit column
             endpoint = request.path[:100] if request.path else ''
 
-            # Import here to avoid circular imports
-            from app import db
-            from app.models import RequestLog
-
-            # Create log entry
-            log_entry = RequestLog(
-                endpoint=endpoint,
-                method=request.method,
-                status=response.status_code,
-                latency_ms=latency_ms,
-                user_id=user_id,
-                ip_address=ip_address[:45] if ip_address else None
-            )
-
-            db.session.add(log_entry)
-            db.session.commit()
+            row = {
+                'endpoint': endpoint,
+                'method': request.method,
+                'status': response.status_code,
+                'latency_ms': latency_ms,
+                'user_id': user_id,
+                'ip_address': ip_address[:45] if ip_address else None,
+                'created_at': datetime.now(timezone.utc),
+            }
+
+            if self._buffered:
+                self._writer.submit(row)
+            else:
+                self._insert_logs([row])
 
         except Exception as e:
             # Don't fail the request if logging fails
@@ -0,0 +1,180 @@
+"""
+Server Timing Middleware - Where each request spends its time.
+
+For every request:
+- times SQL via SQLAlchemy cursor events (including worker threads that
+  attach() to the request), plus whatever code reports through
+  app.utils.server_timing (cache, ai, serialize)
+- adds a Server-Timing header (visible in the browser devtools)
+- aggregates per-route component histograms in this worker (see stats())
+- for SERVER_TIMING['sample_rate'] of requests, writes one line with the
+  breakdown and the executed statements to the 'slow_requests' logger
+
+Disable with SERVER_TIMING_ENABLED=false.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+import logging
+from typing import Any, Dict, Tuple
+
+from flask import request, g
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config.constants import SERVER_TIMING
+from app.utils import server_timing
+from app.utils.histogram import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+slow_request_logger = logging.getLogger('slow_requests')
+
+_listeners_installed = False
+_listeners_lock = threading.Lock()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('server_timing_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('server_timing_start')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+
+    timings = server_timing.current()
+    if timings is not None:
+        timings.add('db', elapsed)
+        timings.add_query(statement, elapsed)
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; drop its start
+    # so the connection's next statement isn't timed against it
+    conn = context.connection
+    if conn is not None:
+        starts = conn.info.get('server_timing_start')
+        if starts:
+            starts.pop()
+
+
+def _install_sql_listeners() -> None:
+    """Listen on every Engine once per process."""
+    global _listeners_installed
+    with _listeners_lock:
+        if _listeners_installed:
+            return
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+        _listeners_installed = True
+
+
+class ServerTimingMiddleware:
+    """Per-request component timing, Server-Timing header and per-route stats."""
+
+    def __init__(self, app=None):
+        self.app = app
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], Dict[str, LatencyHistogram]] = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Initialize middleware with Flask app."""
+        if os.environ.get('SERVER_TIMING_ENABLED', 'true').lower() != 'true':
+            return
+
+        _install_sql_listeners()
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def _before_request(self):
+        """Start collecting timings for this request."""
+        g.server_timing_start = time.perf_counter()
+        g.server_timings = server_timing.RequestTimings(
+            sampled=random.random() < SERVER_TIMING['sample_rate'],
+            max_queries=int(SERVER_TIMING['max_queries']),
+            statement_chars=int(SERVER_TIMING['statement_chars'])
+        )
+
+    def _after_request(self, response):
+        """Emit the header, update per-route stats and log sampled requests."""
+        timings = g.get('server_timings')
+        start = g.get('server_timing_start')
+        if timings is None or start is None:
+            return response
+
+        try:
+            total = time.perf_counter() - start
+            response.headers['Server-Timing'] = timings.header(total)
+
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            self._observe(request.method, route, timings, total)
+
+            if timings.sampled:
+                slow_request_logger.info(json.dumps({
+                    'method': request.method,
+                    'route': route,
+                    'path': request.path,
+                    'status': response.status_code,
+                    'total_ms': round(total * 1000, 2),
+                    'components_ms': {k: round(v * 1000, 2) for k, v in timings.durations.items()},
+                    'calls': timings.counts,
+                    'queries': timings.queries,
+                }))
+        except Exception as e:
+            logger.error(f"Server timing failed: {e}")
+
+        return response
+
+    def _observe(self, method: str, route: str, timings: server_timing.RequestTimings, total: float) -> None:
+        """Add one request to the per-route component histograms."""
+        tracked = sum(timings.durations.values())
+        samples = dict(timings.durations)
+        samples['total'] = total
+        # Time not attributed to any component (Python, templating, waiting on locks...)
+        samples['app'] = max(total - tracked, 0.0)
+
+        with self._lock:
+            route_stats = self._stats.get((method, route))
+            if route_stats is None:
+                route_stats = self._stats[(method, route)] = {}
+            for component, seconds in samples.items():
+                hist = route_stats.get(component)
+                if hist is None:
+                    hist = route_stats[component] = LatencyHistogram()
+                hist.observe(seconds * 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Per-route component breakdown for this worker since start.
+
+        Returns:
+            {'routes': [{method, route, count, components: {name: histogram dict}}]}
+            ordered by total p95, slowest first
+        """
+        with self._lock:
+            routes = []
+            for (method, route), components in self._stats.items():
+                routes.append({
+                    'method': method,
+                    'route': route,
+                    'count': components['total'].count,
+                    'components': {name: hist.to_dict() for name, hist in components.items()},
+                })
+
+        routes.sort(key=lambda r: r['components']['total']['p95_ms'], reverse=True)
+        return {'routes': routes}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+# Singleton instance
+server_timing_middleware = ServerTimingMiddleware()
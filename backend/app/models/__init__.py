@@ -21,10 +21,14 @@ from .user_liked_video import UserLikedVideo
 from .analytics_event import AnalyticsEvent
 from .request_log import RequestLog
 from .metrics_daily import MetricsDaily
+from .user_creator_engagement import UserCreatorEngagement
+from .video_category_candidate import VideoCategoryCandidate
+from .video_impression import VideoImpression
 
 __all__ = ['User', 'Category', 'Plan', 'PlanStep', 'StepItem',
            'UserProgress', 'UserPreferences', 'RefreshToken', 'Action',
            'UserBehaviorStats', 'TiktokVideo', 'UserRecommendation', 'MessageTemplate',
            'PremiumWaitlist', 'UserCategory', 'AppSetting', 'AIRequestLog',
            'Challenge', 'BlockedCreator', 'UserLikedVideo', 'AnalyticsEvent', 'RequestLog',
-           'MetricsDaily']
+           'MetricsDaily', 'UserCreatorEngagement', 'VideoCategoryCandidate',
+           'VideoImpression']
@@ -1,5 +1,8 @@
 """
 Analytics Event model for tracking user events and actions.
+
+The table is range-partitioned by created_at (weekly); its database primary
+key is (id, created_at). See app.tasks.partition_tasks.
 """
 
 from app import db
@@ -1,5 +1,8 @@
 """
 Request Log model for tracking API request performance.
+
+The table is range-partitioned by created_at (daily); its database primary
+key is (id, created_at). See app.tasks.partition_tasks.
 """
 
 from app import db
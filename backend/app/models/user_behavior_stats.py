@@ -26,6 +26,9 @@ class UserBehaviorStats(db.Model):
     total_days_active = db.Column(db.Integer, default=0)
     avg_completion_rate = db.Column(db.Numeric(5, 4), default=0)
 
+    # Maintained by FavoritesService on add/remove (avoids COUNT(*) per request)
+    favorites_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+
     # Streak tracking (Psychology Stage 1)
     current_streak_days = db.Column(db.Integer, default=0)
     max_streak_days = db.Column(db.Integer, default=0)
@@ -0,0 +1,40 @@
+"""User/creator engagement aggregate used by toxic detection."""
+
+from app import db
+from sqlalchemy.sql import func
+
+
+class UserCreatorEngagement(db.Model):
+    """
+    Per-user, per-creator view and completion counters.
+
+    Materialized from user_progress -> plan_steps -> step_items:
+    - Incremented by ToxicDetectionService.record_step_progress when progress is written
+    - Rebuilt by app.tasks.engagement_tasks.backfill_user_creator_engagement
+    """
+    __tablename__ = 'user_creator_engagement'
+
+    id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    user_id = db.Column(db.BigInteger, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    creator_username = db.Column(db.String(256), nullable=False)
+    view_count = db.Column(db.Integer, default=0, nullable=False)
+    completion_count = db.Column(db.Integer, default=0, nullable=False)
+    last_seen_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    updated_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'creator_username', name='uq_user_creator_engagement_user_creator'),
+        db.Index('idx_user_creator_engagement_views', 'user_id', 'view_count'),
+    )
+
+    def to_dict(self):
+        """Convert to dict for API responses."""
+        return {
+            'creator_username': self.creator_username,
+            'view_count': self.view_count,
+            'completion_count': self.completion_count,
+            'last_seen_at': self.last_seen_at.isoformat() if self.last_seen_at else None,
+        }
+
+    def __repr__(self):
+        return f'<UserCreatorEngagement user={self.user_id} creator={self.creator_username}>'
@@ -25,7 +25,8 @@ class UserLikedVideo(db.Model):
 
     __table_args__ = (
         db.UniqueConstraint('user_id', 'video_id', name='uq_user_liked_videos_user_video'),
-        db.Index('idx_user_liked_videos_liked_at', 'user_id', 'liked_at'),
+        # Keyset pagination: ORDER BY liked_at DESC, id DESC
+        db.Index('idx_user_liked_videos_user_liked_id', 'user_id', liked_at.desc(), id.desc()),
     )
 
     def to_dict(self):
@@ -0,0 +1,31 @@
+"""Per-category curation candidate index."""
+
+from app import db
+
+
+class VideoCategoryCandidate(db.Model):
+    """
+    One row per (category, video) that passes the curation quality bar.
+
+    Built from TiktokVideo.category_scores / topics by
+    CurationService.refresh_curation_cache, so curation reads an ordered
+    (category_id, quality_score DESC) index instead of scanning tiktok_videos.
+    """
+    __tablename__ = 'video_category_candidates'
+
+    id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    category_id = db.Column(db.BigInteger, db.ForeignKey('categories.id', ondelete='CASCADE'), nullable=False)
+    video_id = db.Column(db.String(50), db.ForeignKey('tiktok_videos.video_id', ondelete='CASCADE'), nullable=False)
+    creator_username = db.Column(db.String(100), nullable=False)
+    quality_score = db.Column(db.Numeric(5, 4), nullable=False)
+    category_score = db.Column(db.Numeric(5, 4), nullable=False)
+    expires_at = db.Column(db.DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        db.UniqueConstraint('category_id', 'video_id', name='uq_video_category_candidates_category_video'),
+        db.Index('idx_video_category_candidates_rank', 'category_id', quality_score.desc()),
+        db.Index('idx_video_category_candidates_video', 'video_id'),
+    )
+
+    def __repr__(self):
+        return f'<VideoCategoryCandidate category={self.category_id} video={self.video_id}>'
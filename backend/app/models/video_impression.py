@@ -0,0 +1,29 @@
+"""Video impressions - which curated videos were shown to which user."""
+
+from app import db
+from sqlalchemy.sql import func
+
+
+class VideoImpression(db.Model):
+    """
+    Durable impression log for curation dedup.
+
+    The hot copy lives in a per-user Redis sorted set (see
+    CurationService.record_videos_shown); this table backs it when Redis is
+    unavailable or has been flushed. Rows past the longest lookback window
+    are deleted daily (see app.tasks.curation_tasks.prune_video_impressions).
+    """
+    __tablename__ = 'video_impressions'
+
+    id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    user_id = db.Column(db.BigInteger, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    video_id = db.Column(db.String(50), nullable=False)
+    shown_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        db.Index('idx_video_impressions_user_shown', 'user_id', 'shown_at'),
+        db.Index('idx_video_impressions_shown_at', 'shown_at'),
+    )
+
+    def __repr__(self):
+        return f'<VideoImpression user={self.user_id} video={self.video_id}>'
@@ -6,15 +6,25 @@ Endpoints:
 - GET /api/admin/metrics/challenge - Challenge funnel (D0->D7)
 - GET /api/admin/metrics/plans - Step completion and signals
 - GET /api/admin/metrics/system - API latency, errors, AI cost
+- GET /api/admin/metrics/latency - p50/p95/p99 per endpoint (streaming histograms)
+- GET /api/admin/metrics/timing - Per-route db/cache/ai/serialize breakdown (this worker)
+- GET /api/admin/metrics/queries - Per-route query counts and repeated statements (this worker)
+- GET /api/admin/metrics/cache - Cache hit ratio, latency, breaker state
+- GET /api/admin/metrics/prometheus - Prometheus text format (METRICS_TOKEN)
 """
 
+import os
+import hmac
 import logging
 from functools import wraps
-from flask import Blueprint, g
+from flask import Blueprint, g, request, Response
 
 from app import limiter, READ_LIMIT
 from app.models import User
 from app.services.metrics_service import metrics_service
+from app.services.cache_service import cache_service
+from app.services.latency_service import latency_service
+from app.middleware import server_timing_middleware, query_guard
 from app.utils.responses import success_response, error_response
 from app.utils.decorators import jwt_required
 
@@ -45,6 +55,26 @@ def admin_required(f):
     return decorated
 
 
+def metrics_token_required(f):
+    """
+    Decorator for scrape endpoints: requires 'Authorization: Bearer <METRICS_TOKEN>'.
+
+    Scrapers can't refresh 15-minute JWTs, so a static token from the
+    environment is used instead. Disabled (404) when METRICS_TOKEN is unset.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        expected = os.environ.get('METRICS_TOKEN')
+        if not expected:
+            return error_response('not_found', 'Resource not found', status_code=404)
+        auth_header = request.headers.get('Authorization', '')
+        token = auth_header[7:] if auth_header.startswith('Bearer ') else ''
+        if not hmac.compare_digest(token, expected):
+            return error_response('unauthorized', 'Invalid metrics token', status_code=401)
+        return f(*args, **kwargs)
+    return decorated
+
+
 @admin_metrics_bp.route('/overview', methods=['GET'])
 @jwt_required
 @admin_required
@@ -99,3 +129,74 @@ def get_system():
     except Exception as e:
         logger.exception("Error getting system metrics")
         return error_response('metrics_error', 'Failed to load system metrics', status_code=500)
+
+
+@admin_metrics_bp.route('/latency', methods=['GET'])
+@jwt_required
+@admin_required
+@limiter.limit(READ_LIMIT)
+def get_latency():
+    """Get request latency percentiles per endpoint (?minutes=60, up to the Redis retention)."""
+    try:
+        minutes = request.args.get('minutes', latency_service.window_minutes, type=int)
+        minutes = min(max(minutes, 1), latency_service.retention_minutes)
+        data = latency_service.get_summary(window_minutes=minutes)
+        if data is None:
+            return error_response('unavailable', 'Latency histograms require Redis', status_code=503)
+        return success_response(data)
+    except Exception as e:
+        logger.exception("Error getting latency metrics")
+        return error_response('metrics_error', 'Failed to load latency metrics', status_code=500)
+
+
+@admin_metrics_bp.route('/timing', methods=['GET'])
+@jwt_required
+@admin_required
+@limiter.limit(READ_LIMIT)
+def get_timing():
+    """Get per-route time breakdown for the worker serving this request."""
+    try:
+        data = server_timing_middleware.stats()
+        return success_response(data)
+    except Exception as e:
+        logger.exception("Error getting timing metrics")
+        return error_response('metrics_error', 'Failed to load timing metrics', status_code=500)
+
+
+@admin_metrics_bp.route('/queries', methods=['GET'])
+@jwt_required
+@admin_required
+@limiter.limit(READ_LIMIT)
+def get_queries():
+    """Get per-route query counts for the worker serving this request (needs QUERY_GUARD_ENABLED)."""
+    try:
+        data = query_guard.stats()
+        return success_response(data)
+    except Exception as e:
+        logger.exception("Error getting query metrics")
+        return error_response('metrics_error', 'Failed to load query metrics', status_code=500)
+
+
+@admin_metrics_bp.route('/cache', methods=['GET'])
+@jwt_required
+@admin_required
+@limiter.limit(READ_LIMIT)
+def get_cache():
+    """Get cache metrics for the worker serving this request."""
+    try:
+        data = cache_service.get_stats()
+        return success_response(data)
+    except Exception as e:
+        logger.exception("Error getting cache metrics")
+        return error_response('metrics_error', 'Failed to load cache metrics', status_code=500)
+
+
+@admin_metrics_bp.route('/prometheus', methods=['GET'])
+@metrics_token_required
+@limiter.exempt
+def get_prometheus():
+    """Expose metrics in Prometheus text format."""
+    return Response(
+        cache_service.render_prometheus(),
+        mimetype='text/plain; version=0.0.4'
+    )
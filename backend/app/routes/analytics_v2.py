@@ -3,6 +3,7 @@ Analytics V2 API - Track user events.
 
 Endpoints:
 - POST /api/v2/analytics/track - Track an analytics event
+- POST /api/v2/analytics/track/batch - Track several events at once
 """
 
 import logging
@@ -28,6 +29,9 @@ VALID_EVENT_TYPES = {
     'creator_followed',
 }
 
+# Max events accepted by /track/batch in one request
+MAX_BATCH_EVENTS = 50
+
 
 @analytics_v2_bp.route('/track', methods=['POST'])
 @limiter.limit(WRITE_LIMIT)  # 30/min
@@ -59,10 +63,11 @@ def track_event():
     {
         "success": true,
         "data": {
-            "tracked": true,
-            "event_id": 123
+            "tracked": true
         }
     }
+
+    Events are written in batches, so no event ID is returned.
     """
     try:
         user_id = g.current_user_id
@@ -82,16 +87,15 @@ def track_event():
         event_data = data.get('event_data', {})
 
         # Track the event
-        event = analytics_service.track(
+        tracked = analytics_service.track(
             user_id=user_id,
             event_type=event_type,
             event_data=event_data
         )
 
-        if event:
+        if tracked:
             return success_response({
-                'tracked': True,
-                'event_id': event.id
+                'tracked': True
             })
         else:
             return error_response('tracking_error', 'Failed to track event', status_code=500)
@@ -99,3 +103,76 @@ def track_event():
     except Exception as e:
         logger.error(f"Error tracking event: {e}")
         return error_response('tracking_error', str(e), status_code=500)
+
+
+@analytics_v2_bp.route('/track/batch', methods=['POST'])
+@limiter.limit(WRITE_LIMIT)  # 30/min
+@jwt_required
+def track_events_batch():
+    """
+    Track several analytics events from frontend in one request.
+
+    Request body:
+    {
+        "events": [
+            {"event_type": "detox_completed", "event_data": {"plan_id": "uuid"}},
+            {"event_type": "video_liked", "event_data": {"video_id": "123"}}
+        ]
+    }
+
+    At most MAX_BATCH_EVENTS events; event_type must be one of the types
+    accepted by /track. If any event is invalid, nothing is tracked and the
+    error details list each invalid index.
+
+    Returns:
+    {
+        "success": true,
+        "data": {
+            "tracked": 2
+        }
+    }
+    """
+    try:
+        user_id = g.current_user_id
+        data = request.get_json() or {}
+
+        events = data.get('events')
+        if not isinstance(events, list) or not events:
+            return error_response('validation_error', 'events must be a non-empty array', status_code=400)
+
+        if len(events) > MAX_BATCH_EVENTS:
+            return error_response(
+                'validation_error',
+                f'At most {MAX_BATCH_EVENTS} events per request',
+                status_code=400
+            )
+
+        invalid = []
+        for index, event in enumerate(events):
+            if not isinstance(event, dict):
+                invalid.append({'index': index, 'error': 'event must be an object'})
+            elif event.get('event_type') not in VALID_EVENT_TYPES:
+                invalid.append({'index': index, 'error': 'invalid event_type'})
+            elif not isinstance(event.get('event_data', {}), dict):
+                invalid.append({'index': index, 'error': 'event_data must be an object'})
+
+        if invalid:
+            return error_response(
+                'validation_error',
+                f"Invalid events. Valid types: {', '.join(sorted(VALID_EVENT_TYPES))}",
+                details=invalid,
+                status_code=400
+            )
+
+        tracked = analytics_service.track_events(user_id, events)
+
+        if tracked:
+            return success_response({
+                'tracked': tracked
+            })
+        else:
+            return error_response('tracking_error', 'Failed to track events', status_code=500)
+
+    except Exception as e:
+        logger.error(f"Error tracking event batch: {e}")
+        return error_response('tracking_error', str(e), status_code=500)
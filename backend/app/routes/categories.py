@@ -6,12 +6,17 @@ from app.services.cache_service import cache_service
 categories_bp = Blueprint('categories', __name__)
 
 
-def _get_base_categories(include_premium: bool, language: str) -> list:
+def _categories_cache_key(include_premium: bool, language: str) -> str:
+    return f"categories:active_{include_premium}_{language}"
+
+
+def _get_base_categories(include_premium: bool, language: str, cached: list = None) -> list:
     """Get categories from cache or DB."""
-    cache_key = f"active_{include_premium}_{language}"
+    cache_key = _categories_cache_key(include_premium, language)
 
-    # Try cache
-    cached = cache_service.get(f"categories:{cache_key}")
+    # Try cache (unless the caller already fetched it)
+    if cached is None:
+        cached = cache_service.get(cache_key)
     if cached:
         return cached
 
@@ -27,7 +32,7 @@ def _get_base_categories(include_premium: bool, language: str) -> list:
     result = [cat.to_dict(language) for cat in categories]
 
     # Cache result (1 hour)
-    cache_service.set(f"categories:{cache_key}", result, cache_service.TTL_CATEGORIES)
+    cache_service.set(cache_key, result, cache_service.TTL_CATEGORIES)
 
     return result
 
@@ -41,17 +46,25 @@ def get_categories():
     # Get user_id if authenticated
     user_id = getattr(g, 'current_user_id', None)
 
-    # Get base categories (cached)
-    base_categories = _get_base_categories(include_premium, language)
-
-    # If no user, return base categories directly
+    # If no user, return base categories directly (cached)
     if not user_id:
+        base_categories = _get_base_categories(include_premium, language)
         return success_response({'categories': base_categories})
 
-    # For authenticated users, add waitlist info
-    # OPTIMIZATION: Load all waitlist entries in ONE query instead of N+1
-    waitlist_entries = PremiumWaitlist.query.filter_by(user_id=user_id).all()
-    waitlist_set = {w.category_id for w in waitlist_entries}
+    # For authenticated users, fetch categories and waitlist in ONE cache round trip
+    categories_key = _categories_cache_key(include_premium, language)
+    waitlist_key = cache_service.waitlist_key(user_id)
+    cached = cache_service.get_many([categories_key, waitlist_key])
+
+    base_categories = _get_base_categories(include_premium, language, cached.get(categories_key))
+
+    waitlist_ids = cached.get(waitlist_key)
+    if waitlist_ids is None:
+        # OPTIMIZATION: Load all waitlist entries in ONE query instead of N+1
+        waitlist_entries = PremiumWaitlist.query.filter_by(user_id=user_id).all()
+        waitlist_ids = [w.category_id for w in waitlist_entries]
+        cache_service.set(waitlist_key, waitlist_ids, cache_service.TTL_WAITLIST)
+    waitlist_set = set(waitlist_ids)
 
     # Add waitlist info to premium categories
     result = []
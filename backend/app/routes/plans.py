@@ -61,63 +61,64 @@ def get_guided_plan():
         # Create cache key from categories
         cache_category = ','.join(sorted(category_names))
 
-        # Check cache first
-        cached_response = cache_service.get_guided_plan(user.id, cache_category)
-        if cached_response:
+        generated = []
+
+        def _generate():
+            """Generate plan via AI (cache miss)."""
+            generated.append(True)
+            try:
+                from app.ai_providers import get_ai_provider
+
+                provider = get_ai_provider()
+                logger.info(f"Generating plan with {provider.name} for user {user.id}")
+
+                if provider.is_available():
+                    plan_data = provider.generate_plan(
+                        categories=category_names,
+                        display_name=user.display_name or 'друг',
+                        streak=streak_current,
+                        language=user.language or 'ru',
+                        user_id=user.id
+                    )
+                    logger.info(f"AI plan generated successfully")
+                else:
+                    logger.warning(f"AI provider {provider.name} not available, using fallback")
+                    plan_data = _get_fallback_plan(category_names, user.display_name, streak_current)
+
+            except Exception as e:
+                logger.error(f"AI plan generation failed: {e}")
+                plan_data = _get_fallback_plan(category_names, user.display_name, streak_current)
+
+            # Build response
+            steps = plan_data.get('steps', [])
+            for step in steps:
+                step['completed'] = False
+
+            return {
+                'id': f"plan_{user.id}_{datetime.now().strftime('%Y%m%d')}",
+                'steps': steps,
+                'total_duration_minutes': sum(s.get('duration_minutes', 0) for s in steps),
+                'completion_rate': 0.0,
+                'motivation': plan_data.get('motivation', _get_default_motivation(user.display_name, streak_current)),
+                'streak': {
+                    'current': streak_current,
+                    'best': streak_best
+                },
+                'generated_at': datetime.utcnow().isoformat(),
+                'from_cache': False
+            }
+
+        # Cached for 24 hours; concurrent misses share one AI call
+        response = cache_service.get_or_create_guided_plan(user.id, cache_category, _generate)
+
+        if not generated:
             logger.info(f"Returning cached plan for user {user.id}")
             # Update streak info in cached response (might have changed)
-            cached_response['streak'] = {
+            response['streak'] = {
                 'current': streak_current,
                 'best': streak_best
             }
-            cached_response['from_cache'] = True
-            return success_response(cached_response)
-
-        # Generate plan via AI (cache miss)
-        try:
-            from app.ai_providers import get_ai_provider
-
-            provider = get_ai_provider()
-            logger.info(f"Generating plan with {provider.name} for user {user.id}")
-
-            if provider.is_available():
-                plan_data = provider.generate_plan(
-                    categories=category_names,
-                    display_name=user.display_name or 'друг',
-                    streak=streak_current,
-                    language=user.language or 'ru',
-                    user_id=user.id
-                )
-                logger.info(f"AI plan generated successfully")
-            else:
-                logger.warning(f"AI provider {provider.name} not available, using fallback")
-                plan_data = _get_fallback_plan(category_names, user.display_name, streak_current)
-
-        except Exception as e:
-            logger.error(f"AI plan generation failed: {e}")
-            plan_data = _get_fallback_plan(category_names, user.display_name, streak_current)
-
-        # Build response
-        steps = plan_data.get('steps', [])
-        for step in steps:
-            step['completed'] = False
-
-        response = {
-            'id': f"plan_{user.id}_{datetime.now().strftime('%Y%m%d')}",
-            'steps': steps,
-            'total_duration_minutes': sum(s.get('duration_minutes', 0) for s in steps),
-            'completion_rate': 0.0,
-            'motivation': plan_data.get('motivation', _get_default_motivation(user.display_name, streak_current)),
-            'streak': {
-                'current': streak_current,
-                'best': streak_best
-            },
-            'generated_at': datetime.utcnow().isoformat(),
-            'from_cache': False
-        }
-
-        # Save to cache for 24 hours
-        cache_service.set_guided_plan(user.id, cache_category, response)
+            response['from_cache'] = True
 
         return success_response(response)
 
@@ -7,6 +7,7 @@ Endpoints:
 - GET /api/v2/curated-videos - Get curated videos for Watch step
 - GET /api/v2/favorites - Get user's favorite videos
 - POST /api/v2/favorites - Add video to favorites
+- POST /api/v2/favorites/import - Add many videos to favorites
 - DELETE /api/v2/favorites - Remove video from favorites
 """
 
@@ -21,6 +22,7 @@ from app.services.favorites_service import favorites_service
 from app.services.plan_service_v2 import plan_service_v2
 from app.services.analytics_service import analytics_service
 from app.utils.responses import success_response, error_response
+from app.utils.errors import ValidationError
 from app.utils.decorators import jwt_required
 
 logger = logging.getLogger(__name__)
@@ -299,35 +301,45 @@ def get_curated_videos():
 @jwt_required
 def get_favorites():
     """
-    Get user's favorite videos.
+    Get user's favorite videos, most recent first (cursor-paginated).
 
     Query params:
     - limit: Max number to return (default 10, max 50)
+    - cursor: next_cursor from the previous page (optional)
 
     Returns:
     {
         "success": true,
         "data": {
             "favorites": [...],
-            "count": N
+            "count": N,
+            "total": N,
+            "next_cursor": "..." or null
         }
     }
     """
     try:
         user_id = g.current_user_id
         limit = request.args.get('limit', 10, type=int)
-        limit = min(limit, 50)  # Cap at 50
+        limit = max(1, min(limit, 50))  # Cap at 50
+        cursor = request.args.get('cursor')
 
-        favorites = favorites_service.get_favorites(
+        page = favorites_service.get_favorites_page(
             user_id=user_id,
-            limit=limit
+            limit=limit,
+            cursor=cursor
         )
 
         return success_response({
-            'favorites': favorites,
-            'count': len(favorites)
+            'favorites': page['favorites'],
+            'count': len(page['favorites']),
+            'total': page['total'],
+            'next_cursor': page['next_cursor']
         })
 
+    except ValidationError as e:
+        return error_response(e.code, e.message, status_code=e.status_code)
+
     except Exception as e:
         logger.error(f"Error getting favorites: {e}")
         return error_response('favorites_error', str(e), status_code=500)
@@ -370,6 +382,51 @@ def add_favorite():
         return error_response('favorite_error', str(e), status_code=500)
 
 
+@plans_v2_bp.route('/favorites/import', methods=['POST'])
+@limiter.limit(WRITE_LIMIT)
+@jwt_required
+def import_favorites():
+    """
+    Add many videos to favorites at once (e.g. existing TikTok likes).
+
+    Request body:
+    {
+        "video_ids": ["abc123", "def456", ...]   (max 1000)
+    }
+
+    Returns:
+    {
+        "success": true,
+        "data": {
+            "added": N,
+            "skipped": N,
+            "invalid": N
+        }
+    }
+    """
+    try:
+        user_id = g.current_user_id
+        data = request.get_json() or {}
+
+        video_ids = data.get('video_ids')
+        if not isinstance(video_ids, list) or not video_ids:
+            return error_response('validation_error', 'video_ids must be a non-empty list', status_code=400)
+
+        result = favorites_service.import_favorites(
+            user_id=user_id,
+            video_ids=video_ids
+        )
+
+        return success_response(result)
+
+    except ValidationError as e:
+        return error_response(e.code, e.message, status_code=e.status_code)
+
+    except Exception as e:
+        logger.error(f"Error importing favorites: {e}")
+        return error_response('favorite_error', str(e), status_code=500)
+
+
 @plans_v2_bp.route('/favorites', methods=['DELETE'])
 @limiter.limit(WRITE_LIMIT)
 @jwt_required
@@ -412,6 +469,9 @@ def get_random_favorite():
     """
     Get a random favorite video for Reinforce step.
 
+    Query params:
+    - exclude_shown_days: Prefer favorites not shown in this many days (optional)
+
     Returns:
     {
         "success": true,
@@ -422,8 +482,12 @@ def get_random_favorite():
     """
     try:
         user_id = g.current_user_id
+        exclude_shown_days = request.args.get('exclude_shown_days', type=int)
 
-        video = favorites_service.get_random_favorite(user_id=user_id)
+        video = favorites_service.get_random_favorite(
+            user_id=user_id,
+            exclude_shown_days=exclude_shown_days
+        )
 
         return success_response({
             'video': video
@@ -3,6 +3,7 @@ from app.models import PremiumWaitlist, Category, User
 from app import db
 from app.utils.responses import success_response, error_response
 from app.utils.decorators import jwt_required
+from app.services.cache_service import cache_service
 
 waitlist_bp = Blueprint('waitlist', __name__)
 
@@ -46,6 +47,7 @@ def join_waitlist():
     )
     db.session.add(waitlist_entry)
     db.session.commit()
+    cache_service.invalidate_user_waitlist(g.current_user_id)
 
     # Get position in waitlist
     position = PremiumWaitlist.query.filter_by(category_id=category_id).count()
@@ -73,6 +75,7 @@ def leave_waitlist():
     ).delete()
 
     db.session.commit()
+    cache_service.invalidate_user_waitlist(g.current_user_id)
 
     if deleted:
         return success_response({'message': 'Removed from waitlist'})
@@ -11,15 +11,24 @@ Events tracked:
 - action_completed: User completed an action
 - streak_milestone: User hit a streak milestone
 - onboarding_completed: User finished onboarding
+
+Events are buffered in-process and written with one multi-row INSERT per
+batch (see app.utils.batch_writer), so tracking never adds a database round
+trip to the request. Buffering is off under TESTING or with
+ANALYTICS_BUFFER_ENABLED=false, in which case each event is inserted
+immediately.
 """
 
-from datetime import date, datetime, timedelta
+import os
+from datetime import date, datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any
 from collections import defaultdict
 
 from app import db
+from app.config.constants import ANALYTICS_BUFFER
 from app.models import User, Plan, Action, UserProgress, UserBehaviorStats, UserRecommendation, AnalyticsEvent
-from sqlalchemy import func
+from app.utils.batch_writer import BatchWriter
+from sqlalchemy import func, insert
 import logging
 
 logger = logging.getLogger(__name__)
@@ -39,14 +48,40 @@ class AnalyticsService:
     EVENT_STREAK_MILESTONE = 'streak_milestone'
     EVENT_ONBOARDING_COMPLETED = 'onboarding_completed'
 
+    def __init__(self):
+        self._writer = BatchWriter(
+            'analytics',
+            flush_fn=self._insert_events,
+            max_batch=int(ANALYTICS_BUFFER['max_batch']),
+            flush_interval=ANALYTICS_BUFFER['flush_interval'],
+            max_queue=int(ANALYTICS_BUFFER['max_queue'])
+        )
+        self._buffered = False
+
+    def init_app(self, app) -> None:
+        """Enable buffered ingestion for app (skipped under TESTING)."""
+        enabled = os.environ.get('ANALYTICS_BUFFER_ENABLED', 'true').lower() == 'true'
+        self._buffered = enabled and not app.config.get('TESTING', False)
+        if self._buffered:
+            self._writer.init_app(app)
+
+    @staticmethod
+    def _insert_events(rows: List[Dict[str, Any]]) -> None:
+        """Write event rows with one multi-row INSERT and commit."""
+        db.session.execute(insert(AnalyticsEvent).values(rows))
+        db.session.commit()
+
     def track_event(
         self,
         event_type: str,
         user_id: Optional[int] = None,
         properties: Optional[Dict] = None
-    ) -> Optional[AnalyticsEvent]:
+    ) -> bool:
         """
-        Track an analytics event and save to database.
+        Track an analytics event.
+
+        The event is queued for a batched insert; without buffering it is
+        written immediately in its own statement.
 
         Args:
             event_type: Type of event (e.g., 'plan_viewed', 'detox_completed')
@@ -54,31 +89,34 @@ class AnalyticsService:
             properties: Optional event data as dict
 
         Returns:
-            Created AnalyticsEvent or None if error
+            True if the event was accepted, False if it was dropped or failed
         """
-        try:
-            event = AnalyticsEvent(
-                user_id=user_id,
-                event_type=event_type,
-                event_data=properties or {}
-            )
-            db.session.add(event)
-            db.session.commit()
+        row = {
+            'user_id': user_id,
+            'event_type': event_type,
+            'event_data': properties or {},
+            'created_at': datetime.now(timezone.utc),
+        }
+        logger.info(f"[ANALYTICS] {event_type}: user={user_id} props={properties}")
 
-            logger.info(f"[ANALYTICS] {event_type}: user={user_id} props={properties}")
-            return event
+        if self._buffered:
+            return self._writer.submit(row)
+
+        try:
+            self._insert_events([row])
+            return True
 
         except Exception as e:
             logger.error(f"[ANALYTICS] Failed to track {event_type}: {e}")
             db.session.rollback()
-            return None
+            return False
 
     def track(
         self,
         user_id: int,
         event_type: str,
         event_data: Optional[Dict] = None
-    ) -> Optional[AnalyticsEvent]:
+    ) -> bool:
         """
         Simplified track method for convenience.
 
@@ -88,10 +126,58 @@ class AnalyticsService:
             event_data: Optional event data
 
         Returns:
-            Created AnalyticsEvent or None if error
+            True if the event was accepted, False otherwise
         """
         return self.track_event(event_type, user_id, event_data)
 
+    def track_events(self, user_id: Optional[int], events: List[Dict[str, Any]]) -> int:
+        """
+        Track several events for one user.
+
+        Without buffering the whole list is written in one multi-row INSERT.
+
+        Args:
+            user_id: Optional user ID
+            events: Dicts with 'event_type' and optional 'event_data'
+
+        Returns:
+            Number of events accepted
+        """
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                'user_id': user_id,
+                'event_type': event['event_type'],
+                'event_data': event.get('event_data') or {},
+                'created_at': now,
+            }
+            for event in events
+        ]
+        if not rows:
+            return 0
+
+        logger.info(f"[ANALYTICS] batch of {len(rows)}: user={user_id}")
+
+        if self._buffered:
+            return sum(1 for row in rows if self._writer.submit(row))
+
+        try:
+            self._insert_events(rows)
+            return len(rows)
+
+        except Exception as e:
+            logger.error(f"[ANALYTICS] Failed to track batch of {len(rows)}: {e}")
+            db.session.rollback()
+            return 0
+
+    def flush(self) -> int:
+        """Write buffered events now (tasks and shutdown hooks)."""
+        return self._writer.flush()
+
+    def get_buffer_stats(self) -> Dict[str, Any]:
+        """Buffer counters (pending, written, dropped, failed)."""
+        return self._writer.stats()
+
     def get_dashboard_metrics(self) -> Dict[str, Any]:
         """Get high-level dashboard metrics."""
         today = date.today()
@@ -191,20 +277,26 @@ class AnalyticsService:
     def get_weekly_activity(self, user_id: int) -> List[Dict]:
         """Get daily activity for the past 7 days."""
         today = date.today()
-        result = []
+        week_start = today - timedelta(days=6)
+        completed_day = func.date(UserProgress.completed_at)
+
+        # One grouped query for the whole week
+        rows = db.session.query(
+            completed_day, func.count(UserProgress.id)
+        ).filter(
+            UserProgress.user_id == user_id,
+            completed_day >= week_start,
+            completed_day <= today
+        ).group_by(completed_day).all()
+        counts = {str(day): count for day, count in rows}
 
+        result = []
         for i in range(6, -1, -1):
             day = today - timedelta(days=i)
-
-            count = UserProgress.query.filter(
-                UserProgress.user_id == user_id,
-                func.date(UserProgress.completed_at) == day
-            ).count()
-
             result.append({
                 'date': str(day),
                 'dayName': day.strftime('%a'),
-                'actionsCompleted': count,
+                'actionsCompleted': counts.get(str(day), 0),
             })
 
         return result
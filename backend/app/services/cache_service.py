@@ -6,47 +6,503 @@ Provides caching for:
 - User categories (medium TTL)
 - Settings (long TTL)
 - Daily plans (short TTL)
+
+Hot prefixes (see CACHE_L1_TTL) are additionally kept in a small per-worker
+LRU (L1) in front of Redis, so repeated hits skip the network round trip and
+json.loads. Disable with CACHE_L1_ENABLED=false.
+
+Redis access goes through a circuit breaker: after repeated connection
+errors workers use the bounded memory fallback, then probe Redis again and
+return to the shared tier automatically once it recovers. Writes and
+invalidations Redis missed meanwhile are replayed as deletes on recovery.
+
+Values are serialized with app.utils.cache_codec (orjson/msgpack when
+available, zlib above a size threshold); legacy JSON entries stay readable.
 """
 
 import os
+import copy
 import json
+import time
 import logging
-from typing import Any, Optional, Callable
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Optional, Callable, Dict, List
 from functools import wraps
 
+from app.config.constants import (
+    CACHE_L1, CACHE_L1_TTL, CACHE_MEMORY_FALLBACK, CACHE_REDIS, CACHE_SINGLE_FLIGHT,
+)
+from app.utils.cache_codec import cache_codec
+from app.utils.histogram import LatencyHistogram
+from app.utils import server_timing
+
 logger = logging.getLogger(__name__)
 
-# Global Redis client (lazy initialized)
-_redis_client = None
-_redis_available = None
+class RedisCircuitBreaker:
+    """
+    Circuit breaker around the shared Redis client.
 
+    closed    - Redis is used normally; consecutive connection errors are counted
+    open      - after failure_threshold errors Redis is skipped (memory fallback)
+                for reset_timeout seconds
+    half_open - one caller probes Redis with PING; success closes the circuit,
+                failure re-opens it
 
-def _get_redis():
-    """Get Redis client (lazy init)."""
-    global _redis_client, _redis_available
+    The client uses a bounded connection pool with short socket timeouts and a
+    small number of retries, so a slow Redis can't stall request threads.
+    """
 
-    if _redis_available is False:
-        return None
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, settings: Dict[str, Any] = CACHE_REDIS):
+        self.failure_threshold = settings['failure_threshold']
+        self.reset_timeout = settings['reset_timeout']
+        self._settings = settings
+        self._client = None
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self._transitions: Dict[str, int] = {}
+        self._last_transition_at: Optional[float] = None
+
+    def _connect(self):
+        """Create the pooled client (no network I/O)."""
+        import redis
+        from redis.backoff import ExponentialBackoff
+        from redis.retry import Retry
+
+        redis_url = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+        pool = redis.ConnectionPool.from_url(
+            redis_url,
+            decode_responses=False,  # values are binary (see cache_codec)
+            max_connections=self._settings['max_connections'],
+            socket_timeout=self._settings['socket_timeout'],
+            socket_connect_timeout=self._settings['socket_timeout'],
+            health_check_interval=30,
+            retry=Retry(ExponentialBackoff(cap=0.5, base=0.05), self._settings['retries']),
+            retry_on_error=[redis.ConnectionError, redis.TimeoutError],
+        )
+        return redis.Redis(connection_pool=pool)
+
+    def _transition(self, state: str) -> None:
+        """Move to state (caller holds the lock)."""
+        if state == self._state:
+            return
+        name = f"{self._state}->{state}"
+        self._transitions[name] = self._transitions.get(name, 0) + 1
+        self._last_transition_at = time.time()
+        logger.warning(f"Redis circuit {name}")
+        self._state = state
+        if state == self.OPEN:
+            self._opened_at = time.monotonic()
+
+    def get_client(self):
+        """Return the Redis client, or None while the circuit is open."""
+        if self._state == self.CLOSED and self._client is not None:
+            return self._client
+
+        with self._lock:
+            if self._state == self.OPEN:
+                if self._probing or time.monotonic() - self._opened_at < self.reset_timeout:
+                    return None
+                self._transition(self.HALF_OPEN)
+            elif self._state == self.HALF_OPEN or self._probing:
+                # Another caller is already probing
+                return None
+            self._probing = True
 
-    if _redis_client is None:
         try:
-            import redis
-            redis_url = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
-            _redis_client = redis.from_url(redis_url, decode_responses=True)
-            # Test connection
-            _redis_client.ping()
-            _redis_available = True
-            logger.info("Redis cache connected successfully")
+            if self._client is None:
+                self._client = self._connect()
+            self._client.ping()
         except Exception as e:
+            with self._lock:
+                self._probing = False
+                self._failures = self.failure_threshold
+                self._transition(self.OPEN)
             logger.warning(f"Redis not available, using in-memory fallback: {e}")
-            _redis_available = False
             return None
 
-    return _redis_client
+        with self._lock:
+            self._probing = False
+            self._failures = 0
+            self._transition(self.CLOSED)
+        logger.info("Redis cache connected successfully")
+        return self._client
+
+    def record_failure(self, error: Exception) -> None:
+        """Count a failed Redis call; open the circuit on connection errors."""
+        import redis
+        if not isinstance(error, (redis.ConnectionError, redis.TimeoutError)):
+            return
+        with self._lock:
+            self._failures += 1
+            if self._state == self.CLOSED and self._failures >= self.failure_threshold:
+                self._transition(self.OPEN)
+
+    def record_success(self) -> None:
+        """Reset the consecutive failure counter."""
+        if self._failures:
+            self._failures = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Current state and transition counters."""
+        with self._lock:
+            return {
+                'state': self._state,
+                'consecutive_failures': self._failures,
+                'transitions': dict(self._transitions),
+                'last_transition_at': self._last_transition_at,
+            }
+
+
+# Process-wide breaker around the shared Redis client
+_breaker = RedisCircuitBreaker()
+
+
+def _get_redis():
+    """Get Redis client, or None while the circuit breaker is open."""
+    client = _breaker.get_client()
+    if client is not None and _pending_invalidations:
+        _replay_invalidations()
+    return client
+
+
+def _redis_ok() -> None:
+    _breaker.record_success()
+
+
+def _redis_failed(error: Exception) -> None:
+    _breaker.record_failure(error)
+
+
+# Per-key locks used to coalesce concurrent misses within this worker
+_flights: Dict[str, list] = {}
+_flights_lock = threading.Lock()
+
+# Compare-and-delete so a worker never releases a lock it no longer owns
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+@contextmanager
+def _local_flight(key: str, blocking: bool, timeout: float):
+    """
+    Hold the per-key in-process lock.
+
+    Yields True if the lock was acquired, False on timeout (or immediately
+    when blocking=False and another thread holds it).
+    """
+    with _flights_lock:
+        entry = _flights.get(key)
+        if entry is None:
+            entry = _flights[key] = [threading.Lock(), 0]
+        entry[1] += 1
+
+    lock = entry[0]
+    acquired = lock.acquire(blocking, timeout if blocking else -1)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            lock.release()
+        with _flights_lock:
+            entry[1] -= 1
+            if entry[1] == 0:
+                _flights.pop(key, None)
+
+
+class LocalLRUCache:
+    """
+    Bounded in-process LRU with per-entry TTL and per-prefix hit/miss counters.
+
+    Used both as the per-worker L1 tier and as the fallback store when Redis
+    is unavailable. Bounded by entry count and, optionally, by approximate
+    payload bytes (JSON size). Expired entries are dropped on read and by an
+    amortised sweep that runs from set() at most every sweep_interval seconds.
+
+    Thread-safe; one instance per worker process.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = CACHE_L1['max_entries'],
+        max_bytes: Optional[int] = None,
+        sweep_interval: int = 60
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._next_sweep = time.monotonic() + sweep_interval
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def prefix_of(key: str) -> str:
+        """Return the prefix part of a cache key ('guided_plan:1:x' -> 'guided_plan')."""
+        return key.split(':', 1)[0]
+
+    @staticmethod
+    def _sizeof(value: Any) -> int:
+        """Approximate payload size in bytes."""
+        try:
+            return len(json.dumps(value, default=str))
+        except (TypeError, ValueError):
+            return 0
+
+    def _count(self, prefix: str, field: str) -> None:
+        stats = self._stats.get(prefix)
+        if stats is None:
+            stats = self._stats[prefix] = {'hits': 0, 'misses': 0, 'evictions': 0}
+        stats[field] += 1
+
+    def _remove(self, key: str) -> bool:
+        """Remove key (caller holds the lock)."""
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry[2]
+        return True
+
+    def _sweep(self, now: float) -> None:
+        """Drop all expired entries (caller holds the lock)."""
+        expired = [k for k, entry in self._data.items() if entry[1] <= now]
+        for k in expired:
+            self._remove(k)
+        self._next_sweep = now + self.sweep_interval
 
+    def get(self, key: str) -> Optional[Any]:
+        """Return cached value or None (counts a hit or a miss)."""
+        prefix = self.prefix_of(key)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                if entry[1] > time.monotonic():
+                    self._data.move_to_end(key)
+                    self._count(prefix, 'hits')
+                    return entry[0]
+                self._remove(key)
+            self._count(prefix, 'misses')
+        return None
+
+    def set(self, key: str, value: Any, ttl: int) -> bool:
+        """
+        Store value for ttl seconds, evicting least recently used entries.
+
+        Returns:
+            False if the value alone exceeds max_bytes and was not stored
+        """
+        nbytes = self._sizeof(value) if self.max_bytes else 0
+        if self.max_bytes and nbytes > self.max_bytes:
+            return False
+
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._next_sweep:
+                self._sweep(now)
+
+            self._remove(key)
+            self._data[key] = (value, now + ttl, nbytes)
+            self._bytes += nbytes
+
+            while len(self._data) > self.max_entries or (
+                self.max_bytes and self._bytes > self.max_bytes
+            ):
+                evicted_key, entry = self._data.popitem(last=False)
+                self._bytes -= entry[2]
+                self._count(self.prefix_of(evicted_key), 'evictions')
+        return True
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._remove(key)
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Delete all keys starting with prefix."""
+        with self._lock:
+            to_delete = [k for k in self._data if k.startswith(prefix)]
+            for k in to_delete:
+                self._remove(k)
+        return len(to_delete)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-prefix counters plus hit ratio and current size."""
+        with self._lock:
+            sizes: Dict[str, int] = {}
+            for k in self._data:
+                p = self.prefix_of(k)
+                sizes[p] = sizes.get(p, 0) + 1
+            result = {}
+            for prefix in set(self._stats) | set(sizes):
+                counters = dict(self._stats.get(prefix, {'hits': 0, 'misses': 0, 'evictions': 0}))
+                lookups = counters['hits'] + counters['misses']
+                counters['hit_ratio'] = round(counters['hits'] / lookups, 4) if lookups else 0.0
+                counters['size'] = sizes.get(prefix, 0)
+                result[prefix] = counters
+            return result
+
+
+# In-memory fallback cache (when Redis unavailable).
+# Bounded so a Redis outage can't grow worker memory without limit.
+_memory_cache = LocalLRUCache(
+    max_entries=CACHE_MEMORY_FALLBACK['max_entries'],
+    max_bytes=CACHE_MEMORY_FALLBACK['max_bytes'],
+    sweep_interval=CACHE_MEMORY_FALLBACK['sweep_interval'],
+)
+
+
+class PendingInvalidations:
+    """
+    Cache writes and deletes that Redis missed while it was unavailable.
+
+    They only reached the memory fallback, so once Redis is reachable again
+    it would keep serving the values from before the outage. The keys and
+    patterns are replayed as deletes on the next successful connection.
+    Bounded: past max_items, keys collapse into '<prefix>:*' patterns.
+    """
+
+    def __init__(self, max_items: int):
+        self.max_items = max_items
+        self._keys: set = set()
+        self._patterns: set = set()
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self._keys or self._patterns)
+
+    def add_keys(self, keys) -> None:
+        with self._lock:
+            for key in keys:
+                if len(self._keys) < self.max_items:
+                    self._keys.add(key)
+                else:
+                    self._patterns.add(f"{LocalLRUCache.prefix_of(key)}:*")
+
+    def add_pattern(self, pattern: str) -> None:
+        with self._lock:
+            if len(self._patterns) < self.max_items:
+                self._patterns.add(pattern)
+            else:
+                self._patterns.add(f"{LocalLRUCache.prefix_of(pattern)}:*")
+
+    def take(self) -> tuple:
+        """Return and clear (keys, patterns)."""
+        with self._lock:
+            keys, patterns = self._keys, self._patterns
+            self._keys, self._patterns = set(), set()
+            return keys, patterns
+
+
+_pending_invalidations = PendingInvalidations(int(CACHE_REDIS['max_pending_invalidations']))
+_replay_lock = threading.Lock()
+
+
+def _replay_invalidations() -> None:
+    """Delete everything Redis missed while unavailable (one thread at a time)."""
+    # Non-blocking: also stops the deletes below from replaying recursively
+    if not _replay_lock.acquire(blocking=False):
+        return
+    try:
+        keys, patterns = _pending_invalidations.take()
+        logger.info(f"Replaying {len(keys)} cache keys and {len(patterns)} patterns missed by Redis")
+        keys = sorted(keys)
+        for i in range(0, len(keys), 500):
+            cache_service.delete_many(keys[i:i + 500])
+        for pattern in patterns:
+            cache_service.delete_pattern(pattern)
+    finally:
+        _replay_lock.release()
+
+
+class CacheMetrics:
+    """
+    Per-prefix cache counters and get/set latency histograms.
+
+    One lock acquisition per recorded call; cheap enough for every get/set.
+    """
+
+    COUNTERS = ('hits', 'misses', 'sets', 'errors')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._latency: Dict[tuple, LatencyHistogram] = {}
+
+    def _prefix_counters(self, prefix: str) -> Dict[str, int]:
+        counters = self._counters.get(prefix)
+        if counters is None:
+            counters = self._counters[prefix] = dict.fromkeys(self.COUNTERS, 0)
+        return counters
+
+    def incr(self, prefix: str, field: str, n: int = 1) -> None:
+        with self._lock:
+            self._prefix_counters(prefix)[field] += n
+
+    def observe(self, op: str, prefix: str, seconds: float, field: Optional[str] = None) -> None:
+        """Record one get/set latency, optionally bumping a counter too."""
+        server_timing.record('cache', seconds)
+        with self._lock:
+            if field:
+                self._prefix_counters(prefix)[field] += 1
+            hist = self._latency.get((op, prefix))
+            if hist is None:
+                hist = self._latency[(op, prefix)] = LatencyHistogram()
+            hist.observe(seconds * 1000)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._latency.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """{prefix: {hits, misses, sets, errors, hit_ratio, get_latency, set_latency}}"""
+        with self._lock:
+            result = {}
+            prefixes = set(self._counters) | {prefix for _, prefix in self._latency}
+            for prefix in prefixes:
+                data: Dict[str, Any] = dict(self._prefix_counters(prefix))
+                lookups = data['hits'] + data['misses']
+                data['hit_ratio'] = round(data['hits'] / lookups, 4) if lookups else 0.0
+                for op in ('get', 'set'):
+                    hist = self._latency.get((op, prefix))
+                    data[f'{op}_latency'] = hist.to_dict() if hist else LatencyHistogram().to_dict()
+                result[prefix] = data
+            return result
 
-# In-memory fallback cache (when Redis unavailable)
-_memory_cache = {}
+    def histograms(self) -> Dict[tuple, LatencyHistogram]:
+        """Copy of the (op, prefix) -> histogram map (for exposition)."""
+        with self._lock:
+            copies = {}
+            for k, hist in self._latency.items():
+                clone = LatencyHistogram(hist.buckets)
+                clone.merge(hist)
+                copies[k] = clone
+            return copies
 
 
 class CacheService:
@@ -57,6 +513,11 @@ class CacheService:
     PREFIX_CATEGORIES = "categories"
     PREFIX_USER_CATEGORIES = "user_cats"
     PREFIX_PLAN = "plan"
+    PREFIX_GUIDED_PLAN = "guided_plan"
+    PREFIX_GUIDED_PLAN_DRAFT = "guided_plan_draft"
+    PREFIX_WAITLIST = "waitlist"
+    PREFIX_IMPRESSIONS = "impressions"
+    PREFIX_LATENCY = "latency"
 
     # Default TTLs (in seconds)
     TTL_SETTINGS = 3600  # 1 hour
@@ -64,96 +525,674 @@ class CacheService:
     TTL_USER_CATEGORIES = 300  # 5 minutes
     TTL_PLAN = 60  # 1 minute (legacy)
     TTL_GUIDED_PLAN = 24 * 60 * 60  # 24 hours for AI-generated plans
-
-    def __init__(self):
-        pass
+    TTL_WAITLIST = 300  # 5 minutes
+
+    # Tag sets for O(members) invalidation instead of KEYS.
+    # {prefix: depth} - a key is registered in the tag made of its first
+    # `depth` parts, e.g. guided_plan:42:fitness:2025-01-01 -> tag guided_plan:42:
+    # Tags are sorted sets scored by member expiry, so expired keys are
+    # pruned on every write and the set only holds live keys.
+    TAG_PREFIX = "ztag"
+    # First tag invalidation seen by Redis; until the longest tagged TTL has
+    # passed since then, keys written before tag sets existed may still be
+    # live, so tag invalidation also SCANs for them
+    TAG_SINCE_KEY = "ztag_since"
+    TAG_DEPTH = {
+        PREFIX_CATEGORIES: 1,
+        PREFIX_GUIDED_PLAN: 2,
+        PREFIX_GUIDED_PLAN_DRAFT: 2,
+    }
+
+    def __init__(self, l1_enabled: Optional[bool] = None):
+        if l1_enabled is None:
+            l1_enabled = os.environ.get('CACHE_L1_ENABLED', 'true').lower() == 'true'
+        self.l1 = LocalLRUCache() if l1_enabled else None
+        self.metrics = CacheMetrics()
+        self._untagged_keys_expired = False
 
     def _get_key(self, prefix: str, *parts) -> str:
         """Build cache key."""
         return f"{prefix}:{':'.join(str(p) for p in parts)}"
 
+    def _l1_ttl(self, key: str, ttl: Optional[int] = None) -> Optional[int]:
+        """L1 TTL for key (capped by ttl), or None if its prefix is not kept in L1."""
+        if self.l1 is None:
+            return None
+        l1_ttl = CACHE_L1_TTL.get(LocalLRUCache.prefix_of(key))
+        if l1_ttl is None:
+            return None
+        return min(l1_ttl, ttl) if ttl is not None else l1_ttl
+
+    def _tag_for(self, key: str) -> Optional[str]:
+        """Tag that key belongs to ('categories:' / 'guided_plan:{user}:'), if any."""
+        parts = key.split(':')
+        depth = self.TAG_DEPTH.get(parts[0])
+        if depth is None or len(parts) <= depth:
+            return None
+        return ':'.join(parts[:depth]) + ':'
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.TAG_PREFIX}:{tag}"
+
     def get(self, key: str) -> Optional[Any]:
-        """Get value from cache."""
+        """Get value from cache (L1 first, then Redis)."""
+        start = time.perf_counter()
+        value = self._get(key)
+        self.metrics.observe(
+            'get', LocalLRUCache.prefix_of(key), time.perf_counter() - start,
+            'hits' if value is not None else 'misses'
+        )
+        return value
+
+    def _get(self, key: str) -> Optional[Any]:
+        l1_ttl = self._l1_ttl(key)
+        if l1_ttl is not None:
+            value = self.l1.get(key)
+            if value is not None:
+                # Shallow copy so callers that tweak top-level fields
+                # (e.g. 'from_cache') don't mutate the shared L1 entry
+                return copy.copy(value)
+
+        value = self._get_l2(key)
+        if value is not None and l1_ttl:
+            self.l1.set(key, value, l1_ttl)
+            return copy.copy(value)
+        return value
+
+    def _get_l2(self, key: str) -> Optional[Any]:
+        """Get value from Redis (or the memory fallback)."""
         redis = _get_redis()
 
         if redis:
             try:
                 value = redis.get(key)
+                _redis_ok()
                 if value:
-                    return json.loads(value)
+                    return cache_codec.decode(value)
             except Exception as e:
+                _redis_failed(e)
+                self.metrics.incr(LocalLRUCache.prefix_of(key), 'errors')
                 logger.warning(f"Cache get error: {e}")
         else:
             # Memory fallback
-            if key in _memory_cache:
-                import time
-                entry = _memory_cache[key]
-                if entry['expires_at'] > time.time():
-                    return entry['value']
-                else:
-                    del _memory_cache[key]
+            return _memory_cache.get(key)
 
         return None
 
     def set(self, key: str, value: Any, ttl: int = 300) -> bool:
-        """Set value in cache."""
+        """Set value in cache (Redis and, for hot prefixes, L1)."""
+        start = time.perf_counter()
+        success = self._set(key, value, ttl)
+        self.metrics.observe(
+            'set', LocalLRUCache.prefix_of(key), time.perf_counter() - start,
+            'sets' if success else None
+        )
+        return success
+
+    def _set(self, key: str, value: Any, ttl: int) -> bool:
+        l1_ttl = self._l1_ttl(key, ttl)
+        if l1_ttl:
+            self.l1.set(key, value, l1_ttl)
+
         redis = _get_redis()
 
         if redis:
             try:
-                redis.setex(key, ttl, json.dumps(value))
+                if self._tag_for(key):
+                    pipe = redis.pipeline(transaction=False)
+                    self._queue_set(pipe, key, value, ttl)
+                    pipe.execute()
+                else:
+                    redis.setex(key, ttl, cache_codec.encode(value))
+                _redis_ok()
                 return True
             except Exception as e:
+                _redis_failed(e)
+                _pending_invalidations.add_keys([key])
+                self.metrics.incr(LocalLRUCache.prefix_of(key), 'errors')
                 logger.warning(f"Cache set error: {e}")
         else:
-            # Memory fallback
-            import time
-            _memory_cache[key] = {
-                'value': value,
-                'expires_at': time.time() + ttl
-            }
-            return True
+            # Memory fallback; Redis still holds the old value until replayed
+            _pending_invalidations.add_keys([key])
+            return _memory_cache.set(key, value, ttl)
 
         return False
 
+    def _queue_set(self, pipe, key: str, value: Any, ttl: int) -> None:
+        """Queue SETEX (plus tag registration) for key on a Redis pipeline."""
+        pipe.setex(key, ttl, cache_codec.encode(value))
+        tag = self._tag_for(key)
+        if tag:
+            # Register key in its tag set in the same round trip, dropping
+            # members that have expired since. The tag set lives as long as
+            # its newest member.
+            tag_key = self._tag_key(tag)
+            now = time.time()
+            pipe.zadd(tag_key, {key: now + ttl})
+            pipe.zremrangebyscore(tag_key, '-inf', now)
+            pipe.expire(tag_key, ttl)
+
+    def _queue_untag(self, pipe, keys: List[str]) -> None:
+        """Queue removal of keys from their tag sets on a Redis pipeline."""
+        by_tag: Dict[str, List[str]] = {}
+        for key in keys:
+            tag = self._tag_for(key)
+            if tag:
+                by_tag.setdefault(self._tag_key(tag), []).append(key)
+        for tag_key, members in by_tag.items():
+            pipe.zrem(tag_key, *members)
+
+    # === Batch operations ===
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Get several keys in one round trip (L1 first, then a single MGET).
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Dict of key -> value for hits only (misses are absent)
+        """
+        start = time.perf_counter()
+        result = self._get_many(keys)
+        self._observe_batch('get', keys, time.perf_counter() - start,
+                            lambda key: 'hits' if key in result else 'misses')
+        return result
+
+    def _observe_batch(self, op: str, keys, elapsed: float, field: Callable[[str], Optional[str]]) -> None:
+        """Record a batch call per key prefix, each key taking an equal share of the latency."""
+        share = elapsed / len(keys)
+        for key in keys:
+            self.metrics.observe(op, LocalLRUCache.prefix_of(key), share, field(key))
+
+    def _batch_errors(self, keys) -> None:
+        """Count one error for each key prefix in a failed batch call."""
+        for prefix in {LocalLRUCache.prefix_of(key) for key in keys}:
+            self.metrics.incr(prefix, 'errors')
+
+    def _get_many(self, keys: List[str]) -> Dict[str, Any]:
+        result: Dict[str, Any] = {}
+        missing = []
+        for key in keys:
+            if self._l1_ttl(key) is not None:
+                value = self.l1.get(key)
+                if value is not None:
+                    result[key] = copy.copy(value)
+                    continue
+            missing.append(key)
+
+        if not missing:
+            return result
+
+        fetched: Dict[str, Any] = {}
+        redis = _get_redis()
+        if redis:
+            try:
+                raw_values = redis.mget(missing)
+                _redis_ok()
+                for key, raw in zip(missing, raw_values):
+                    if raw:
+                        fetched[key] = cache_codec.decode(raw)
+            except Exception as e:
+                _redis_failed(e)
+                self._batch_errors(missing)
+                logger.warning(f"Cache get_many error: {e}")
+        else:
+            for key in missing:
+                value = _memory_cache.get(key)
+                if value is not None:
+                    fetched[key] = value
+
+        for key, value in fetched.items():
+            l1_ttl = self._l1_ttl(key)
+            if l1_ttl:
+                self.l1.set(key, value, l1_ttl)
+                value = copy.copy(value)
+            result[key] = value
+        return result
+
+    def set_many(self, mapping: Dict[str, Any], ttl: int = 300) -> bool:
+        """
+        Set several keys with the same TTL in one pipelined round trip.
+
+        Args:
+            mapping: key -> value
+            ttl: TTL in seconds
+
+        Returns:
+            True if all values were stored
+        """
+        if not mapping:
+            return True
+
+        for key, value in mapping.items():
+            l1_ttl = self._l1_ttl(key, ttl)
+            if l1_ttl:
+                self.l1.set(key, value, l1_ttl)
+
+        start = time.perf_counter()
+        success = self._set_many_l2(mapping, ttl)
+        self._observe_batch('set', list(mapping), time.perf_counter() - start,
+                            lambda key: 'sets' if success else None)
+        return success
+
+    def _set_many_l2(self, mapping: Dict[str, Any], ttl: int) -> bool:
+        redis = _get_redis()
+        if redis:
+            try:
+                pipe = redis.pipeline(transaction=False)
+                for key, value in mapping.items():
+                    self._queue_set(pipe, key, value, ttl)
+                pipe.execute()
+                _redis_ok()
+                return True
+            except Exception as e:
+                _redis_failed(e)
+                _pending_invalidations.add_keys(mapping)
+                self._batch_errors(mapping)
+                logger.warning(f"Cache set_many error: {e}")
+                return False
+
+        _pending_invalidations.add_keys(mapping)
+        return all(_memory_cache.set(key, value, ttl) for key, value in mapping.items())
+
+    def delete_many(self, keys: List[str]) -> int:
+        """
+        Delete several keys in one round trip.
+
+        Returns:
+            Number of keys deleted
+        """
+        if not keys:
+            return 0
+
+        if self.l1 is not None:
+            for key in keys:
+                self.l1.delete(key)
+
+        redis = _get_redis()
+        if redis:
+            try:
+                pipe = redis.pipeline(transaction=False)
+                pipe.delete(*keys)
+                self._queue_untag(pipe, keys)
+                count = pipe.execute()[0]
+                _redis_ok()
+                return count
+            except Exception as e:
+                _redis_failed(e)
+                _pending_invalidations.add_keys(keys)
+                self._batch_errors(keys)
+                logger.warning(f"Cache delete_many error: {e}")
+                return 0
+
+        _pending_invalidations.add_keys(keys)
+        return sum(1 for key in keys if _memory_cache.delete(key))
+
     def delete(self, key: str) -> bool:
         """Delete value from cache."""
+        if self.l1 is not None:
+            self.l1.delete(key)
+
         redis = _get_redis()
 
         if redis:
             try:
-                redis.delete(key)
+                if self._tag_for(key):
+                    pipe = redis.pipeline(transaction=False)
+                    pipe.delete(key)
+                    self._queue_untag(pipe, [key])
+                    pipe.execute()
+                else:
+                    redis.delete(key)
+                _redis_ok()
                 return True
             except Exception as e:
+                _redis_failed(e)
+                _pending_invalidations.add_keys([key])
+                self.metrics.incr(LocalLRUCache.prefix_of(key), 'errors')
                 logger.warning(f"Cache delete error: {e}")
         else:
-            _memory_cache.pop(key, None)
+            _pending_invalidations.add_keys([key])
+            _memory_cache.delete(key)
             return True
 
         return False
 
     def delete_pattern(self, pattern: str) -> int:
-        """Delete all keys matching pattern."""
+        """
+        Delete all keys matching pattern.
+
+        Patterns of the form '<tag>*' for a known tag (see TAG_DEPTH) are
+        resolved via the tag set in O(members). Anything else, and tagged
+        patterns while untagged keys from before tag sets may still be live,
+        falls back to an incremental SCAN, never KEYS, so Redis is not blocked.
+        """
+        prefix = pattern.rstrip('*')
+        if self.l1 is not None:
+            self.l1.delete_prefix(prefix)
+
         redis = _get_redis()
         count = 0
 
         if redis:
             try:
-                keys = redis.keys(pattern)
-                if keys:
-                    count = redis.delete(*keys)
+                tagged = pattern.endswith('*') and self._tag_for(prefix) == prefix
+                if tagged and not self._untagged_keys_possible(redis):
+                    count = self._delete_tag(redis, prefix)
+                else:
+                    keys = list(redis.scan_iter(match=pattern, count=500))
+                    if keys:
+                        pipe = redis.pipeline(transaction=False)
+                        pipe.delete(*keys)
+                        if tagged:
+                            pipe.zrem(self._tag_key(prefix), *keys)
+                        count = pipe.execute()[0]
             except Exception as e:
+                _redis_failed(e)
+                _pending_invalidations.add_pattern(pattern)
+                self.metrics.incr(LocalLRUCache.prefix_of(prefix), 'errors')
                 logger.warning(f"Cache delete pattern error: {e}")
         else:
             # Memory fallback - simple prefix matching
-            prefix = pattern.rstrip('*')
-            to_delete = [k for k in _memory_cache if k.startswith(prefix)]
-            for k in to_delete:
-                del _memory_cache[k]
-            count = len(to_delete)
+            _pending_invalidations.add_pattern(pattern)
+            count = _memory_cache.delete_prefix(prefix)
 
         return count
 
+    def _untagged_keys_possible(self, redis) -> bool:
+        """True while keys cached before tag sets existed may not have expired yet."""
+        if self._untagged_keys_expired:
+            return False
+        now = time.time()
+        redis.set(self.TAG_SINCE_KEY, now, nx=True)
+        since = float(redis.get(self.TAG_SINCE_KEY) or now)
+        if now - since < self.TTL_GUIDED_PLAN:
+            return True
+        self._untagged_keys_expired = True
+        return False
+
+    def _delete_tag(self, redis, tag: str) -> int:
+        """Delete every key registered in a tag set."""
+        tag_key = self._tag_key(tag)
+        members = list(redis.zrange(tag_key, 0, -1))
+        if not members:
+            return 0
+        pipe = redis.pipeline(transaction=False)
+        pipe.delete(*members)
+        # ZREM (not DEL) so keys tagged concurrently stay registered
+        pipe.zrem(tag_key, *members)
+        deleted, _ = pipe.execute()
+        return deleted
+
+    # === Recent-item sets (Redis sorted sets) ===
+
+    def add_recent(
+        self,
+        key: str,
+        members: List[str],
+        window_seconds: int,
+        max_items: int
+    ) -> bool:
+        """
+        Add members to a time-scored sorted set, trimming it in the same round trip.
+
+        Entries older than window_seconds and all but the newest max_items
+        are removed; the key expires window_seconds after the last write.
+
+        Returns:
+            False if Redis is unavailable (nothing stored)
+        """
+        if not members:
+            return True
+
+        redis = _get_redis()
+        if not redis:
+            return False
+
+        now = time.time()
+        try:
+            pipe = redis.pipeline(transaction=False)
+            pipe.zadd(key, {member: now for member in members})
+            pipe.zremrangebyscore(key, '-inf', now - window_seconds)
+            pipe.zremrangebyrank(key, 0, -(max_items + 1))
+            pipe.expire(key, int(window_seconds))
+            pipe.execute()
+            _redis_ok()
+            return True
+        except Exception as e:
+            _redis_failed(e)
+            self.metrics.incr(LocalLRUCache.prefix_of(key), 'errors')
+            logger.warning(f"Cache add_recent error for {key}: {e}")
+            return False
+
+    def get_recent(self, key: str, window_seconds: int) -> Optional[set]:
+        """
+        Members added within the last window_seconds (one ZRANGEBYSCORE).
+
+        Returns:
+            Set of members, or None if Redis is unavailable (caller should
+            fall back to its durable store)
+        """
+        redis = _get_redis()
+        if not redis:
+            return None
+
+        try:
+            members = redis.zrangebyscore(key, time.time() - window_seconds, '+inf')
+            _redis_ok()
+        except Exception as e:
+            _redis_failed(e)
+            self.metrics.incr(LocalLRUCache.prefix_of(key), 'errors')
+            logger.warning(f"Cache get_recent error for {key}: {e}")
+            return None
+
+        return {m.decode('utf-8') if isinstance(m, bytes) else m for m in members}
+
+    def incr_hash(self, key: str, increments: Dict[str, float], ttl: int) -> bool:
+        """
+        Add increments to hash fields in one pipelined round trip.
+
+        Integer values use HINCRBY, floats HINCRBYFLOAT; the key expires ttl
+        seconds after the last write.
+
+        Returns:
+            False if Redis is unavailable (nothing stored)
+        """
+        if not increments:
+            return True
+
+        redis = _get_redis()
+        if not redis:
+            return False
+
+        try:
+            pipe = redis.pipeline(transaction=False)
+            for field, value in increments.items():
+                if isinstance(value, float):
+                    pipe.hincrbyfloat(key, field, value)
+                else:
+                    pipe.hincrby(key, field, value)
+            pipe.expire(key, int(ttl))
+            pipe.execute()
+            _redis_ok()
+            return True
+        except Exception as e:
+            _redis_failed(e)
+            self.metrics.incr(LocalLRUCache.prefix_of(key), 'errors')
+            logger.warning(f"Cache incr_hash error for {key}: {e}")
+            return False
+
+    def get_hashes(self, keys: List[str]) -> Optional[List[Dict[str, str]]]:
+        """
+        HGETALL several keys in one pipelined round trip.
+
+        Returns:
+            One dict per key (empty if missing), or None if Redis is
+            unavailable (caller should fall back to its durable store)
+        """
+        redis = _get_redis()
+        if not redis:
+            return None
+
+        try:
+            pipe = redis.pipeline(transaction=False)
+            for key in keys:
+                pipe.hgetall(key)
+            results = pipe.execute()
+            _redis_ok()
+        except Exception as e:
+            _redis_failed(e)
+            if keys:
+                self.metrics.incr(LocalLRUCache.prefix_of(keys[0]), 'errors')
+            logger.warning(f"Cache get_hashes error: {e}")
+            return None
+
+        def _text(value):
+            return value.decode('utf-8') if isinstance(value, bytes) else value
+
+        return [{_text(k): _text(v) for k, v in result.items()} for result in results]
+
+    # === Single-flight ===
+
+    LOCK_PREFIX = "lock"
+    SWR_MARKER = "_swr_fresh_until"
+
+    def _acquire_lock(self, key: str) -> Optional[str]:
+        """
+        Try to take the cross-worker lock for key.
+
+        Returns:
+            Lock token if acquired, '' if Redis is unavailable (the local lock
+            is all we have), None if another worker holds the lock
+        """
+        redis = _get_redis()
+        if not redis:
+            return ''
+        token = uuid.uuid4().hex
+        try:
+            if redis.set(f"{self.LOCK_PREFIX}:{key}", token, nx=True,
+                         px=int(CACHE_SINGLE_FLIGHT['lock_ttl'] * 1000)):
+                return token
+            return None
+        except Exception as e:
+            _redis_failed(e)
+            logger.warning(f"Cache lock error: {e}")
+            return ''
+
+    def _release_lock(self, key: str, token: Optional[str]) -> None:
+        if not token:
+            return
+        redis = _get_redis()
+        if not redis:
+            return
+        try:
+            redis.eval(_RELEASE_LOCK_SCRIPT, 1, f"{self.LOCK_PREFIX}:{key}", token)
+        except Exception as e:
+            _redis_failed(e)
+            logger.warning(f"Cache unlock error: {e}")
+
+    def _unwrap(self, cached: Any, stale_ttl: Optional[int]):
+        """Split a cached entry into (value, is_fresh)."""
+        if cached is None:
+            return None, False
+        if stale_ttl and isinstance(cached, dict) and self.SWR_MARKER in cached:
+            return cached['value'], cached[self.SWR_MARKER] > time.time()
+        return cached, True
+
+    def _store(self, key: str, value: Any, ttl: int, stale_ttl: Optional[int]) -> None:
+        if value is None:
+            return
+        if stale_ttl:
+            # Keep the entry for ttl + stale_ttl; after ttl it is served stale
+            # while one caller recomputes it
+            envelope = {'value': value, self.SWR_MARKER: time.time() + ttl}
+            self.set(key, envelope, ttl + stale_ttl)
+        else:
+            self.set(key, value, ttl)
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        ttl: int,
+        stale_ttl: Optional[int] = None
+    ) -> Any:
+        """
+        Get key from cache, computing it at most once across concurrent callers.
+
+        On a miss only one caller runs compute(): threads in this worker wait
+        on a per-key lock, other workers on a Redis lock (SET NX PX) and poll
+        the cache until the value appears. If the lock holder takes longer
+        than wait_timeout the waiter computes anyway rather than failing.
+
+        Args:
+            key: Cache key
+            compute: Zero-argument function producing the value
+            ttl: TTL in seconds for the computed value
+            stale_ttl: Optional stale-while-revalidate window. After ttl the
+                old value is returned immediately to everyone except the one
+                caller that recomputes it.
+
+        Returns:
+            Cached or freshly computed value (None results are not cached)
+        """
+        value, fresh = self._unwrap(self.get(key), stale_ttl)
+        if fresh:
+            return value
+        stale = value
+        wait_timeout = CACHE_SINGLE_FLIGHT['wait_timeout']
+
+        with _local_flight(key, blocking=stale is None, timeout=wait_timeout) as leader:
+            if not leader:
+                if stale is not None:
+                    return stale
+                logger.warning(f"CacheService: single-flight wait timed out for {key}")
+                return compute()
+
+            # Another thread in this worker may have filled it while we waited.
+            # Uninstrumented: this lookup was already counted as a miss above.
+            value, fresh = self._unwrap(self._get(key), stale_ttl)
+            if fresh:
+                return value
+
+            token = self._acquire_lock(key)
+            if token is None:
+                if stale is not None:
+                    return stale
+                value, token = self._wait_for_peer(key, stale_ttl, wait_timeout)
+                if token is None and value is not None:
+                    return value
+
+            try:
+                value = compute()
+                self._store(key, value, ttl, stale_ttl)
+                return value
+            finally:
+                self._release_lock(key, token)
+
+    def _wait_for_peer(self, key: str, stale_ttl: Optional[int], wait_timeout: float):
+        """
+        Poll the cache while another worker computes key.
+
+        Returns:
+            (value, None) once the value appears, or (None, token) if the lock
+            became free and we took it, or (None, '') on timeout
+        """
+        deadline = time.monotonic() + wait_timeout
+        poll = CACHE_SINGLE_FLIGHT['poll_interval']
+        while time.monotonic() < deadline:
+            time.sleep(poll)
+            value, fresh = self._unwrap(self._get(key), stale_ttl)
+            if fresh:
+                return value, None
+            token = self._acquire_lock(key)
+            if token is not None:
+                return None, token
+        logger.warning(f"CacheService: single-flight wait timed out for {key}")
+        return None, ''
+
     # === High-level methods ===
 
     def get_settings(self) -> Optional[dict]:
@@ -200,6 +1239,14 @@ class CacheService:
         key = self._get_key(self.PREFIX_USER_CATEGORIES, user_id)
         return self.delete(key)
 
+    def waitlist_key(self, user_id: int) -> str:
+        """Cache key for the list of premium category IDs a user is waiting for."""
+        return self._get_key(self.PREFIX_WAITLIST, user_id)
+
+    def invalidate_user_waitlist(self, user_id: int) -> bool:
+        """Invalidate user's waitlist cache."""
+        return self.delete(self.waitlist_key(user_id))
+
     def get_plan(self, user_id: Optional[int], category_id: int, date_str: str) -> Optional[dict]:
         """Get cached plan."""
         user_part = user_id or "anon"
@@ -224,7 +1271,7 @@ class CacheService:
         """Generate cache key for AI-generated guided plan."""
         from datetime import date
         today = date.today().isoformat()
-        return f"guided_plan:{user_id}:{category}:{today}"
+        return f"{self.PREFIX_GUIDED_PLAN}:{user_id}:{category}:{today}"
 
     def get_guided_plan(self, user_id: int, category: str) -> Optional[dict]:
         """
@@ -267,24 +1314,160 @@ class CacheService:
 
         return success
 
+    def get_or_create_guided_plan(
+        self,
+        user_id: int,
+        category: str,
+        generate: Callable[[], dict]
+    ) -> Optional[dict]:
+        """
+        Get cached guided plan or generate it, one generation per key at a time.
+
+        Concurrent requests for the same user/category/day share a single
+        generate() call (see get_or_compute).
+
+        Args:
+            user_id: User ID
+            category: Category name
+            generate: Zero-argument function building the plan
+
+        Returns:
+            Plan dict
+        """
+        key = self._guided_plan_key(user_id, category)
+        return self.get_or_compute(key, generate, self.TTL_GUIDED_PLAN)
+
     def invalidate_guided_plan(self, user_id: int, category: str) -> bool:
         """Invalidate cached guided plan."""
         key = self._guided_plan_key(user_id, category)
         return self.delete(key)
 
     def invalidate_user_guided_plans(self, user_id: int) -> int:
-        """Invalidate all cached guided plans for a user."""
-        return self.delete_pattern(f"guided_plan:{user_id}:*")
+        """Invalidate all cached guided plans (and warm-up drafts) for a user."""
+        return (
+            self.delete_pattern(f"{self.PREFIX_GUIDED_PLAN}:{user_id}:*")
+            + self.delete_pattern(f"{self.PREFIX_GUIDED_PLAN_DRAFT}:{user_id}:*")
+        )
+
+    # === Guided Plan Drafts (built by the nightly warm-up, not yet persisted) ===
+
+    def _guided_plan_draft_key(self, user_id: int, category: str) -> str:
+        from datetime import date
+        today = date.today().isoformat()
+        return f"{self.PREFIX_GUIDED_PLAN_DRAFT}:{user_id}:{category}:{today}"
+
+    def get_guided_plan_draft(self, user_id: int, category: str) -> Optional[dict]:
+        """Get today's pre-built plan draft, if the warm-up made one."""
+        return self.get(self._guided_plan_draft_key(user_id, category))
+
+    def set_guided_plan_draft(self, user_id: int, category: str, plan: dict) -> bool:
+        """Store a pre-built plan draft for today (24-hour TTL)."""
+        return self.set(self._guided_plan_draft_key(user_id, category), plan, self.TTL_GUIDED_PLAN)
+
+    def pop_guided_plan_draft(self, user_id: int, category: str) -> Optional[dict]:
+        """Get and remove today's plan draft (it is used at most once)."""
+        key = self._guided_plan_draft_key(user_id, category)
+        draft = self.get(key)
+        if draft is not None:
+            self.delete(key)
+        return draft
+
+    # === Stats ===
+
+    def get_redis_stats(self) -> Dict[str, Any]:
+        """Circuit breaker state and transition counters for the Redis tier."""
+        return _breaker.stats()
+
+    def get_l1_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-prefix L1 counters for tuning.
+
+        Returns:
+            {prefix: {hits, misses, evictions, hit_ratio, size}} for every
+            L1 prefix (settings, categories, user_cats, guided_plan)
+        """
+        if self.l1 is None:
+            return {}
+        stats = self.l1.stats()
+        for prefix in CACHE_L1_TTL:
+            stats.setdefault(prefix, {'hits': 0, 'misses': 0, 'evictions': 0, 'hit_ratio': 0.0, 'size': 0})
+        return stats
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Cache metrics for the admin dashboard (this worker only).
+
+        Returns:
+            Dict with per-prefix counters/latencies, L1 stats, memory
+            fallback usage and the Redis circuit breaker state
+        """
+        l1_stats = self.get_l1_stats()
+        fallback_stats = _memory_cache.stats()
+        prefixes = self.metrics.snapshot()
+        for prefix, data in prefixes.items():
+            data['evictions'] = (
+                l1_stats.get(prefix, {}).get('evictions', 0)
+                + fallback_stats.get(prefix, {}).get('evictions', 0)
+            )
+
+        return {
+            'prefixes': prefixes,
+            'l1': l1_stats,
+            'memory_fallback': {
+                'entries': len(_memory_cache),
+                'bytes': _memory_cache.total_bytes,
+            },
+            'redis': self.get_redis_stats(),
+        }
+
+    def render_prometheus(self) -> str:
+        """Cache metrics in Prometheus text exposition format (this worker only)."""
+        stats = self.get_stats()
+        lines = []
+
+        for field in CacheMetrics.COUNTERS + ('evictions',):
+            name = f"fyp_cache_{field}_total"
+            lines.append(f"# TYPE {name} counter")
+            for prefix, data in sorted(stats['prefixes'].items()):
+                lines.append(f'{name}{{prefix="{prefix}"}} {data[field]}')
+
+        typed = set()
+        for (op, prefix), hist in sorted(self.metrics.histograms().items()):
+            name = f"fyp_cache_{op}_latency_ms"
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            for le, count in hist.cumulative_buckets():
+                lines.append(f'{name}_bucket{{prefix="{prefix}",le="{le}"}} {count}')
+            lines.append(f'{name}_sum{{prefix="{prefix}"}} {round(hist.sum_ms, 3)}')
+            lines.append(f'{name}_count{{prefix="{prefix}"}} {hist.count}')
+
+        lines.append("# TYPE fyp_cache_l1_entries gauge")
+        for prefix, data in sorted(stats['l1'].items()):
+            lines.append(f'fyp_cache_l1_entries{{prefix="{prefix}"}} {data["size"]}')
+
+        lines.append("# TYPE fyp_cache_memory_fallback_bytes gauge")
+        lines.append(f"fyp_cache_memory_fallback_bytes {stats['memory_fallback']['bytes']}")
+
+        lines.append("# TYPE fyp_cache_redis_circuit_open gauge")
+        open_state = 0 if stats['redis']['state'] == RedisCircuitBreaker.CLOSED else 1
+        lines.append(f"fyp_cache_redis_circuit_open {open_state}")
+
+        return '\n'.join(lines) + '\n'
 
 
 # Singleton instance
 cache_service = CacheService()
 
 
-def cached(prefix: str, ttl: int = 300, key_func: Callable = None):
+def cached(prefix: str, ttl: int = 300, key_func: Callable = None, stale_ttl: Optional[int] = None):
     """
     Decorator for caching function results.
 
+    Concurrent misses for the same key are coalesced so the function runs
+    once. With stale_ttl, expired results are served for up to stale_ttl
+    more seconds while a single caller refreshes them.
+
     Usage:
         @cached('categories', ttl=3600)
         def get_categories():
@@ -299,19 +1482,12 @@ def cached(prefix: str, ttl: int = 300, key_func: Callable = None):
             else:
                 cache_key = f"{prefix}:{func.__name__}"
 
-            # Try cache
-            result = cache_service.get(cache_key)
-            if result is not None:
-                return result
-
-            # Call function
-            result = func(*args, **kwargs)
-
-            # Cache result
-            if result is not None:
-                cache_service.set(cache_key, result, ttl)
-
-            return result
+            return cache_service.get_or_compute(
+                cache_key,
+                lambda: func(*args, **kwargs),
+                ttl,
+                stale_ttl=stale_ttl
+            )
 
         return wrapper
     return decorator
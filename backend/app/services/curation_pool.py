@@ -0,0 +1,189 @@
+"""
+Curation Pool - Per-worker top-K candidates with per-user exclusion sets.
+
+Keeps, per category, the best CURATION_POOL['size'] candidates as parallel
+arrays sorted by quality, and per user the blocked creators / watched-today
+videos as frozensets. A warm get_curated() is a single pass over the array
+with two set lookups per candidate and never touches the database.
+
+Staleness is bounded by refresh_interval (candidates) and exclusion_ttl
+(per-user sets). Writes in this worker call invalidate_user() so the
+user's next request reloads immediately; other workers catch up within
+exclusion_ttl.
+
+Usage:
+    pool = CurationPool(load_candidates, load_exclusions)
+    videos = pool.get_curated(user_id=1, category_id=2, count=4)
+"""
+
+import threading
+import time
+import logging
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from app.config.constants import CURATION_POOL
+from app.services.cache_service import LocalLRUCache
+
+logger = logging.getLogger(__name__)
+
+# load_candidates(category_id, limit) -> [(video_dict, creator_username, expires_at)]
+CandidateLoader = Callable[[int, int], List[Tuple[Dict[str, Any], str, Optional[datetime]]]]
+# load_exclusions(user_id) -> (blocked creator usernames, watched-today video IDs)
+ExclusionLoader = Callable[[int], Tuple[Iterable[str], Iterable[str]]]
+
+
+class _CategoryPool:
+    """Immutable snapshot of one category's ranked candidates."""
+
+    __slots__ = ('videos', 'video_ids', 'creators', 'expires_at', 'loaded_at', 'truncated')
+
+    def __init__(self, videos, video_ids, creators, expires_at, loaded_at, truncated):
+        self.videos = videos
+        self.video_ids = video_ids
+        self.creators = creators
+        self.expires_at = expires_at
+        self.loaded_at = loaded_at
+        self.truncated = truncated
+
+
+class CurationPool:
+    """In-process curation pool; one instance per worker."""
+
+    def __init__(
+        self,
+        load_candidates: CandidateLoader,
+        load_exclusions: ExclusionLoader,
+        size: int = CURATION_POOL['size'],
+        refresh_interval: int = CURATION_POOL['refresh_interval'],
+        exclusion_ttl: int = CURATION_POOL['exclusion_ttl'],
+        max_users: int = CURATION_POOL['max_users']
+    ):
+        self._load_candidates = load_candidates
+        self._load_exclusions = load_exclusions
+        self.size = size
+        self.refresh_interval = refresh_interval
+        self.exclusion_ttl = exclusion_ttl
+
+        self._pools: Dict[int, _CategoryPool] = {}
+        self._pool_locks: Dict[int, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+        self._exclusions = LocalLRUCache(max_entries=max_users, sweep_interval=exclusion_ttl)
+
+    # === Category pools ===
+
+    def _category_pool(self, category_id: int) -> _CategoryPool:
+        """Current snapshot for category, reloading it if stale."""
+        pool = self._pools.get(category_id)
+        if pool is not None and time.monotonic() - pool.loaded_at < self.refresh_interval:
+            return pool
+
+        with self._lock:
+            load_lock = self._pool_locks.setdefault(category_id, threading.Lock())
+
+        # One loader per category; concurrent callers wait and reuse its result
+        with load_lock:
+            pool = self._pools.get(category_id)
+            if pool is not None and time.monotonic() - pool.loaded_at < self.refresh_interval:
+                return pool
+
+            rows = self._load_candidates(category_id, self.size)
+            pool = _CategoryPool(
+                videos=[video for video, _, _ in rows],
+                video_ids=[video['video_id'] for video, _, _ in rows],
+                creators=[creator for _, creator, _ in rows],
+                expires_at=[expires_at for _, _, expires_at in rows],
+                loaded_at=time.monotonic(),
+                truncated=len(rows) >= self.size
+            )
+
+            with self._lock:
+                self._pools[category_id] = pool
+
+            logger.debug(f"Curation pool: loaded {len(rows)} candidates for category {category_id}")
+            return pool
+
+    # === Per-user exclusions ===
+
+    def _user_exclusions(self, user_id: int) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+        """(blocked creator usernames, watched video IDs) for user."""
+        key = f"curation_excl:{user_id}"
+        today = date.today()
+        entry = self._exclusions.get(key)
+        if entry is not None:
+            day, blocked, watched = entry
+            if day == today:
+                return blocked, watched
+
+        blocked, watched = self._load_exclusions(user_id)
+        blocked = frozenset(c for c in blocked if c)
+        watched = frozenset(v for v in watched if v)
+
+        self._exclusions.set(key, (today, blocked, watched), self.exclusion_ttl)
+        return blocked, watched
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Forget user's cached exclusions (after a block or a completed step)."""
+        self._exclusions.delete(f"curation_excl:{user_id}")
+
+    def invalidate_category(self, category_id: Optional[int] = None) -> None:
+        """Force a reload of one category, or all categories, on next use."""
+        with self._lock:
+            if category_id is None:
+                self._pools.clear()
+            else:
+                self._pools.pop(category_id, None)
+
+    # === Query ===
+
+    def get_curated(self, user_id: int, category_id: int, count: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Top count candidates for user, max one per creator.
+
+        Args:
+            user_id: User ID
+            category_id: Category ID
+            count: Number of videos to return
+
+        Returns:
+            List of video dicts, or None if the pool ran out before count
+            and more candidates may exist beyond it (caller should fall back
+            to the database)
+        """
+        pool = self._category_pool(category_id)
+        blocked, watched = self._user_exclusions(user_id)
+
+        now = datetime.now(timezone.utc)
+        seen_creators = set()
+        curated = []
+
+        for i, video in enumerate(pool.videos):
+            creator = pool.creators[i]
+            if creator in blocked or creator in seen_creators:
+                continue
+            if pool.video_ids[i] in watched:
+                continue
+            expires_at = pool.expires_at[i]
+            if expires_at is not None and _aware(expires_at) <= now:
+                continue
+
+            curated.append(dict(video))
+            seen_creators.add(creator)
+            if len(curated) >= count:
+                return curated
+
+        return None if pool.truncated else curated
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool sizes for diagnostics."""
+        with self._lock:
+            return {
+                'categories': {cid: len(p.videos) for cid, p in self._pools.items()},
+                'users': len(self._exclusions),
+            }
+
+
+def _aware(value: datetime) -> datetime:
+    """Treat naive datetimes as UTC."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
@@ -3,7 +3,7 @@ Curation Service - Selects best videos for Watch step.
 
 Selection criteria (in order):
 1. NOT from blocked creators
-2. NOT already watched today
+2. NOT already watched today, NOT shown within CURATION_IMPRESSIONS['window_days']
 3. High global completion rate (>70%)
 4. Matches user's category
 5. Diverse creators (max 1 video per creator)
@@ -13,26 +13,107 @@ Usage:
 
     videos = curation_service.get_curated_videos(user_id=1, category_id=2, count=4)
     curation_service.record_video_shown(user_id=1, video_id='abc123')
+
+Hot path: a per-worker CurationPool (app.services.curation_pool) answers
+from memory; the database query below is the cold/fallback path. Disable
+with CURATION_POOL_ENABLED=false.
+
+Category matching uses the video_category_candidates index, built from
+TiktokVideo.category_scores / topics. Rebuild it after videos are scraped:
+
+    curation_service.refresh_curation_cache()            # all categories
+    curation_service.index_videos(['abc123', 'def456'])  # just-scraped videos
 """
 
+import os
 import logging
-from datetime import date, datetime
-from typing import List, Dict, Any, Optional
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Optional, Iterable, Sequence
 
-from sqlalchemy import and_, not_, func
+from sqlalchemy import and_, func, select, text
 
 from app import db
-from app.models import TiktokVideo, BlockedCreator, UserProgress, StepItem, PlanStep
+from app.models import (
+    TiktokVideo, BlockedCreator, UserProgress, StepItem, PlanStep,
+    Category, VideoCategoryCandidate, VideoImpression
+)
+from app.config.constants import CURATION_IMPRESSIONS
+from app.services.cache_service import cache_service
+from app.services.curation_pool import CurationPool
 
 logger = logging.getLogger(__name__)
 
 # Minimum quality score for curation
 MIN_QUALITY_SCORE = 0.7
 
+# Minimum category_scores value for a video to count as in-category
+MIN_CATEGORY_SCORE = 0.5
+
+# Rows fetched per round trip while streaming the ranked candidates
+CANDIDATE_BATCH_SIZE = 50
+
 
 class CurationService:
     """Service for curating personalized video recommendations."""
 
+    def __init__(self, pool_enabled: Optional[bool] = None):
+        if pool_enabled is None:
+            pool_enabled = os.environ.get('CURATION_POOL_ENABLED', 'true').lower() == 'true'
+        self.pool = CurationPool(
+            self._load_pool_candidates, self._load_user_exclusions
+        ) if pool_enabled else None
+
+    def _blocked_usernames_query(self, user_id: int):
+        """Creators this user has blocked."""
+        return db.session.query(BlockedCreator.creator_username).filter(
+            BlockedCreator.user_id == user_id
+        )
+
+    def _watched_today_query(self, user_id: int):
+        """Videos watched today (via step_items -> plan_steps -> user_progress)."""
+        return db.session.query(StepItem.video_id).join(
+            PlanStep, StepItem.plan_step_id == PlanStep.id
+        ).join(
+            UserProgress,
+            and_(
+                UserProgress.step_id == PlanStep.id,
+                UserProgress.user_id == user_id,
+                func.date(UserProgress.completed_at) == date.today()
+            )
+        ).filter(
+            # A NULL here would make NOT IN match nothing
+            StepItem.video_id.isnot(None)
+        )
+
+    def _load_pool_candidates(self, category_id: int, limit: int) -> List[tuple]:
+        """Best candidates for category as (video_dict, creator, expires_at) (pool loader)."""
+        videos = db.session.query(TiktokVideo).join(
+            VideoCategoryCandidate,
+            VideoCategoryCandidate.video_id == TiktokVideo.video_id
+        ).filter(
+            VideoCategoryCandidate.category_id == category_id,
+            VideoCategoryCandidate.expires_at > datetime.utcnow()
+        ).order_by(
+            VideoCategoryCandidate.quality_score.desc()
+        ).limit(limit).all()
+
+        return [
+            (self._video_to_dict(video), video.creator_username, video.cache_expires_at)
+            for video in videos
+        ]
+
+    def _load_user_exclusions(self, user_id: int) -> tuple:
+        """(blocked creators, videos watched today) for user (pool loader)."""
+        blocked = [row[0] for row in self._blocked_usernames_query(user_id).all()]
+        watched = [row[0] for row in self._watched_today_query(user_id).distinct().all()]
+        watched.extend(self.get_recently_shown(user_id))
+        return blocked, watched
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop user's cached exclusions (call after blocking or completing a step)."""
+        if self.pool is not None:
+            self.pool.invalidate_user(user_id)
+
     def get_curated_videos(
         self,
         user_id: int,
@@ -44,9 +125,10 @@ class CurationService:
 
         Selection criteria:
         1. NOT from blocked creators
-        2. NOT already watched today
+        2. NOT already watched today or shown recently (impression log)
         3. High quality score (>70%)
-        4. Matches category (if provided)
+        4. Matches category (if provided; topped up from the overall quality
+           ranking when the category index has too few candidates)
         5. Diverse creators (max 1 per creator)
 
         Args:
@@ -58,62 +140,96 @@ class CurationService:
             List of video objects with: video_id, video_url, thumbnail_url,
             creator_name, duration_seconds, quality_score
         """
-        try:
-            # Get blocked creators for this user
-            blocked_usernames = db.session.query(BlockedCreator.creator_username).filter(
-                BlockedCreator.user_id == user_id
-            ).subquery()
-
-            # Get videos watched today (via step_items -> plan_steps -> user_progress)
-            today = date.today()
-            watched_today = db.session.query(StepItem.video_id).join(
-                PlanStep, StepItem.plan_step_id == PlanStep.id
-            ).join(
-                UserProgress,
-                and_(
-                    UserProgress.step_id == PlanStep.id,
-                    UserProgress.user_id == user_id,
-                    func.date(UserProgress.completed_at) == today
-                )
-            ).subquery()
-
-            # Base query - get high quality videos
-            query = TiktokVideo.query.filter(
-                # Not expired
-                TiktokVideo.cache_expires_at > datetime.utcnow(),
-                # High quality
-                TiktokVideo.quality_score >= MIN_QUALITY_SCORE,
-                # Not from blocked creators
-                ~TiktokVideo.creator_username.in_(blocked_usernames),
-                # Not already watched today
-                ~TiktokVideo.video_id.in_(watched_today)
-            )
+        curated = None
+
+        if category_id and self.pool is not None:
+            try:
+                curated = self.pool.get_curated(user_id, category_id, count)
+            except Exception as e:
+                logger.error(f"Curation pool failed for user {user_id}, falling back to DB: {e}")
+
+        if curated is None:
+            curated = self._select_curated(user_id, category_id, count)
+
+        # Category index not built yet (or too few scored candidates):
+        # top up with the best uncategorized videos
+        if category_id and len(curated) < count:
+            curated.extend(self._select_curated(
+                user_id, None, count - len(curated),
+                skip_videos=[video['video_id'] for video in curated],
+                skip_creators=[video['creator_name'] for video in curated]
+            ))
+
+        logger.info(f"Curated {len(curated)} videos for user {user_id}")
+        return curated
+
+    def _select_curated(
+        self,
+        user_id: int,
+        category_id: Optional[int],
+        count: int,
+        skip_videos: Sequence[str] = (),
+        skip_creators: Sequence[str] = ()
+    ) -> List[Dict[str, Any]]:
+        """
+        Best count videos from the database, max one per creator.
 
-            # Filter by category if provided
-            if category_id:
-                # Category filtering via category_scores JSON field
-                # This assumes category_scores contains {category_slug: score}
-                pass  # TODO: Add category-specific filtering when category slug is available
+        Args:
+            user_id: User ID
+            category_id: Read this category's candidate index; None for the
+                global quality ranking
+            count: Number of videos to return
+            skip_videos: Video IDs already picked
+            skip_creators: Creators already picked
 
-            # Order by quality score
-            query = query.order_by(TiktokVideo.quality_score.desc())
+        Returns:
+            List of video dicts ([] on error)
+        """
+        try:
+            blocked_usernames = self._blocked_usernames_query(user_id).subquery()
+            watched_today = self._watched_today_query(user_id).subquery()
+            excluded_videos = list(self.get_recently_shown(user_id)) + list(skip_videos)
 
-            # Get more videos than needed for diversity filtering
-            candidates = query.limit(count * 3).all()
+            now = datetime.utcnow()
 
-            # Apply diversity filter - max 1 video per creator
+            if category_id:
+                # Ordered read of the per-category index
+                stmt = select(TiktokVideo).join(
+                    VideoCategoryCandidate,
+                    VideoCategoryCandidate.video_id == TiktokVideo.video_id
+                ).where(
+                    VideoCategoryCandidate.category_id == category_id,
+                    VideoCategoryCandidate.expires_at > now,
+                    ~VideoCategoryCandidate.creator_username.in_(select(blocked_usernames)),
+                    ~VideoCategoryCandidate.video_id.in_(select(watched_today)),
+                    ~VideoCategoryCandidate.video_id.in_(excluded_videos)
+                ).order_by(VideoCategoryCandidate.quality_score.desc())
+            else:
+                stmt = select(TiktokVideo).where(
+                    TiktokVideo.cache_expires_at > now,
+                    TiktokVideo.quality_score >= MIN_QUALITY_SCORE,
+                    ~TiktokVideo.creator_username.in_(select(blocked_usernames)),
+                    ~TiktokVideo.video_id.in_(select(watched_today)),
+                    ~TiktokVideo.video_id.in_(excluded_videos)
+                ).order_by(TiktokVideo.quality_score.desc())
+
+            # Stream candidates best-first and apply creator diversity
+            # (max 1 video per creator) in the same pass, stopping at count
             curated = []
-            seen_creators = set()
-
-            for video in candidates:
-                if video.creator_username not in seen_creators:
+            seen_creators = set(skip_creators)
+
+            with db.session.execute(
+                stmt, execution_options={'yield_per': CANDIDATE_BATCH_SIZE}
+            ).scalars() as videos:
+                for video in videos:
+                    if video.creator_username in seen_creators:
+                        continue
                     curated.append(self._video_to_dict(video))
                     seen_creators.add(video.creator_username)
 
                     if len(curated) >= count:
                         break
 
-            logger.info(f"Curated {len(curated)} videos for user {user_id}")
             return curated
 
         except Exception as e:
@@ -139,9 +255,6 @@ class CurationService:
         """
         Record that a video was shown to user (for deduplication).
 
-        This creates a lightweight tracking entry. Full completion tracking
-        happens via UserProgress when user actually completes the action.
-
         Args:
             user_id: User ID
             video_id: Video ID that was shown
@@ -149,17 +262,108 @@ class CurationService:
         Returns:
             True if recorded, False on error
         """
-        try:
-            # For now, we track shown videos via the step_items that get created
-            # when a plan is generated. This method is a placeholder for future
-            # tracking needs (e.g., if we want to track impressions vs completions)
-            logger.debug(f"Video {video_id} shown to user {user_id}")
+        return self.record_videos_shown(user_id, [video_id])
+
+    def record_videos_shown(self, user_id: int, video_ids: List[str]) -> bool:
+        """
+        Record impressions so curation skips these videos for a while.
+
+        Written to video_impressions (durable) and to the user's Redis
+        sorted set (hot copy, trimmed to the window and max_per_user).
+
+        Args:
+            user_id: User ID
+            video_ids: Video IDs that were shown
+
+        Returns:
+            True if recorded, False on error
+        """
+        video_ids = [v for v in dict.fromkeys(video_ids) if v]
+        if not video_ids:
             return True
 
+        try:
+            now = datetime.utcnow()
+            db.session.bulk_insert_mappings(VideoImpression, [
+                {'user_id': user_id, 'video_id': video_id, 'shown_at': now}
+                for video_id in video_ids
+            ])
+            db.session.commit()
         except Exception as e:
-            logger.error(f"Error recording video shown: {e}")
+            db.session.rollback()
+            logger.error(f"Error recording videos shown for user {user_id}: {e}")
             return False
 
+        cache_service.add_recent(
+            self._impressions_key(user_id),
+            video_ids,
+            window_seconds=self._impression_window().total_seconds(),
+            max_items=CURATION_IMPRESSIONS['max_per_user']
+        )
+        self.invalidate_user(user_id)
+        return True
+
+    def get_recently_shown(self, user_id: int) -> set:
+        """
+        Video IDs shown to user within the impression window.
+
+        One ZRANGEBYSCORE on the user's sorted set; falls back to the
+        video_impressions index when Redis is unavailable.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Set of video IDs
+        """
+        window = self._impression_window()
+        recent = cache_service.get_recent(self._impressions_key(user_id), window.total_seconds())
+        if recent is not None:
+            return recent
+
+        try:
+            rows = db.session.query(VideoImpression.video_id).filter(
+                VideoImpression.user_id == user_id,
+                VideoImpression.shown_at >= datetime.utcnow() - window
+            ).distinct().all()
+            return {row[0] for row in rows}
+        except Exception as e:
+            logger.error(f"Error loading impressions for user {user_id}: {e}")
+            return set()
+
+    def prune_impressions(self) -> int:
+        """
+        Delete impressions older than every lookback window that reads them.
+
+        Runs in batches (one commit each) so the delete never holds long locks.
+
+        Returns:
+            Number of rows deleted
+        """
+        keep_days = max(CURATION_IMPRESSIONS['window_days'], CURATION_IMPRESSIONS['reinforce_window_days'])
+        cutoff = datetime.utcnow() - timedelta(days=keep_days)
+        deleted = 0
+
+        while True:
+            result = db.session.execute(text("""
+                DELETE FROM video_impressions
+                WHERE id IN (
+                    SELECT id FROM video_impressions
+                    WHERE shown_at < :cutoff
+                    LIMIT :batch
+                )
+            """), {'cutoff': cutoff, 'batch': CURATION_IMPRESSIONS['prune_batch_size']})
+            db.session.commit()
+            deleted += result.rowcount
+            if result.rowcount < CURATION_IMPRESSIONS['prune_batch_size']:
+                return deleted
+
+    def _impressions_key(self, user_id: int) -> str:
+        return f"{cache_service.PREFIX_IMPRESSIONS}:{user_id}"
+
+    def _impression_window(self) -> timedelta:
+        return timedelta(days=CURATION_IMPRESSIONS['window_days'])
+
     def get_video_stats(self, user_id: int, video_id: str) -> Optional[Dict[str, Any]]:
         """
         Get user's stats for a specific video.
@@ -203,30 +407,135 @@ class CurationService:
 
     def refresh_curation_cache(self, category_id: Optional[int] = None) -> int:
         """
-        Refresh the curation cache for a category.
+        Rebuild the per-category candidate index from tiktok_videos.
 
-        This could trigger a fresh scrape of videos if cache is stale.
+        Run after a scrape (or on a schedule) so new videos become
+        candidates and expired ones drop out.
 
         Args:
-            category_id: Optional category to refresh
+            category_id: Optional category to rebuild (default: all active)
 
         Returns:
-            Number of videos in cache
+            Number of candidate rows written
         """
         try:
-            # Count valid cached videos
-            count = TiktokVideo.query.filter(
+            categories = self._categories(category_id)
+            category_ids = [c.id for c, _ in categories]
+
+            VideoCategoryCandidate.query.filter(
+                VideoCategoryCandidate.category_id.in_(category_ids)
+            ).delete(synchronize_session=False)
+
+            videos = TiktokVideo.query.filter(
                 TiktokVideo.cache_expires_at > datetime.utcnow(),
                 TiktokVideo.quality_score >= MIN_QUALITY_SCORE
-            ).count()
+            ).yield_per(500)
+
+            count = self._write_candidates(videos, categories)
+            db.session.commit()
+
+            if self.pool is not None:
+                self.pool.invalidate_category(category_id)
 
-            logger.info(f"Curation cache has {count} valid videos")
+            logger.info(f"Curation index rebuilt: {count} candidates for {len(category_ids)} categories")
             return count
 
         except Exception as e:
+            db.session.rollback()
             logger.error(f"Error refreshing curation cache: {e}")
             return 0
 
+    def index_videos(self, video_ids: List[str]) -> int:
+        """
+        (Re)index specific videos, e.g. right after they were scraped.
+
+        Args:
+            video_ids: TikTok video IDs
+
+        Returns:
+            Number of candidate rows written
+        """
+        if not video_ids:
+            return 0
+
+        try:
+            VideoCategoryCandidate.query.filter(
+                VideoCategoryCandidate.video_id.in_(video_ids)
+            ).delete(synchronize_session=False)
+
+            videos = TiktokVideo.query.filter(
+                TiktokVideo.video_id.in_(video_ids),
+                TiktokVideo.cache_expires_at > datetime.utcnow(),
+                TiktokVideo.quality_score >= MIN_QUALITY_SCORE
+            ).all()
+
+            count = self._write_candidates(videos, self._categories())
+            db.session.commit()
+
+            if self.pool is not None:
+                self.pool.invalidate_category()
+            return count
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error indexing videos: {e}")
+            return 0
+
+    def _categories(self, category_id: Optional[int] = None) -> List[tuple]:
+        """Get [(category, match_keys)] for active categories."""
+        query = Category.query.filter(Category.is_active.is_(True))
+        if category_id:
+            query = query.filter(Category.id == category_id)
+
+        return [
+            (category, {k.lower() for k in (category.slug, category.code) if k})
+            for category in query.all()
+        ]
+
+    def _category_score(self, video: TiktokVideo, keys: set) -> Optional[float]:
+        """
+        Score of video for a category, or None if it doesn't match.
+
+        category_scores ({slug_or_code: score}) wins; a topic equal to the
+        category slug/code counts as a match at MIN_CATEGORY_SCORE.
+        """
+        scores = video.category_scores or {}
+        best = None
+        for key, value in scores.items():
+            if str(key).lower() in keys:
+                try:
+                    value = float(value)
+                except (TypeError, ValueError):
+                    continue
+                best = value if best is None else max(best, value)
+
+        if best is not None:
+            return best if best >= MIN_CATEGORY_SCORE else None
+
+        topics = {str(t).lower() for t in (video.topics or [])}
+        return MIN_CATEGORY_SCORE if topics & keys else None
+
+    def _write_candidates(self, videos: Iterable[TiktokVideo], categories: List[tuple]) -> int:
+        """Insert candidate rows for videos that match any of categories."""
+        rows = []
+        for video in videos:
+            for category, keys in categories:
+                score = self._category_score(video, keys)
+                if score is None:
+                    continue
+                rows.append({
+                    'category_id': category.id,
+                    'video_id': video.video_id,
+                    'creator_username': video.creator_username,
+                    'quality_score': video.quality_score,
+                    'category_score': min(score, 1.0),
+                    'expires_at': video.cache_expires_at,
+                })
+
+        if rows:
+            db.session.bulk_insert_mappings(VideoCategoryCandidate, rows)
+        return len(rows)
+
 
 # Singleton instance
 curation_service = CurationService()
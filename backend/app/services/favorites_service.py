@@ -7,22 +7,34 @@ Usage:
     from app.services.favorites_service import favorites_service
 
     favorites = favorites_service.get_favorites(user_id=1, limit=10)
+    page = favorites_service.get_favorites_page(user_id=1, limit=20, cursor=None)
     favorites_service.add_favorite(user_id=1, video_id='abc123')
+    favorites_service.import_favorites(user_id=1, video_ids=['abc123', 'def456'])
     favorites_service.remove_favorite(user_id=1, video_id='abc123')
-    random_video = favorites_service.get_random_favorite(user_id=1)
+    random_video = favorites_service.get_random_favorite(user_id=1, exclude_shown_days=7)
 """
 
 import logging
-import random
+from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 
+from sqlalchemy import select, func, cast, Integer, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 
 from app import db
-from app.models import UserLikedVideo, TiktokVideo
+from app.models import UserLikedVideo, TiktokVideo, VideoImpression, UserBehaviorStats
+from app.utils.errors import ValidationError
+from app.utils.pagination import encode_cursor, decode_cursor
 
 logger = logging.getLogger(__name__)
 
+# Max video IDs accepted by one import_favorites call
+MAX_IMPORT_SIZE = 1000
+
+# tiktok_videos.video_id / user_liked_videos.video_id column size
+MAX_VIDEO_ID_LENGTH = 50
+
 
 class FavoritesService:
     """Service for managing user's favorite videos."""
@@ -52,29 +64,7 @@ class FavoritesService:
                 UserLikedVideo.liked_at.desc()
             ).limit(limit).all()
 
-            result = []
-            for liked, video in favorites:
-                if video:
-                    # Full metadata available
-                    result.append({
-                        'video_id': liked.video_id,
-                        'video_url': video.url,
-                        'thumbnail_url': video.thumbnail_url,
-                        'creator_name': video.creator_username,
-                        'creator_display_name': video.creator_display_name,
-                        'duration_seconds': video.duration_sec,
-                        'description': video.description[:100] if video.description else None,
-                        'liked_at': liked.liked_at.isoformat() if liked.liked_at else None,
-                    })
-                else:
-                    # Video not in cache, minimal data
-                    result.append({
-                        'video_id': liked.video_id,
-                        'video_url': None,
-                        'thumbnail_url': None,
-                        'creator_name': None,
-                        'liked_at': liked.liked_at.isoformat() if liked.liked_at else None,
-                    })
+            result = [self._favorite_to_dict(liked, video) for liked, video in favorites]
 
             logger.info(f"Retrieved {len(result)} favorites for user {user_id}")
             return result
@@ -83,6 +73,75 @@ class FavoritesService:
             logger.error(f"Error getting favorites for user {user_id}: {e}")
             return []
 
+    def get_favorites_page(
+        self,
+        user_id: int,
+        limit: int = 10,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Get one page of favorites, most recent first, by keyset cursor.
+
+        Pages are WHERE (liked_at, id) < cursor over the
+        (user_id, liked_at DESC, id DESC) index, so every page costs the same.
+
+        Args:
+            user_id: User ID
+            limit: Page size
+            cursor: next_cursor from the previous page (None for first page)
+
+        Returns:
+            Dict with 'favorites', 'next_cursor' (None on last page) and 'total'
+
+        Raises:
+            ValidationError: If cursor is malformed
+        """
+        query = db.session.query(UserLikedVideo, TiktokVideo).outerjoin(
+            TiktokVideo, UserLikedVideo.video_id == TiktokVideo.video_id
+        ).filter(
+            UserLikedVideo.user_id == user_id
+        )
+
+        if cursor:
+            liked_at, row_id = decode_cursor(cursor)
+            query = query.filter(
+                tuple_(UserLikedVideo.liked_at, UserLikedVideo.id) < tuple_(liked_at, row_id)
+            )
+
+        # One extra row tells us whether there is a next page
+        rows = query.order_by(
+            UserLikedVideo.liked_at.desc(), UserLikedVideo.id.desc()
+        ).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1][0]
+            next_cursor = encode_cursor(last.liked_at, last.id)
+
+        return {
+            'favorites': [self._favorite_to_dict(liked, video) for liked, video in rows],
+            'next_cursor': next_cursor,
+            'total': self.get_favorites_count(user_id),
+        }
+
+    def _adjust_count(self, user_id: int, delta: int) -> None:
+        """
+        Add delta to user_behavior_stats.favorites_count (caller commits).
+
+        Upserts so users without a stats row yet get one.
+        """
+        stmt = pg_insert(UserBehaviorStats).values(
+            user_id=user_id, favorites_count=max(delta, 0)
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserBehaviorStats.user_id],
+            set_={
+                'favorites_count': func.greatest(UserBehaviorStats.favorites_count + delta, 0)
+            }
+        )
+        db.session.execute(stmt)
+
     def add_favorite(
         self,
         user_id: int,
@@ -115,6 +174,8 @@ class FavoritesService:
                 video_id=video_id
             )
             db.session.add(favorite)
+            db.session.flush()
+            self._adjust_count(user_id, 1)
             db.session.commit()
 
             logger.info(f"Added video {video_id} to favorites for user {user_id}")
@@ -130,6 +191,73 @@ class FavoritesService:
             logger.error(f"Error adding favorite for user {user_id}: {e}")
             raise
 
+    def import_favorites(
+        self,
+        user_id: int,
+        video_ids: List[str]
+    ) -> Dict[str, int]:
+        """
+        Add many videos to favorites in one transaction.
+
+        Missing tiktok_videos rows get minimal stubs (INSERT ... ON CONFLICT
+        DO NOTHING, so scraped metadata is never overwritten), then all
+        favorites go in with a single INSERT ... ON CONFLICT DO NOTHING.
+
+        Args:
+            user_id: User ID
+            video_ids: TikTok video IDs (at most MAX_IMPORT_SIZE)
+
+        Returns:
+            Dict with 'added', 'skipped' (already favorited or duplicated
+            in the request) and 'invalid' counts
+
+        Raises:
+            ValidationError: If more than MAX_IMPORT_SIZE IDs are given
+        """
+        if len(video_ids) > MAX_IMPORT_SIZE:
+            raise ValidationError(f'At most {MAX_IMPORT_SIZE} video IDs per import')
+
+        valid = [
+            v.strip() for v in video_ids
+            if isinstance(v, str) and v.strip() and len(v.strip()) <= MAX_VIDEO_ID_LENGTH
+        ]
+        invalid = len(video_ids) - len(valid)
+        unique_ids = list(dict.fromkeys(valid))
+
+        if not unique_ids:
+            return {'added': 0, 'skipped': len(valid), 'invalid': invalid}
+
+        try:
+            stubs = pg_insert(TiktokVideo).values([
+                {
+                    'video_id': video_id,
+                    'url': f'https://www.tiktok.com/@/video/{video_id}',
+                    'creator_username': '',
+                }
+                for video_id in unique_ids
+            ]).on_conflict_do_nothing(index_elements=[TiktokVideo.video_id])
+            db.session.execute(stubs)
+
+            favorites = pg_insert(UserLikedVideo).values([
+                {'user_id': user_id, 'video_id': video_id}
+                for video_id in unique_ids
+            ]).on_conflict_do_nothing(
+                constraint='uq_user_liked_videos_user_video'
+            ).returning(UserLikedVideo.video_id)
+            added = len(db.session.execute(favorites).fetchall())
+
+            if added:
+                self._adjust_count(user_id, added)
+            db.session.commit()
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error importing favorites for user {user_id}: {e}")
+            raise
+
+        logger.info(f"Imported {added}/{len(unique_ids)} favorites for user {user_id}")
+        return {'added': added, 'skipped': len(valid) - added, 'invalid': invalid}
+
     def remove_favorite(
         self,
         user_id: int,
@@ -156,6 +284,7 @@ class FavoritesService:
                 return False
 
             db.session.delete(favorite)
+            self._adjust_count(user_id, -1)
             db.session.commit()
 
             logger.info(f"Removed video {video_id} from favorites for user {user_id}")
@@ -168,63 +297,95 @@ class FavoritesService:
 
     def get_random_favorite(
         self,
-        user_id: int
+        user_id: int,
+        exclude_shown_days: Optional[int] = None
     ) -> Optional[Dict[str, Any]]:
         """
         Get a random favorite video for the Reinforce step.
 
+        One round trip: OFFSET floor(random() * count) over the user's
+        (user_id, liked_at) index, with video metadata joined in.
+
         Args:
             user_id: User ID
+            exclude_shown_days: Prefer favorites not shown (video_impressions)
+                in this many days; falls back to any favorite if all were
 
         Returns:
             Video dict or None if no favorites
         """
         try:
-            # Get all user's favorites
-            favorites = UserLikedVideo.query.filter_by(
-                user_id=user_id
-            ).all()
-
-            if not favorites:
+            row = None
+            if exclude_shown_days:
+                since = datetime.utcnow() - timedelta(days=exclude_shown_days)
+                shown_recently = db.session.query(VideoImpression.id).filter(
+                    VideoImpression.user_id == user_id,
+                    VideoImpression.video_id == UserLikedVideo.video_id,
+                    VideoImpression.shown_at >= since
+                ).exists()
+                row = self._sample_favorite(user_id, [~shown_recently])
+
+            if row is None:
+                row = self._sample_favorite(user_id, [])
+
+            if row is None:
                 logger.debug(f"No favorites found for user {user_id}")
                 return None
 
-            # Pick a random one
-            chosen = random.choice(favorites)
-
-            # Get video metadata if available
-            video = TiktokVideo.query.filter_by(
-                video_id=chosen.video_id
-            ).first()
-
-            if video:
-                return {
-                    'video_id': chosen.video_id,
-                    'video_url': video.url,
-                    'thumbnail_url': video.thumbnail_url,
-                    'creator_name': video.creator_username,
-                    'creator_display_name': video.creator_display_name,
-                    'duration_seconds': video.duration_sec,
-                    'description': video.description[:100] if video.description else None,
-                    'liked_at': chosen.liked_at.isoformat() if chosen.liked_at else None,
-                }
-            else:
-                return {
-                    'video_id': chosen.video_id,
-                    'video_url': None,
-                    'thumbnail_url': None,
-                    'creator_name': None,
-                    'liked_at': chosen.liked_at.isoformat() if chosen.liked_at else None,
-                }
+            liked, video = row
+            return self._favorite_to_dict(liked, video)
 
         except Exception as e:
             logger.error(f"Error getting random favorite for user {user_id}: {e}")
             return None
 
+    def _sample_favorite(self, user_id: int, filters: List[Any]) -> Optional[tuple]:
+        """Pick one (UserLikedVideo, TiktokVideo|None) uniformly at random."""
+        conditions = [UserLikedVideo.user_id == user_id, *filters]
+
+        total = select(func.count(UserLikedVideo.id)).where(*conditions).scalar_subquery()
+        offset = cast(func.floor(func.random() * total), Integer)
+
+        stmt = select(UserLikedVideo, TiktokVideo).outerjoin(
+            TiktokVideo, UserLikedVideo.video_id == TiktokVideo.video_id
+        ).where(
+            *conditions
+        ).order_by(
+            UserLikedVideo.liked_at, UserLikedVideo.id
+        ).offset(offset).limit(1)
+
+        return db.session.execute(stmt).first()
+
+    def _favorite_to_dict(self, liked: UserLikedVideo, video: Optional[TiktokVideo]) -> Dict[str, Any]:
+        """Convert a favorite (+ cached video metadata, if any) to response format."""
+        if video:
+            # Full metadata available
+            return {
+                'video_id': liked.video_id,
+                'video_url': video.url,
+                'thumbnail_url': video.thumbnail_url,
+                'creator_name': video.creator_username,
+                'creator_display_name': video.creator_display_name,
+                'duration_seconds': video.duration_sec,
+                'description': video.description[:100] if video.description else None,
+                'liked_at': liked.liked_at.isoformat() if liked.liked_at else None,
+            }
+        # Video not in cache, minimal data
+        return {
+            'video_id': liked.video_id,
+            'video_url': None,
+            'thumbnail_url': None,
+            'creator_name': None,
+            'liked_at': liked.liked_at.isoformat() if liked.liked_at else None,
+        }
+
     def get_favorites_count(self, user_id: int) -> int:
         """
         Get count of user's favorites.
 
+        Reads the counter maintained on add/remove; only users without a
+        stats row fall back to COUNT(*).
+
         Args:
             user_id: User ID
 
@@ -232,6 +393,11 @@ class FavoritesService:
             Number of favorites
         """
         try:
+            stored = db.session.query(UserBehaviorStats.favorites_count).filter(
+                UserBehaviorStats.user_id == user_id
+            ).scalar()
+            if stored is not None:
+                return stored
             return UserLikedVideo.query.filter_by(user_id=user_id).count()
         except Exception as e:
             logger.error(f"Error counting favorites for user {user_id}: {e}")
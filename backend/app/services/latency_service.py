@@ -0,0 +1,199 @@
+"""
+Latency Service - Streaming per-endpoint latency histograms.
+
+Each worker records request latencies into in-process LatencyHistograms
+keyed by (method, route). A daemon thread pushes and resets them every
+LATENCY_HISTOGRAMS['flush_interval'] seconds into a per-minute Redis hash,
+so any process (dashboard, cron) can merge the last N minutes from all
+workers and read p50/p95/p99 without scanning request_logs.
+
+Redis layout: latency:{epoch_minute} -> {"GET /api/x|<bucket>": count,
+"GET /api/x|n": count, "GET /api/x|s": sum_ms}
+
+Usage:
+    latency_service.observe('GET', '/api/v2/plan/today', 12.5)
+    latency_service.get_summary(window_minutes=60)
+"""
+
+import atexit
+import os
+import threading
+import time
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from app.config.constants import LATENCY_HISTOGRAMS
+from app.services.cache_service import cache_service
+from app.utils.histogram import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyService:
+    """Per-endpoint latency histograms merged across workers through Redis."""
+
+    def __init__(
+        self,
+        flush_interval: int = LATENCY_HISTOGRAMS['flush_interval'],
+        window_minutes: int = LATENCY_HISTOGRAMS['window_minutes'],
+        retention_minutes: int = LATENCY_HISTOGRAMS['retention_minutes']
+    ):
+        self.flush_interval = flush_interval
+        self.window_minutes = window_minutes
+        self.retention_minutes = retention_minutes
+
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._stopping = threading.Event()
+
+    # === Recording ===
+
+    def observe(self, method: str, endpoint: str, ms: float) -> None:
+        """
+        Record one request latency.
+
+        Args:
+            method: HTTP method
+            endpoint: Route template (e.g. '/api/v2/plan/<plan_id>'), not the raw path
+            ms: Latency in milliseconds
+        """
+        with self._lock:
+            hist = self._pending.get((method, endpoint))
+            if hist is None:
+                hist = self._pending[(method, endpoint)] = LatencyHistogram()
+            hist.observe(ms)
+
+        self._ensure_thread()
+
+    def _ensure_thread(self) -> None:
+        """Start the flusher thread lazily; restart it in forked workers."""
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._thread is not None and self._pid == pid and self._thread.is_alive():
+                return
+            if self._pid is None:
+                atexit.register(self.flush)
+            elif self._pid != pid:
+                # Forked from the master: its samples are not ours to report
+                self._pending = {}
+            self._pid = pid
+            self._thread = threading.Thread(target=self._run, name='latency-flusher', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        """Flusher thread loop."""
+        while not self._stopping.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Latency flush failed: {e}")
+
+    @staticmethod
+    def _minute_key(minute: int) -> str:
+        return f"{cache_service.PREFIX_LATENCY}:{minute}"
+
+    def flush(self) -> bool:
+        """
+        Push pending histograms into the current minute's Redis hash and reset them.
+
+        Returns:
+            False if Redis was unavailable (the samples are dropped; readers
+            fall back to request_logs)
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        if not pending:
+            return True
+
+        increments: Dict[str, float] = {}
+        for (method, endpoint), hist in pending.items():
+            prefix = f"{method} {endpoint}"
+            for i, count in enumerate(hist.counts):
+                if count:
+                    increments[f"{prefix}|{i}"] = count
+            increments[f"{prefix}|n"] = hist.count
+            increments[f"{prefix}|s"] = float(hist.sum_ms)
+
+        minute = int(time.time() // 60)
+        return cache_service.incr_hash(
+            self._minute_key(minute), increments, ttl=self.retention_minutes * 60
+        )
+
+    # === Reading ===
+
+    def _merged(self, window_minutes: int) -> Optional[Dict[Tuple[str, str], LatencyHistogram]]:
+        """Histograms for the last window_minutes merged across workers, or None without Redis."""
+        current = int(time.time() // 60)
+        keys = [self._minute_key(minute) for minute in range(current - window_minutes + 1, current + 1)]
+
+        hashes = cache_service.get_hashes(keys)
+        if hashes is None:
+            return None
+
+        merged: Dict[Tuple[str, str], LatencyHistogram] = {}
+        for fields in hashes:
+            for field, value in fields.items():
+                name, _, slot = field.rpartition('|')
+                method, _, endpoint = name.partition(' ')
+                hist = merged.get((method, endpoint))
+                if hist is None:
+                    hist = merged[(method, endpoint)] = LatencyHistogram()
+                if slot == 'n':
+                    hist.count += int(value)
+                elif slot == 's':
+                    hist.sum_ms += float(value)
+                elif slot.isdigit() and int(slot) < len(hist.counts):
+                    hist.counts[int(slot)] += int(value)
+        return merged
+
+    def get_summary(self, window_minutes: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        p50/p95/p99 overall and per endpoint for the last window_minutes.
+
+        Args:
+            window_minutes: Look-back window (default LATENCY_HISTOGRAMS['window_minutes'])
+
+        Returns:
+            Dict with window_minutes, overall and endpoints (slowest p95 first),
+            or None if Redis is unavailable
+        """
+        window_minutes = window_minutes or self.window_minutes
+        merged = self._merged(window_minutes)
+        if merged is None:
+            return None
+
+        overall = LatencyHistogram()
+        endpoints = []
+        for (method, endpoint), hist in merged.items():
+            overall.merge(hist)
+            endpoints.append({'method': method, 'endpoint': endpoint, **hist.to_dict()})
+
+        endpoints.sort(key=lambda e: e['p95_ms'], reverse=True)
+        return {
+            'window_minutes': window_minutes,
+            'overall': overall.to_dict(),
+            'endpoints': endpoints,
+        }
+
+    def get_p95(self, window_minutes: Optional[int] = None) -> Optional[float]:
+        """
+        Overall p95 latency in ms for the window.
+
+        Returns:
+            p95 in milliseconds, or None if Redis is unavailable or there
+            are no samples (caller should fall back to request_logs)
+        """
+        summary = self.get_summary(window_minutes)
+        if summary is None or summary['overall']['count'] == 0:
+            return None
+        return summary['overall']['p95_ms']
+
+
+# Singleton
+latency_service = LatencyService()
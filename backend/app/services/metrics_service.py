@@ -5,15 +5,83 @@ Extracted from routes/admin_metrics.py for proper separation of concerns.
 """
 
 import logging
+from collections import defaultdict
 from datetime import date, datetime, timedelta
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 
-from sqlalchemy import func, text
+from sqlalchemy import and_, case, func, text
 from app import db
-from app.models import User, AnalyticsEvent, RequestLog, AIRequestLog
+from app.models import User, AnalyticsEvent, RequestLog, AIRequestLog, MetricsDaily
+from app.services.latency_service import latency_service
 
 logger = logging.getLogger(__name__)
 
+# Event types counted per day for plan metrics
+ROLLUP_EVENT_TYPES = ['plan_viewed', 'detox_completed', 'watch_completed', 'reinforce_completed', 'plan_completed']
+
+# Signal averaged from event_data -> event type carrying it
+SIGNAL_EVENT_TYPES = {
+    'blocks': 'detox_completed',
+    'watches_full': 'watch_completed',
+    'likes': 'watch_completed',
+    'follows': 'watch_completed',
+    'shares': 'reinforce_completed'
+}
+
+# Challenge funnel stages: event types and the event_data 'day' thresholds
+FUNNEL_EVENT_TYPES = ['challenge_started', 'plan_viewed', 'challenge_day_completed', 'plan_completed']
+FUNNEL_DAYS = (0, 1, 3, 7)
+
+ROLLUP_METRICS = ['event_count', 'signal_sum', 'duration_sum', 'duration_count', 'funnel_new_users']
+# Written once per rolled-up day, so days without events still count as done
+ROLLUP_MARKER = 'rollup_complete'
+# Live aggregation start when nothing has been rolled up yet
+ROLLUP_EPOCH = datetime(2020, 1, 1)
+
+# Users reaching each funnel threshold for the first time within [start, end).
+# Column order matches FUNNEL_DAYS; 'day 0' is the first event of the type at all.
+# event_data is client-sent, so a 'day' that isn't a JSON number counts as 0.
+FUNNEL_FIRST_REACHED_SQL = text("""
+    WITH range_users AS (
+        SELECT user_id, MAX(COALESCE(
+            CASE WHEN jsonb_typeof(event_data->'day') = 'number' THEN (event_data->>'day')::numeric END, 0
+        )) AS max_day
+        FROM analytics_events
+        WHERE event_type = :event_type
+          AND created_at >= :start AND created_at < :end
+          AND user_id IS NOT NULL
+        GROUP BY user_id
+    ),
+    prior AS (
+        SELECT e.user_id, MAX(COALESCE(
+            CASE WHEN jsonb_typeof(e.event_data->'day') = 'number' THEN (e.event_data->>'day')::numeric END, 0
+        )) AS max_day
+        FROM analytics_events e
+        JOIN range_users r ON r.user_id = e.user_id
+        WHERE e.event_type = :event_type
+          AND e.created_at < :start
+        GROUP BY e.user_id
+    )
+    SELECT
+        COUNT(*) FILTER (WHERE p.user_id IS NULL),
+        COUNT(*) FILTER (WHERE r.max_day >= 1 AND COALESCE(p.max_day, 0) < 1),
+        COUNT(*) FILTER (WHERE r.max_day >= 3 AND COALESCE(p.max_day, 0) < 3),
+        COUNT(*) FILTER (WHERE r.max_day >= 7 AND COALESCE(p.max_day, 0) < 7)
+    FROM range_users r
+    LEFT JOIN prior p ON p.user_id = r.user_id
+""")
+
+
+def _json_number(key: str):
+    """event_data[key] as a float, NULL unless it is a JSON number (event_data is client-sent)."""
+    value = AnalyticsEvent.event_data[key]
+    return case((func.jsonb_typeof(value) == 'number', value.astext.cast(db.Float)))
+
+
+def _metric_key(name: str, **dimensions) -> Tuple:
+    """Hashable key for a metric name and its dimensions."""
+    return (name, tuple(sorted(dimensions.items())))
+
 
 class MetricsService:
     """Service for admin dashboard metrics."""
@@ -52,6 +120,139 @@ class MetricsService:
             'total_users': total_users
         }
 
+    # === Daily rollups ===
+
+    def _rollup_events(self, start: datetime, end: datetime) -> List[Tuple[str, Dict[str, Any], float]]:
+        """
+        Aggregate analytics_events in [start, end) into rollup rows.
+
+        Every value is additive across days: counts and sums for averages,
+        and funnel users counted only on the day they first reach a stage.
+
+        Args:
+            start: Range start (inclusive)
+            end: Range end (exclusive)
+
+        Returns:
+            List of (metric_name, dimensions, value)
+        """
+        in_range = and_(AnalyticsEvent.created_at >= start, AnalyticsEvent.created_at < end)
+        event_type = AnalyticsEvent.event_type
+
+        columns = [
+            func.count(AnalyticsEvent.id).filter(event_type == et) for et in ROLLUP_EVENT_TYPES
+        ]
+        columns += [
+            func.sum(
+                func.coalesce(_json_number(signal), 0)
+            ).filter(event_type == et)
+            for signal, et in SIGNAL_EVENT_TYPES.items()
+        ]
+        duration = _json_number('duration_seconds')
+        columns += [
+            func.sum(duration).filter(event_type == 'plan_completed'),
+            func.count(duration).filter(event_type == 'plan_completed'),
+        ]
+
+        row = db.session.query(*columns).filter(in_range).one()
+        values = iter(row)
+
+        rows = [('event_count', {'event_type': et}, next(values) or 0) for et in ROLLUP_EVENT_TYPES]
+        rows += [
+            ('signal_sum', {'event_type': et, 'signal': signal}, next(values) or 0)
+            for signal, et in SIGNAL_EVENT_TYPES.items()
+        ]
+        rows.append(('duration_sum', {'event_type': 'plan_completed'}, next(values) or 0))
+        rows.append(('duration_count', {'event_type': 'plan_completed'}, next(values) or 0))
+
+        for et in FUNNEL_EVENT_TYPES:
+            reached = db.session.execute(
+                FUNNEL_FIRST_REACHED_SQL, {'event_type': et, 'start': start, 'end': end}
+            ).one()
+            for day, users in zip(FUNNEL_DAYS, reached):
+                rows.append(('funnel_new_users', {'event_type': et, 'day': day}, users or 0))
+
+        return rows
+
+    def rollup_day(self, day: date) -> int:
+        """
+        Fold one day's analytics events into metrics_daily.
+
+        Idempotent: the day's rollup rows are replaced, not added to.
+
+        Args:
+            day: Day to roll up
+
+        Returns:
+            Number of metric rows written
+        """
+        start = datetime.combine(day, datetime.min.time())
+        rows = self._rollup_events(start, start + timedelta(days=1))
+
+        try:
+            # The marker is replaced too (uq_metrics_daily), so re-running a day is safe
+            MetricsDaily.query.filter(
+                MetricsDaily.metric_date == day,
+                MetricsDaily.metric_name.in_(ROLLUP_METRICS + [ROLLUP_MARKER])
+            ).delete(synchronize_session=False)
+
+            db.session.bulk_insert_mappings(MetricsDaily, [
+                {'metric_date': day, 'metric_name': name, 'dimensions': dims, 'metric_value': value}
+                for name, dims, value in rows
+            ] + [
+                {'metric_date': day, 'metric_name': ROLLUP_MARKER, 'dimensions': {}, 'metric_value': 1}
+            ])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        return len(rows)
+
+    def get_last_rollup_date(self) -> Optional[date]:
+        """Latest day that has been fully rolled up, if any."""
+        return db.session.query(
+            func.max(MetricsDaily.metric_date)
+        ).filter(
+            MetricsDaily.metric_name == ROLLUP_MARKER
+        ).scalar()
+
+    def _event_totals(self) -> Dict[Tuple, float]:
+        """
+        All-time event aggregates: stored rollups plus a live partial.
+
+        Days after the last rollup (normally just today) are aggregated on
+        the fly from analytics_events.
+
+        Returns:
+            Dict keyed by _metric_key(name, **dimensions)
+        """
+        last_rollup = self.get_last_rollup_date()
+        totals: Dict[Tuple, float] = defaultdict(float)
+
+        if last_rollup is not None:
+            live_start = datetime.combine(last_rollup + timedelta(days=1), datetime.min.time())
+            stored = db.session.query(
+                MetricsDaily.metric_name,
+                MetricsDaily.dimensions,
+                func.sum(MetricsDaily.metric_value)
+            ).filter(
+                MetricsDaily.metric_date <= last_rollup,
+                MetricsDaily.metric_name.in_(ROLLUP_METRICS)
+            ).group_by(
+                MetricsDaily.metric_name, MetricsDaily.dimensions
+            ).all()
+
+            for name, dims, value in stored:
+                totals[_metric_key(name, **(dims or {}))] += float(value or 0)
+        else:
+            live_start = ROLLUP_EPOCH
+
+        for name, dims, value in self._rollup_events(live_start, datetime.utcnow() + timedelta(days=1)):
+            totals[_metric_key(name, **dims)] += float(value or 0)
+
+        return totals
+
     def get_challenge_metrics(self) -> Dict[str, Any]:
         """
         Get challenge funnel metrics.
@@ -59,40 +260,26 @@ class MetricsService:
         Returns:
             Dict with funnel array and d7_completion_rate
         """
-        # Get users who started challenge (day 0)
-        started_users = db.session.query(
-            func.count(func.distinct(AnalyticsEvent.user_id))
-        ).filter(
-            AnalyticsEvent.event_type == 'challenge_started'
-        ).scalar() or 0
+        totals = self._event_totals()
+
+        def reached(event_type: str, day: int) -> int:
+            # Each user is counted once, on the day they first reached the threshold
+            return int(totals[_metric_key('funnel_new_users', event_type=event_type, day=day)])
 
+        # Users who started challenge (day 0)
+        started_users = reached('challenge_started', 0)
         if started_users == 0:
-            # Fallback: count users with any plan_viewed event
-            started_users = db.session.query(
-                func.count(func.distinct(AnalyticsEvent.user_id))
-            ).filter(
-                AnalyticsEvent.event_type == 'plan_viewed'
-            ).scalar() or 1
+            # Fallback: users with any plan_viewed event
+            started_users = reached('plan_viewed', 0) or 1
 
         funnel = [{'day': 0, 'count': started_users, 'percent': 100.0}]
 
-        # Get counts for each day milestone
         for day in [1, 3, 7]:
-            day_count = db.session.query(
-                func.count(func.distinct(AnalyticsEvent.user_id))
-            ).filter(
-                AnalyticsEvent.event_type == 'challenge_day_completed',
-                AnalyticsEvent.event_data['day'].astext.cast(db.Integer) >= day
-            ).scalar() or 0
+            day_count = reached('challenge_day_completed', day)
 
             # Fallback: count plan_completed events
             if day_count == 0:
-                day_count = db.session.query(
-                    func.count(func.distinct(AnalyticsEvent.user_id))
-                ).filter(
-                    AnalyticsEvent.event_type == 'plan_completed',
-                    AnalyticsEvent.event_data['day'].astext.cast(db.Integer) >= day
-                ).scalar() or 0
+                day_count = reached('plan_completed', day)
 
             percent = round((day_count / started_users) * 100, 1) if started_users > 0 else 0
             funnel.append({'day': day, 'count': day_count, 'percent': percent})
@@ -111,59 +298,32 @@ class MetricsService:
         Returns:
             Dict with step_completion, avg_duration_seconds, signals
         """
+        totals = self._event_totals()
+
+        def count(event_type: str) -> float:
+            return totals[_metric_key('event_count', event_type=event_type)]
+
         # Total plans started (plan_viewed events)
-        total_plans = db.session.query(
-            func.count(AnalyticsEvent.id)
-        ).filter(
-            AnalyticsEvent.event_type == 'plan_viewed'
-        ).scalar() or 1
+        total_plans = count('plan_viewed') or 1
 
         # Step completions
-        step_types = ['detox', 'watch', 'reinforce']
         step_completion = {}
-
-        for step in step_types:
-            completed = db.session.query(
-                func.count(AnalyticsEvent.id)
-            ).filter(
-                AnalyticsEvent.event_type == f'{step}_completed'
-            ).scalar() or 0
-
+        for step in ['detox', 'watch', 'reinforce']:
+            completed = count(f'{step}_completed')
             step_name = 'clear' if step == 'detox' else step
             step_completion[step_name] = round((completed / total_plans) * 100, 1) if total_plans > 0 else 0
 
         # Average signal counts from event_data
-        signal_types = {
-            'blocks': 'detox_completed',
-            'watches_full': 'watch_completed',
-            'likes': 'watch_completed',
-            'follows': 'watch_completed',
-            'shares': 'reinforce_completed'
-        }
-
         signals = {}
-        for signal, event_type in signal_types.items():
-            result = db.session.query(
-                func.avg(
-                    func.coalesce(
-                        AnalyticsEvent.event_data[signal].astext.cast(db.Float),
-                        0
-                    )
-                )
-            ).filter(
-                AnalyticsEvent.event_type == event_type
-            ).scalar()
-
-            signals[signal] = round(float(result), 1) if result else 0
+        for signal, event_type in SIGNAL_EVENT_TYPES.items():
+            events = count(event_type)
+            total = totals[_metric_key('signal_sum', event_type=event_type, signal=signal)]
+            signals[signal] = round(total / events, 1) if events else 0
 
         # Average duration (from plan_completed events)
-        avg_duration = db.session.query(
-            func.avg(
-                AnalyticsEvent.event_data['duration_seconds'].astext.cast(db.Integer)
-            )
-        ).filter(
-            AnalyticsEvent.event_type == 'plan_completed'
-        ).scalar()
+        duration_count = totals[_metric_key('duration_count', event_type='plan_completed')]
+        duration_sum = totals[_metric_key('duration_sum', event_type='plan_completed')]
+        avg_duration = duration_sum / duration_count if duration_count else None
 
         return {
             'step_completion': step_completion,
@@ -183,26 +343,25 @@ class MetricsService:
         today = date.today()
         today_start = datetime.combine(today, datetime.min.time())
 
-        # P95 latency from request_logs (last hour)
-        latency_p95 = db.session.execute(text("""
-            SELECT PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY latency_ms)
-            FROM request_logs
-            WHERE created_at >= :hour_ago
-        """), {'hour_ago': hour_ago}).scalar()
-
-        # Error rate (4xx and 5xx)
-        total_requests = db.session.query(
-            func.count(RequestLog.id)
+        # P95 latency from the streaming histograms (last hour)
+        latency_p95 = latency_service.get_p95(window_minutes=60)
+        if latency_p95 is None:
+            # Fallback without Redis: sort request_logs
+            latency_p95 = db.session.execute(text("""
+                SELECT PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY latency_ms)
+                FROM request_logs
+                WHERE created_at >= :hour_ago
+            """), {'hour_ago': hour_ago}).scalar()
+
+        # Error rate (4xx and 5xx), both counts in one pass
+        total_requests, error_requests = db.session.query(
+            func.count(RequestLog.id),
+            func.count(RequestLog.id).filter(RequestLog.status >= 400)
         ).filter(
             RequestLog.created_at >= hour_ago
-        ).scalar() or 1
-
-        error_requests = db.session.query(
-            func.count(RequestLog.id)
-        ).filter(
-            RequestLog.created_at >= hour_ago,
-            RequestLog.status >= 400
-        ).scalar() or 0
+        ).one()
+        total_requests = total_requests or 1
+        error_requests = error_requests or 0
 
         error_rate = round((error_requests / total_requests) * 100, 2) if total_requests > 0 else 0
 
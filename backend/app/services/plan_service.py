@@ -2,6 +2,8 @@ from datetime import date
 from app.models import Plan, Category, UserProgress
 from app import db
 from app.utils.errors import NotFoundError, APIError
+from app.services.toxic_detection_service import toxic_detection_service
+from app.services.curation_service import curation_service
 
 class PlanService:
     def get_plans(self, category_code=None, language='en', limit=20, offset=0):
@@ -65,9 +67,13 @@ class PlanService:
     def complete_step(self, user_id, step_id):
         from datetime import datetime
         progress = UserProgress.query.filter_by(user_id=user_id, step_id=step_id).first()
+        viewed = progress is None
+        completed = viewed or progress.completed_at is None
         if not progress:
             progress = UserProgress(user_id=user_id, step_id=step_id)
             db.session.add(progress)
         progress.completed_at = datetime.utcnow()
+        toxic_detection_service.record_step_progress(user_id, step_id, viewed, completed)
         db.session.commit()
+        curation_service.invalidate_user(user_id)
         return {'step_id': step_id, 'completed': True}
@@ -13,22 +13,42 @@ Usage:
 """
 
 import logging
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime, date
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable
+
+from flask import current_app
 
 from app import db
+from app.config.constants import PLAN_STEP_TIMEOUTS, CURATION_IMPRESSIONS
 from app.models import Plan, Challenge, Category
 from app.services.cache_service import cache_service
 from app.services.toxic_detection_service import toxic_detection_service
 from app.services.curation_service import curation_service
 from app.services.favorites_service import favorites_service
+from app.utils import query_counter, server_timing
 
 logger = logging.getLogger(__name__)
 
 # Target signals per day (54 = 6 hours x 9 actions per hour estimate)
 TARGET_SIGNALS = 54
 
+# Shared pool for step fetches. A step that misses its deadline keeps running
+# here until its queries return, so the pool also bounds that leftover work.
+_step_pool = ThreadPoolExecutor(max_workers=12, thread_name_prefix='plan-step')
+
+
+def _run_in_app_context(app, timings, counter, fn: Callable, *args, **kwargs) -> Any:
+    """Run fn in a fresh app context (own DB session), timed and counted into the caller's request."""
+    with app.app_context(), query_counter.attached(counter):
+        server_timing.attach(timings)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            db.session.remove()
+
 
 class PlanServiceV2:
     """Service for generating Plan v2.0 with Clear/Watch/Reinforce steps."""
@@ -56,80 +76,268 @@ class PlanServiceV2:
                 category = Category.query.get(category_id)
                 category_slug = category.slug if category else str(category_id)
 
-            # Check cache first
-            cached = cache_service.get_guided_plan(user_id, category_slug)
-            if cached:
-                logger.info(f"Returning cached plan for user {user_id}")
-                return cached
+            # Cached per user/category/day; concurrent misses share one build
+            plan = cache_service.get_or_create_guided_plan(
+                user_id,
+                category_slug,
+                lambda: self._build_plan(user_id, category_id, category_slug)
+            )
+
+            # Don't keep a degraded plan for the day; the next request retries
+            if plan and plan.get('degraded_steps'):
+                cache_service.invalidate_guided_plan(user_id, category_slug)
+
+            return plan
+
+        except Exception as e:
+            logger.error(f"Error generating plan for user {user_id}: {e}")
+            raise
+
+    def warm_plan(self, user_id: int, category_id: int, category_slug: str) -> bool:
+        """
+        Pre-build today's plan as a draft, without persisting anything.
+
+        The draft holds the step contents only. The challenge, video
+        impressions and Plan row are written when the user actually requests
+        the plan (see _build_plan), so warming never makes a user look active.
+
+        Args:
+            user_id: User ID
+            category_id: Category ID
+            category_slug: Category slug (cache key)
+
+        Returns:
+            True if a complete draft was stored
+        """
+        step_futures = self._submit_step_fetches(user_id, category_id)
+        day = self._preview_challenge_day(user_id, category_id)
+        draft = self._assemble_plan(user_id, category_id, step_futures, day)
+
+        if draft['degraded_steps']:
+            return False
+        return cache_service.set_guided_plan_draft(user_id, category_slug, draft)
+
+    def _build_plan(self, user_id: int, category_id: int, category_slug: str) -> Dict[str, Any]:
+        """
+        Build and persist a new plan v2.0 (cache miss path).
+
+        Uses today's warm-up draft when there is one; otherwise fetches the
+        steps now.
+
+        Args:
+            user_id: User ID
+            category_id: Category ID
+            category_slug: Category slug (draft cache key)
+
+        Returns:
+            Plan dict with steps structure
+        """
+        plan = cache_service.pop_guided_plan_draft(user_id, category_slug)
 
-            # Get or create active challenge
+        if plan is not None:
             challenge = self._get_or_create_challenge(user_id, category_id)
+        else:
+            # Step inputs are independent: fetch them while the challenge is resolved
+            step_futures = self._submit_step_fetches(user_id, category_id)
+            challenge = self._get_or_create_challenge(user_id, category_id)
+            plan = self._assemble_plan(user_id, category_id, step_futures, challenge.current_day)
 
-            # Step 1: CLEAR - Get toxic creators
-            toxic_creators = toxic_detection_service.get_toxic_creators(
-                user_id=user_id,
-                category_id=category_id,
-                limit=5
-            )
+        return self._persist_plan(user_id, category_id, challenge, plan)
 
-            # Step 2: WATCH - Get curated videos
-            curated_videos = curation_service.get_curated_videos(
-                user_id=user_id,
-                category_id=category_id,
-                count=4
-            )
+    def _assemble_plan(
+        self,
+        user_id: int,
+        category_id: int,
+        step_futures: Dict[str, tuple],
+        day_of_challenge: int
+    ) -> Dict[str, Any]:
+        """
+        Collect the step fetches into a plan dict (nothing is written).
+
+        Args:
+            user_id: User ID
+            category_id: Category ID
+            step_futures: Output of _submit_step_fetches
+            day_of_challenge: Challenge day shown in the plan
+
+        Returns:
+            Plan dict with steps structure
+        """
+        steps, degraded_steps = self._collect_step_results(step_futures)
+
+        return {
+            'plan_id': str(uuid.uuid4()),
+            'user_id': user_id,
+            'category_id': category_id,
+            'day_of_challenge': day_of_challenge,
+            'created_at': datetime.utcnow().isoformat(),
+            'steps': {
+                'clear': {
+                    'type': 'CLEAR',
+                    'title': 'Digital Detox',
+                    'description': 'Block creators that drain your energy',
+                    'toxic_creators': steps['clear'],
+                    'completed': False
+                },
+                'watch': {
+                    'type': 'WATCH',
+                    'title': 'Mindful Watching',
+                    'description': 'Watch these inspiring videos',
+                    'videos': steps['watch'],
+                    'completed': False
+                },
+                'reinforce': {
+                    'type': 'REINFORCE',
+                    'title': 'Reinforce the Good',
+                    'description': 'Rewatch your favorite and share',
+                    'favorite_video': steps['reinforce'],
+                    'show_share': day_of_challenge >= 3,
+                    'completed': False
+                }
+            },
+            'target_signals': TARGET_SIGNALS,
+            'degraded_steps': degraded_steps
+        }
+
+    def _persist_plan(
+        self,
+        user_id: int,
+        category_id: int,
+        challenge: Challenge,
+        plan: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Record impressions and save the plan for the user's current challenge day.
+
+        Args:
+            user_id: User ID
+            category_id: Category ID
+            challenge: Active challenge
+            plan: Plan dict from _assemble_plan (updated in place)
+
+        Returns:
+            The plan with day_of_challenge and db_id set
+        """
+        plan['day_of_challenge'] = challenge.current_day
+        plan['steps']['reinforce']['show_share'] = challenge.current_day >= 3
 
+        # Log impressions so the next plans don't repeat these videos
+        shown_ids = [video['video_id'] for video in plan['steps']['watch']['videos']]
+        favorite_video = plan['steps']['reinforce']['favorite_video']
+        if favorite_video:
+            shown_ids.append(favorite_video['video_id'])
+        curation_service.record_videos_shown(user_id, shown_ids)
+
+        # Save to DB
+        db_plan = self._save_plan(user_id, category_id, challenge.id, plan)
+        plan['db_id'] = db_plan.id
+
+        logger.info(f"Generated plan v2 for user {user_id}, challenge day {challenge.current_day}")
+        return plan
+
+    def _submit_step_fetches(self, user_id: int, category_id: int) -> Dict[str, tuple]:
+        """
+        Start the CLEAR, WATCH and REINFORCE fetches concurrently.
+
+        Each fetch runs in its own app context, i.e. with its own session
+        and connection; its SQL is still timed into the request's
+        Server-Timing breakdown.
+
+        Args:
+            user_id: User ID
+            category_id: Category ID
+
+        Returns:
+            {step: (future, deadline, default)} with monotonic deadlines
+        """
+        app = current_app._get_current_object()
+        timings = server_timing.current()
+        counter = query_counter.current()
+        now = time.monotonic()
+
+        calls = {
+            # Step 1: CLEAR - Get toxic creators
+            'clear': (
+                toxic_detection_service.get_toxic_creators,
+                {'user_id': user_id, 'category_id': category_id, 'limit': 5},
+                [],
+            ),
+            # Step 2: WATCH - Get curated videos
+            'watch': (
+                curation_service.get_curated_videos,
+                {'user_id': user_id, 'category_id': category_id, 'count': 4},
+                [],
+            ),
             # Step 3: REINFORCE - Get random favorite
-            favorite_video = favorites_service.get_random_favorite(user_id=user_id)
-
-            # Build plan object
-            plan_id = str(uuid.uuid4())
-            plan = {
-                'plan_id': plan_id,
-                'user_id': user_id,
-                'category_id': category_id,
-                'day_of_challenge': challenge.current_day,
-                'created_at': datetime.utcnow().isoformat(),
-                'steps': {
-                    'clear': {
-                        'type': 'CLEAR',
-                        'title': 'Digital Detox',
-                        'description': 'Block creators that drain your energy',
-                        'toxic_creators': toxic_creators,
-                        'completed': False
-                    },
-                    'watch': {
-                        'type': 'WATCH',
-                        'title': 'Mindful Watching',
-                        'description': 'Watch these inspiring videos',
-                        'videos': curated_videos,
-                        'completed': False
-                    },
-                    'reinforce': {
-                        'type': 'REINFORCE',
-                        'title': 'Reinforce the Good',
-                        'description': 'Rewatch your favorite and share',
-                        'favorite_video': favorite_video,
-                        'show_share': challenge.current_day >= 3,
-                        'completed': False
-                    }
+            'reinforce': (
+                favorites_service.get_random_favorite,
+                {
+                    'user_id': user_id,
+                    'exclude_shown_days': CURATION_IMPRESSIONS['reinforce_window_days'],
                 },
-                'target_signals': TARGET_SIGNALS
-            }
+                None,
+            ),
+        }
 
-            # Save to DB
-            db_plan = self._save_plan(user_id, category_id, challenge.id, plan)
-            plan['db_id'] = db_plan.id
+        return {
+            step: (
+                _step_pool.submit(_run_in_app_context, app, timings, counter, fn, **kwargs),
+                now + PLAN_STEP_TIMEOUTS[step],
+                default,
+            )
+            for step, (fn, kwargs, default) in calls.items()
+        }
 
-            # Cache with 24h TTL
-            cache_service.set_guided_plan(user_id, category_slug, plan)
+    def _collect_step_results(self, step_futures: Dict[str, tuple]) -> tuple:
+        """
+        Wait for step fetches, degrading any that fail or miss their deadline.
 
-            logger.info(f"Generated plan v2 for user {user_id}, challenge day {challenge.current_day}")
-            return plan
+        Args:
+            step_futures: Output of _submit_step_fetches
 
-        except Exception as e:
-            logger.error(f"Error generating plan for user {user_id}: {e}")
-            raise
+        Returns:
+            ({step: result}, [degraded step names])
+        """
+        results = {}
+        degraded = []
+
+        for step, (future, deadline, default) in step_futures.items():
+            try:
+                results[step] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                logger.warning(f"Plan step {step} timed out after {PLAN_STEP_TIMEOUTS[step]}s")
+                future.cancel()
+                results[step] = default
+                degraded.append(step)
+            except Exception as e:
+                logger.error(f"Plan step {step} failed: {e}")
+                results[step] = default
+                degraded.append(step)
+
+        return results, degraded
+
+    def _preview_challenge_day(self, user_id: int, category_id: int) -> int:
+        """
+        Challenge day a plan requested today would get, without writing anything.
+
+        Args:
+            user_id: User ID
+            category_id: Category ID
+
+        Returns:
+            Day number (1 for a new challenge)
+        """
+        challenge = Challenge.query.filter_by(
+            user_id=user_id,
+            category_id=category_id,
+            is_active=True
+        ).first()
+
+        if challenge:
+            days_since_start = (date.today() - challenge.started_at.date()).days
+            if days_since_start < 7:
+                return days_since_start + 1
+        return 1
 
     def _get_or_create_challenge(self, user_id: int, category_id: int) -> Challenge:
         """
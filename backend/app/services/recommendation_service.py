@@ -76,21 +76,21 @@ class RecommendationService:
             # 5. Log and return
             gen_time = int((time.time() - start_time) * 1000)
             self._log_recommendation(user_id, category_code, context, plan, source, gen_time)
+            response = self._format_response(plan, category, user_id, language, source, gen_time)
 
-            # Track analytics event
-            actions = Action.query.filter_by(plan_id=plan.id).all()
+            # Track analytics event (action count from the response, not another query)
             analytics_service.track_event(
                 analytics_service.EVENT_PLAN_GENERATED,
                 user_id=user_id,
                 properties={
                     'category': category_code,
                     'source': source,
-                    'actions_count': len(actions),
+                    'actions_count': response['data']['progress']['total'],
                     'generation_time_ms': gen_time,
                 }
             )
 
-            return self._format_response(plan, category, user_id, language, source, gen_time)
+            return response
 
         except Exception as e:
             print(f"RecommendationService error: {e}")
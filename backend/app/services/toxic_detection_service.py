@@ -5,6 +5,10 @@ A creator is "toxic" if:
 - User has seen their videos 5+ times (high exposure)
 - User's completion rate for their videos < 50% (low engagement)
 
+Counts come from the user_creator_engagement aggregate, which is updated
+incrementally when plan step progress is written (record_step_progress) and
+can be rebuilt with app.tasks.engagement_tasks.backfill_user_creator_engagement.
+
 Usage:
     from app.services.toxic_detection_service import toxic_detection_service
 
@@ -16,10 +20,12 @@ import logging
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
-from sqlalchemy import func, case, and_
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from app import db
-from app.models import UserProgress, StepItem, PlanStep, BlockedCreator
+from app.models import StepItem, BlockedCreator, UserCreatorEngagement
+from app.services.curation_service import curation_service
 
 logger = logging.getLogger(__name__)
 
@@ -57,68 +63,102 @@ class ToxicDetectionService:
             - reason
         """
         try:
-            # Get already blocked creators to exclude them
-            blocked_usernames = db.session.query(BlockedCreator.creator_username).filter(
-                BlockedCreator.user_id == user_id
-            ).subquery()
-
-            # Query to find toxic creators:
-            # Join user_progress -> plan_steps -> step_items to get creator info
-            # Group by creator and calculate stats
-            toxic_query = db.session.query(
-                StepItem.creator_username,
-                func.count(UserProgress.id).label('view_count'),
-                func.sum(
-                    case(
-                        (UserProgress.completed_at.isnot(None), 1),
-                        else_=0
-                    )
-                ).label('completed_count')
-            ).join(
-                PlanStep, StepItem.plan_step_id == PlanStep.id
-            ).join(
-                UserProgress,
-                and_(
-                    UserProgress.step_id == PlanStep.id,
-                    UserProgress.user_id == user_id
-                )
-            ).filter(
-                StepItem.creator_username.isnot(None),
-                StepItem.creator_username != '',
-                ~StepItem.creator_username.in_(blocked_usernames)
-            ).group_by(
-                StepItem.creator_username
-            ).having(
-                func.count(UserProgress.id) >= MIN_VIEWS_THRESHOLD
-            ).all()
+            # Reads the user_creator_engagement aggregate (maintained by
+            # record_step_progress) instead of re-aggregating the full
+            # user_progress -> plan_steps -> step_items history.
+            is_blocked = db.session.query(BlockedCreator.id).filter(
+                BlockedCreator.user_id == user_id,
+                BlockedCreator.creator_username == UserCreatorEngagement.creator_username
+            ).exists()
+
+            rows = UserCreatorEngagement.query.filter(
+                UserCreatorEngagement.user_id == user_id,
+                UserCreatorEngagement.view_count >= MIN_VIEWS_THRESHOLD,
+                UserCreatorEngagement.completion_count
+                < UserCreatorEngagement.view_count * MAX_COMPLETION_RATE,
+                ~is_blocked
+            ).order_by(
+                UserCreatorEngagement.view_count.desc()
+            ).limit(limit).all()
 
             toxic_creators = []
-            for row in toxic_query:
-                creator_username = row.creator_username
+            for row in rows:
                 view_count = row.view_count or 0
-                completed_count = row.completed_count or 0
-
-                # Calculate completion rate
+                completed_count = row.completion_count or 0
                 completion_rate = completed_count / view_count if view_count > 0 else 0
 
-                # Check if below threshold (toxic)
-                if completion_rate < MAX_COMPLETION_RATE:
-                    toxic_creators.append({
-                        'creator_username': creator_username,
-                        'view_count': view_count,
-                        'completion_count': completed_count,
-                        'completion_rate': round(completion_rate, 2),
-                        'reason': f"Low engagement - {int(completion_rate * 100)}% completion rate"
-                    })
+                toxic_creators.append({
+                    'creator_username': row.creator_username,
+                    'view_count': view_count,
+                    'completion_count': completed_count,
+                    'completion_rate': round(completion_rate, 2),
+                    'reason': f"Low engagement - {int(completion_rate * 100)}% completion rate"
+                })
 
-            # Sort by view count (highest exposure first) and limit
-            toxic_creators.sort(key=lambda x: x['view_count'], reverse=True)
-            return toxic_creators[:limit]
+            return toxic_creators
 
         except Exception as e:
             logger.error(f"Error detecting toxic creators for user {user_id}: {e}")
             return []
 
+    def record_step_progress(
+        self,
+        user_id: int,
+        step_id: int,
+        viewed: bool,
+        completed: bool
+    ) -> None:
+        """
+        Update the engagement aggregate for progress written on a plan step.
+
+        Every creator item in the step counts once, matching the
+        user_progress -> step_items join the aggregate replaces. Runs in the
+        caller's transaction (no commit) so it lands atomically with the
+        progress row.
+
+        Args:
+            user_id: User ID
+            step_id: Plan step ID
+            viewed: True if a new user_progress row was created
+            completed: True if the row became completed
+        """
+        if not viewed and not completed:
+            return
+
+        creator_counts = db.session.query(
+            StepItem.creator_username,
+            func.count(StepItem.id)
+        ).filter(
+            StepItem.plan_step_id == step_id,
+            StepItem.creator_username.isnot(None),
+            StepItem.creator_username != ''
+        ).group_by(StepItem.creator_username).all()
+
+        if not creator_counts:
+            return
+
+        now = datetime.utcnow()
+        stmt = pg_insert(UserCreatorEngagement).values([
+            {
+                'user_id': user_id,
+                'creator_username': creator_username,
+                'view_count': count if viewed else 0,
+                'completion_count': count if completed else 0,
+                'last_seen_at': now,
+            }
+            for creator_username, count in creator_counts
+        ])
+        stmt = stmt.on_conflict_do_update(
+            constraint='uq_user_creator_engagement_user_creator',
+            set_={
+                'view_count': UserCreatorEngagement.view_count + stmt.excluded.view_count,
+                'completion_count': UserCreatorEngagement.completion_count + stmt.excluded.completion_count,
+                'last_seen_at': stmt.excluded.last_seen_at,
+                'updated_at': func.now(),
+            }
+        )
+        db.session.execute(stmt)
+
     def mark_creator_blocked(
         self,
         user_id: int,
@@ -155,6 +195,7 @@ class ToxicDetectionService:
             )
             db.session.add(blocked)
             db.session.commit()
+            curation_service.invalidate_user(user_id)
 
             logger.info(f"Blocked creator {creator_username} for user {user_id}")
             return True
@@ -183,6 +224,7 @@ class ToxicDetectionService:
             db.session.commit()
 
             if result > 0:
+                curation_service.invalidate_user(user_id)
                 logger.info(f"Unblocked creator {creator_username} for user {user_id}")
                 return True
             return False
@@ -1,5 +1,12 @@
 """Background tasks package."""
 
 from .health_tasks import check_system_health
+from .engagement_tasks import backfill_user_creator_engagement
+from .curation_tasks import refresh_curation_index, prune_video_impressions
+from .plan_warmup_tasks import warm_daily_plans
+from .metrics_tasks import rollup_daily_metrics
+from .partition_tasks import maintain_partitions
 
-__all__ = ['check_system_health']
+__all__ = ['check_system_health', 'warm_daily_plans', 'backfill_user_creator_engagement',
+           'refresh_curation_index', 'prune_video_impressions', 'rollup_daily_metrics',
+           'maintain_partitions']
@@ -0,0 +1,58 @@
+"""
+Curation Tasks - Keep the per-category candidate index fresh and the
+impression log bounded.
+
+Videos expire after 24 hours, so the index is rebuilt on a schedule in
+addition to any index_videos() calls made right after a scrape.
+
+Run hourly via cron:
+0 * * * * cd /opt/fypfixer && docker-compose exec -T backend python -c "from app.tasks.curation_tasks import refresh_curation_index; refresh_curation_index()"
+
+Every plan logs a handful of video_impressions rows; prune the ones no
+lookback window reads any more. Run daily via cron:
+45 3 * * * cd /opt/fypfixer && docker-compose exec -T backend python -c "from app.tasks.curation_tasks import prune_video_impressions; prune_video_impressions()"
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def refresh_curation_index() -> int:
+    """
+    Rebuild video_category_candidates for all active categories.
+
+    Returns:
+        Number of candidate rows written
+    """
+    from app import create_app
+    from app.services.curation_service import curation_service
+
+    app = create_app()
+
+    with app.app_context():
+        count = curation_service.refresh_curation_cache()
+        logger.info(f"Curation index refresh complete. Candidates: {count}")
+        return count
+
+
+def prune_video_impressions() -> int:
+    """
+    Delete video impressions older than the longest impression window.
+
+    Returns:
+        Number of rows deleted
+    """
+    from app import create_app
+    from app.services.curation_service import curation_service
+
+    app = create_app()
+
+    with app.app_context():
+        count = curation_service.prune_impressions()
+        logger.info(f"Video impression prune complete. Deleted: {count}")
+        return count
+
+
+if __name__ == '__main__':
+    refresh_curation_index()
@@ -0,0 +1,96 @@
+"""
+Engagement Tasks - Rebuild the user_creator_engagement aggregate.
+
+Recomputes per-user creator views/completions from
+user_progress -> plan_steps -> step_items and upserts them, one user-ID range
+per transaction. Idempotent: safe to re-run to repair drift.
+
+Run once after the 20261017_user_creator_engagement migration:
+cd /opt/fypfixer && docker-compose exec -T backend python -c "from app.tasks.engagement_tasks import backfill_user_creator_engagement; backfill_user_creator_engagement()"
+"""
+
+import logging
+from typing import Optional
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Users per transaction
+BATCH_SIZE = 1000
+
+BACKFILL_SQL = text("""
+    INSERT INTO user_creator_engagement
+        (user_id, creator_username, view_count, completion_count, last_seen_at, updated_at)
+    SELECT
+        up.user_id,
+        si.creator_username,
+        COUNT(up.id),
+        COUNT(up.completed_at),
+        MAX(COALESCE(up.completed_at, up.created_at)),
+        NOW()
+    FROM user_progress up
+    JOIN plan_steps ps ON ps.id = up.step_id
+    JOIN step_items si ON si.plan_step_id = ps.id
+    WHERE up.user_id >= :start_id AND up.user_id < :end_id
+      AND si.creator_username IS NOT NULL
+      AND si.creator_username <> ''
+    GROUP BY up.user_id, si.creator_username
+    ON CONFLICT (user_id, creator_username) DO UPDATE SET
+        view_count = EXCLUDED.view_count,
+        completion_count = EXCLUDED.completion_count,
+        last_seen_at = EXCLUDED.last_seen_at,
+        updated_at = NOW()
+""")
+
+
+def backfill_user_creator_engagement(
+    batch_size: int = BATCH_SIZE,
+    user_id: Optional[int] = None
+) -> int:
+    """
+    Rebuild user_creator_engagement from progress history.
+
+    Args:
+        batch_size: Number of user IDs per transaction
+        user_id: Rebuild a single user only
+
+    Returns:
+        Number of rows upserted
+    """
+    from app import create_app, db
+
+    app = create_app()
+
+    with app.app_context():
+        if user_id is not None:
+            start_id, max_id = user_id, user_id
+            batch_size = 1
+        else:
+            bounds = db.session.execute(text(
+                "SELECT MIN(user_id), MAX(user_id) FROM user_progress WHERE step_id IS NOT NULL"
+            )).first()
+            if not bounds or bounds[0] is None:
+                logger.info("Engagement backfill: no step progress found")
+                return 0
+            start_id, max_id = bounds
+
+        total = 0
+        while start_id <= max_id:
+            end_id = start_id + batch_size
+            try:
+                result = db.session.execute(BACKFILL_SQL, {'start_id': start_id, 'end_id': end_id})
+                db.session.commit()
+                total += result.rowcount or 0
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Engagement backfill failed for users [{start_id}, {end_id}): {e}")
+                raise
+            start_id = end_id
+
+        logger.info(f"Engagement backfill complete. Rows upserted: {total}")
+        return total
+
+
+if __name__ == '__main__':
+    backfill_user_creator_engagement()
@@ -39,6 +39,12 @@ def get_error_rate_last_hour() -> float:
 def get_api_latency_p95() -> int:
     """Get P95 latency in the last hour."""
     from app import db
+    from app.services.latency_service import latency_service
+
+    # Merged worker histograms from Redis; request_logs scan only as fallback
+    p95 = latency_service.get_p95(window_minutes=60)
+    if p95 is not None:
+        return int(p95)
 
     hour_ago = datetime.utcnow() - timedelta(hours=1)
 
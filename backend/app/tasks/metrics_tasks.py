@@ -0,0 +1,69 @@
+"""
+Metrics Tasks - Fold analytics_events into metrics_daily rollups.
+
+The admin challenge/plan dashboards read these rollups plus a live partial
+aggregate for the days not rolled up yet (see MetricsService._event_totals).
+Each run rolls up every finished day since the last rollup; re-running a day
+replaces its rows, so the job is safe to repeat.
+
+Run daily via cron (server time, after the day rolls over):
+15 0 * * * cd /opt/fypfixer && docker-compose exec -T backend python -c "from app.tasks.metrics_tasks import rollup_daily_metrics; rollup_daily_metrics()"
+"""
+
+import logging
+from datetime import date, timedelta
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def rollup_daily_metrics(day: Optional[date] = None) -> Dict[str, int]:
+    """
+    Roll up finished days into metrics_daily.
+
+    Args:
+        day: Re-roll only this day (e.g. to repair it); by default every day
+            after the last rollup up to yesterday
+
+    Returns:
+        Dict with days and rows written
+    """
+    from app import create_app, db
+    from app.models import AnalyticsEvent
+    from app.services.metrics_service import metrics_service
+
+    app = create_app()
+
+    with app.app_context():
+        yesterday = date.today() - timedelta(days=1)
+
+        if day is not None:
+            first, last = day, day
+        else:
+            last_rollup = metrics_service.get_last_rollup_date()
+            if last_rollup is not None:
+                first = last_rollup + timedelta(days=1)
+            else:
+                first_event = db.session.query(db.func.min(AnalyticsEvent.created_at)).scalar()
+                first = first_event.date() if first_event else yesterday
+            last = yesterday
+
+        days = 0
+        rows = 0
+        current = first
+        while current <= last:
+            try:
+                rows += metrics_service.rollup_day(current)
+                days += 1
+            except Exception as e:
+                # Later days depend on this one being marked done; stop here
+                logger.error(f"Metrics rollup failed for {current}: {e}")
+                break
+            current += timedelta(days=1)
+
+        logger.info(f"Metrics rollup complete. Days: {days}, rows: {rows}")
+        return {'days': days, 'rows': rows}
+
+
+if __name__ == '__main__':
+    rollup_daily_metrics()
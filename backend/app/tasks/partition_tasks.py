@@ -0,0 +1,259 @@
+"""
+Partition Tasks - Create upcoming and expire old log table partitions.
+
+request_logs and analytics_events are range-partitioned on created_at
+(migration 20261017_partition_logs). This task keeps partitions created
+LOG_PARTITIONS[table]['premake_days'] ahead and removes partitions that end
+before the table's retention (DROP, or DETACH when 'archive' is set so the
+data can be dumped and dropped by hand). Rows that landed in the DEFAULT
+partition while maintenance was behind are moved into the partition
+created for them; any left over are logged as errors.
+
+Run daily via cron:
+30 3 * * * cd /opt/fypfixer && docker-compose exec -T backend python -c "from app.tasks.partition_tasks import maintain_partitions; maintain_partitions()"
+"""
+
+import re
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Partition boundaries are aligned to whole intervals counted from this Monday (UTC)
+PARTITION_EPOCH = datetime(1970, 1, 5, tzinfo=timezone.utc)
+
+_BOUND_RE = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+def interval_start(moment: datetime, interval_days: int) -> datetime:
+    """
+    Start of the partition interval containing moment.
+
+    Args:
+        moment: Timezone-aware datetime
+        interval_days: Partition width in days
+
+    Returns:
+        UTC midnight that starts the interval
+    """
+    days = (moment.astimezone(timezone.utc) - PARTITION_EPOCH).days
+    return PARTITION_EPOCH + timedelta(days=days - days % interval_days)
+
+
+def partition_name(table: str, start: datetime) -> str:
+    """Partition table name, e.g. request_logs_p20261017."""
+    return f"{table}_p{start:%Y%m%d}"
+
+
+def _parse_bound(value: str) -> Optional[datetime]:
+    """Parse one bound from pg_get_expr (None for MINVALUE/MAXVALUE)."""
+    value = value.strip().strip("'")
+    if value in ('MINVALUE', 'MAXVALUE'):
+        return None
+    if re.search(r"[+-]\d\d$", value):
+        value += ':00'
+    return datetime.fromisoformat(value)
+
+
+def default_partition(table: str) -> str:
+    """DEFAULT partition name, e.g. request_logs_default."""
+    return f"{table}_default"
+
+
+def _default_rows(table: str, start: Optional[datetime] = None, end: Optional[datetime] = None) -> bool:
+    """Whether table's DEFAULT partition holds rows (in [start, end) if given)."""
+    from app import db
+
+    default = default_partition(table)
+    if db.session.execute(text("SELECT to_regclass(:name)"), {'name': default}).scalar() is None:
+        return False
+
+    where = "WHERE created_at >= :start AND created_at < :end" if start is not None else ""
+    return bool(db.session.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {default} {where})"),
+        {'start': start, 'end': end}
+    ).scalar())
+
+
+def _create_from_default(table: str, name: str, start: datetime, end: datetime) -> None:
+    """
+    Create partition name for [start, end) and move its rows out of the DEFAULT partition.
+
+    Postgres refuses to create a partition whose range already has rows in
+    the DEFAULT partition, so the DEFAULT partition is detached while the
+    rows move. Caller commits.
+    """
+    from app import db
+
+    default = default_partition(table)
+    bounds = {'start': start, 'end': end}
+    db.session.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+    db.session.execute(text(
+        f"CREATE TABLE {name} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+    db.session.execute(text(
+        f"INSERT INTO {name} SELECT * FROM {default} WHERE created_at >= :start AND created_at < :end"
+    ), bounds)
+    db.session.execute(text(
+        f"DELETE FROM {default} WHERE created_at >= :start AND created_at < :end"
+    ), bounds)
+    db.session.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+
+
+def list_partitions(table: str) -> List[Tuple[str, Optional[datetime], Optional[datetime]]]:
+    """
+    Current partitions of table with their bounds.
+
+    Returns:
+        List of (name, lower, upper); None stands for MINVALUE/MAXVALUE.
+        The DEFAULT partition has no bounds and is not listed.
+    """
+    from app import db
+
+    # Bounds are printed in the session time zone
+    db.session.execute(text("SET LOCAL timezone = 'UTC'"))
+    rows = db.session.execute(text("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = :table
+        ORDER BY c.relname
+    """), {'table': table}).all()
+
+    partitions = []
+    for name, bound in rows:
+        match = _BOUND_RE.search(bound or '')
+        if not match:
+            continue
+        partitions.append((name, _parse_bound(match.group(1)), _parse_bound(match.group(2))))
+    return partitions
+
+
+def ensure_partitions(
+    table: str,
+    interval_days: int,
+    premake_days: int,
+    now: Optional[datetime] = None
+) -> List[str]:
+    """
+    Create missing partitions from the current interval to now + premake_days.
+
+    Args:
+        table: Partitioned table name
+        interval_days: Partition width in days
+        premake_days: How far ahead to create partitions
+        now: Reference time (defaults to current UTC time)
+
+    Returns:
+        Names of partitions created
+    """
+    from app import db
+
+    now = now or datetime.now(timezone.utc)
+    existing = list_partitions(table)
+    created = []
+
+    start = interval_start(now, interval_days)
+    horizon = now + timedelta(days=premake_days)
+    while start <= horizon:
+        end = start + timedelta(days=interval_days)
+        covered = any(
+            (lower is None or lower <= start) and (upper is None or upper >= end)
+            for _, lower, upper in existing
+        )
+        if not covered:
+            name = partition_name(table, start)
+            if _default_rows(table, start, end):
+                logger.error(f"{default_partition(table)} holds rows for {name}; moving them")
+                _create_from_default(table, name, start, end)
+            else:
+                db.session.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                    f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+                ))
+            created.append(name)
+        start = end
+
+    db.session.commit()
+    return created
+
+
+def expire_partitions(
+    table: str,
+    retention_days: int,
+    archive: bool,
+    now: Optional[datetime] = None
+) -> List[str]:
+    """
+    Drop (or detach) partitions that end before now - retention_days.
+
+    Args:
+        table: Partitioned table name
+        retention_days: Days of data to keep; 0 keeps everything
+        archive: Detach instead of dropping
+        now: Reference time (defaults to current UTC time)
+
+    Returns:
+        Names of partitions removed
+    """
+    from app import db
+
+    if not retention_days:
+        return []
+
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=retention_days)
+    removed = []
+
+    for name, _, upper in list_partitions(table):
+        if upper is None or upper > cutoff:
+            continue
+        if archive:
+            db.session.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        else:
+            db.session.execute(text(f"DROP TABLE {name}"))
+        removed.append(name)
+
+    db.session.commit()
+    return removed
+
+
+def maintain_partitions() -> Dict[str, Dict[str, Any]]:
+    """
+    Create upcoming and expire old partitions for every LOG_PARTITIONS table.
+
+    Returns:
+        {table: {'created': [...], 'removed': [...]}}
+    """
+    from app import create_app, db
+    from app.config.constants import LOG_PARTITIONS
+
+    app = create_app()
+    summary = {}
+
+    with app.app_context():
+        for table, settings in LOG_PARTITIONS.items():
+            try:
+                created = ensure_partitions(table, settings['interval_days'], settings['premake_days'])
+                removed = expire_partitions(table, settings['retention_days'], bool(settings['archive']))
+                summary[table] = {'created': created, 'removed': removed}
+                logger.info(f"Partitions for {table}: created {created}, removed {removed}")
+
+                # Only rows dated past now + premake_days can remain there
+                if _default_rows(table):
+                    logger.error(f"Rows outside every range partition remain in {default_partition(table)}")
+                    summary[table]['default_rows'] = True
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Partition maintenance failed for {table}: {e}")
+                summary[table] = {'created': [], 'removed': [], 'error': str(e)}
+
+    return summary
+
+
+if __name__ == '__main__':
+    maintain_partitions()
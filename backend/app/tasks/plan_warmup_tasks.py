@@ -0,0 +1,175 @@
+"""
+Plan Warm-up Tasks - Pre-generate and cache v2 plans for active users.
+
+Plans are cached per user/category/day (see CacheService.get_or_create_guided_plan),
+so the first /api/v2/plan/generate call of the day pays for toxic detection,
+curation, favorites and several commits. Running this shortly after midnight
+builds the new day's step contents in the background as drafts, so the
+morning spike only has to persist them.
+
+Warming writes nothing to the database: the challenge, video impressions and
+Plan row are created when the user actually requests the plan. Targets come
+from real activity (authenticated requests in request_logs), never from
+plans the warm-up itself produced.
+
+Run daily via cron (server time, just after the day rolls over):
+5 0 * * * cd /opt/fypfixer && docker-compose exec -T backend python -c "from app.tasks.plan_warmup_tasks import warm_daily_plans; warm_daily_plans()"
+"""
+
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Users who made requests in the last N days are considered active
+ACTIVE_DAYS = 3
+# (user, category) pairs handled per worker task
+CHUNK_SIZE = 100
+# Parallel workers; each holds one DB connection while running
+MAX_WORKERS = 4
+
+
+def get_active_plan_targets(active_days: int = ACTIVE_DAYS) -> List[Tuple[int, int, str]]:
+    """
+    Get (user_id, category_id, category_slug) for recently active users.
+
+    A user is active when they made an authenticated request in the window;
+    their categories are those of the plans they requested in it.
+
+    Args:
+        active_days: Look-back window in days
+
+    Returns:
+        Distinct targets, ordered by user ID
+    """
+    from app import db
+    from app.models import Plan, Category, User, RequestLog
+
+    since = date.today() - timedelta(days=active_days)
+
+    active_users = db.session.query(RequestLog.user_id).filter(
+        RequestLog.created_at >= datetime.utcnow() - timedelta(days=active_days),
+        RequestLog.user_id.isnot(None)
+    ).distinct()
+
+    rows = db.session.query(
+        Plan.user_id, Plan.category_id, Category.slug, Category.code
+    ).join(
+        Category, Category.id == Plan.category_id
+    ).join(
+        User, User.id == Plan.user_id
+    ).filter(
+        Plan.plan_date >= since,
+        Plan.user_id.in_(active_users),
+        Plan.is_template.isnot(True),
+        User.is_active.is_(True),
+        Category.is_active.is_(True)
+    ).distinct().order_by(Plan.user_id).all()
+
+    return [
+        (user_id, category_id, slug or code)
+        for user_id, category_id, slug, code in rows
+    ]
+
+
+def _chunks(items: List, size: int) -> List[List]:
+    """Split items into lists of at most size elements."""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _warm_chunk(app, targets: List[Tuple[int, int, str]]) -> Counter:
+    """
+    Warm one chunk of plan drafts inside its own app context (and DB session).
+
+    Args:
+        app: Flask application
+        targets: (user_id, category_id, category_slug) tuples
+
+    Returns:
+        Counter with 'generated', 'cached' and 'failed' totals
+        ('failed' includes drafts not stored because a step degraded)
+    """
+    from app import db
+    from app.services.cache_service import cache_service
+    from app.services.plan_service_v2 import plan_service_v2
+
+    result = Counter()
+
+    with app.app_context():
+        try:
+            for user_id, category_id, category_slug in targets:
+                try:
+                    if (cache_service.get_guided_plan(user_id, category_slug)
+                            or cache_service.get_guided_plan_draft(user_id, category_slug)):
+                        result['cached'] += 1
+                        continue
+
+                    if plan_service_v2.warm_plan(
+                        user_id=user_id,
+                        category_id=category_id,
+                        category_slug=category_slug
+                    ):
+                        result['generated'] += 1
+                    else:
+                        result['failed'] += 1
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"Error warming plan for user {user_id}, category {category_id}: {e}")
+                    result['failed'] += 1
+        finally:
+            db.session.remove()
+
+    return result
+
+
+def warm_daily_plans(
+    active_days: int = ACTIVE_DAYS,
+    chunk_size: int = CHUNK_SIZE,
+    max_workers: int = MAX_WORKERS
+) -> Dict[str, int]:
+    """
+    Pre-build today's v2 plan drafts for active users.
+
+    Should run once a day, right after midnight.
+
+    Args:
+        active_days: Look-back window for "active" users
+        chunk_size: Targets per worker task
+        max_workers: Size of the worker pool
+
+    Returns:
+        Dict with targets, generated, cached and failed counts
+    """
+    from app import create_app
+
+    app = create_app()
+
+    with app.app_context():
+        targets = get_active_plan_targets(active_days)
+
+    totals = Counter()
+    chunks = _chunks(targets, chunk_size)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for chunk_result in pool.map(lambda chunk: _warm_chunk(app, chunk), chunks):
+            totals.update(chunk_result)
+
+    summary = {
+        'targets': len(targets),
+        'generated': totals['generated'],
+        'cached': totals['cached'],
+        'failed': totals['failed'],
+    }
+    logger.info(
+        f"Plan warm-up complete. Targets: {summary['targets']}, "
+        f"generated: {summary['generated']}, cached: {summary['cached']}, "
+        f"failed: {summary['failed']}"
+    )
+    return summary
+
+
+if __name__ == '__main__':
+    warm_daily_plans()
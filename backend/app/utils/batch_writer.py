@@ -0,0 +1,212 @@
+"""
+Batch Writer - Buffer rows in memory and write them in bulk from a background thread.
+
+Callers submit() plain dicts; a daemon thread drains the queue and hands
+batches of up to max_batch rows to flush_fn, either when a batch fills up
+or when flush_interval seconds have passed since the first pending row.
+flush_fn runs inside an app context, so it can use db.session directly.
+
+Memory is bounded by max_queue: when the queue is full, submit() drops the
+row and counts it instead of blocking the request. Pending rows are flushed
+at interpreter exit (atexit) and on close().
+
+Usage:
+    writer = BatchWriter('analytics', flush_fn=insert_rows)
+    writer.init_app(app)
+    writer.submit({'event_type': 'plan_viewed', 'user_id': 1})
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# flush_fn(rows) writes one batch; raising rolls back and drops the batch
+FlushFn = Callable[[List[Dict[str, Any]]], None]
+
+
+class BatchWriter:
+    """Bounded in-process write buffer with size/time based flushing."""
+
+    def __init__(
+        self,
+        name: str,
+        flush_fn: FlushFn,
+        max_batch: int = 500,
+        flush_interval: float = 1.0,
+        max_queue: int = 10000
+    ):
+        self.name = name
+        self._flush_fn = flush_fn
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+
+        self._app = None
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._stopping = threading.Event()
+
+        self._written = 0
+        self._dropped = 0
+        self._failed = 0
+        self._batches = 0
+
+    def init_app(self, app) -> None:
+        """Bind to a Flask app (used for the app context during flushes)."""
+        if self._app is None:
+            atexit.register(self.close)
+        self._app = app
+
+    # === Producer side ===
+
+    def submit(self, row: Dict[str, Any]) -> bool:
+        """
+        Queue one row for writing.
+
+        Args:
+            row: Column values for flush_fn
+
+        Returns:
+            True if queued, False if the buffer is full or closed (row dropped)
+        """
+        if self._stopping.is_set():
+            with self._lock:
+                self._dropped += 1
+            return False
+
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+                dropped = self._dropped
+            # Log the first drop and then every 1000th, not every event
+            if dropped == 1 or dropped % 1000 == 0:
+                logger.warning(f"[{self.name}] Write buffer full, dropped {dropped} rows so far")
+            return False
+
+    def _ensure_thread(self) -> None:
+        """Start the flusher thread lazily; restart it in forked workers."""
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._thread is not None and self._pid == pid and self._thread.is_alive():
+                return
+            if self._pid is not None and self._pid != pid:
+                # Forked from the master: inherited queue and locks belong to the parent
+                self._queue = queue.Queue(maxsize=self.max_queue)
+                self._flush_lock = threading.Lock()
+            self._pid = pid
+            self._thread = threading.Thread(
+                target=self._run, name=f"batch-writer-{self.name}", daemon=True
+            )
+            self._thread.start()
+
+    # === Consumer side ===
+
+    def _drain(self, first: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Collect up to max_batch rows, waiting at most flush_interval for more."""
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stopping.is_set():
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self) -> None:
+        """Flusher thread loop."""
+        while not self._stopping.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            self._write(self._drain(first))
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        """Write one batch via flush_fn inside an app context."""
+        if not batch:
+            return
+
+        from app import db
+
+        with self._flush_lock:
+            try:
+                if self._app is not None:
+                    with self._app.app_context():
+                        try:
+                            self._flush_fn(batch)
+                        except Exception:
+                            db.session.rollback()
+                            raise
+                        finally:
+                            db.session.remove()
+                else:
+                    self._flush_fn(batch)
+
+                with self._lock:
+                    self._written += len(batch)
+                    self._batches += 1
+            except Exception as e:
+                with self._lock:
+                    self._failed += len(batch)
+                logger.error(f"[{self.name}] Failed to write batch of {len(batch)} rows: {e}")
+
+    def flush(self) -> int:
+        """
+        Write everything queued so far from the calling thread.
+
+        Returns:
+            Number of rows handed to flush_fn
+        """
+        total = 0
+        while True:
+            batch = []
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return total
+            self._write(batch)
+            total += len(batch)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop the flusher thread and write pending rows (called at exit)."""
+        self._stopping.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and self._pid == os.getpid():
+            thread.join(timeout)
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for diagnostics."""
+        with self._lock:
+            return {
+                'name': self.name,
+                'pending': self._queue.qsize(),
+                'written': self._written,
+                'batches': self._batches,
+                'dropped': self._dropped,
+                'failed': self._failed,
+            }
@@ -0,0 +1,129 @@
+"""
+Cache codec - binary (de)serialization for values stored in Redis.
+
+Wire format:
+    [version:1][codec:1][flags:1][payload...]
+
+- version: FORMAT_VERSION (0x01). Anything else - including legacy entries,
+  which are plain JSON text starting with a printable character - is decoded
+  with stdlib json, so old cache entries stay readable.
+- codec: b'j' stdlib json, b'o' orjson, b'm' msgpack
+- flags: bit 0 = payload is zlib-compressed
+
+The fastest available codec is used by default (orjson, then msgpack, then
+json). Override with CACHE_CODEC=json|orjson|msgpack.
+
+Usage:
+    from app.utils.cache_codec import cache_codec
+
+    raw = cache_codec.encode({'a': 1})
+    value = cache_codec.decode(raw)
+"""
+
+import os
+import json
+import zlib
+import logging
+from typing import Any, Callable, Dict, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 0x01
+FLAG_COMPRESSED = 0x01
+
+# Payloads larger than this (bytes) are zlib-compressed
+COMPRESS_THRESHOLD = 1024
+COMPRESS_LEVEL = 1  # favour speed; cached JSON still shrinks ~4-8x
+
+
+def _json_codec() -> Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]:
+    def dumps(value: Any) -> bytes:
+        return json.dumps(value, separators=(',', ':')).encode('utf-8')
+    return dumps, json.loads
+
+
+def _orjson_codec() -> Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]:
+    import orjson
+
+    def dumps(value: Any) -> bytes:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return dumps, orjson.loads
+
+
+def _msgpack_codec() -> Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]:
+    import msgpack
+
+    def dumps(value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True)
+
+    def loads(raw: bytes) -> Any:
+        return msgpack.unpackb(raw, raw=False, strict_map_key=False)
+    return dumps, loads
+
+
+_CODEC_FACTORIES: Dict[str, Tuple[bytes, Callable]] = {
+    'orjson': (b'o', _orjson_codec),
+    'msgpack': (b'm', _msgpack_codec),
+    'json': (b'j', _json_codec),
+}
+
+
+class CacheCodec:
+    """Versioned, optionally compressed codec with pluggable serializer."""
+
+    def __init__(
+        self,
+        preferred: str = None,
+        compress_threshold: int = COMPRESS_THRESHOLD
+    ):
+        self.compress_threshold = compress_threshold
+        self._codecs: Dict[bytes, Tuple[Callable, Callable]] = {}
+
+        for name, (codec_id, factory) in _CODEC_FACTORIES.items():
+            try:
+                self._codecs[codec_id] = factory()
+            except ImportError:
+                continue
+
+        order = [preferred] if preferred else []
+        order += ['orjson', 'msgpack', 'json']
+        for name in order:
+            codec_id = _CODEC_FACTORIES.get(name, (None,))[0]
+            if codec_id in self._codecs:
+                self.name = name
+                self._codec_id = codec_id
+                break
+
+        logger.debug(f"Cache codec: {self.name}")
+
+    def encode(self, value: Any) -> bytes:
+        """Serialize value into the versioned wire format."""
+        dumps, _ = self._codecs[self._codec_id]
+        payload = dumps(value)
+        flags = 0
+        if self.compress_threshold and len(payload) > self.compress_threshold:
+            payload = zlib.compress(payload, COMPRESS_LEVEL)
+            flags |= FLAG_COMPRESSED
+        return bytes((FORMAT_VERSION,)) + self._codec_id + bytes((flags,)) + payload
+
+    def decode(self, raw: Union[bytes, str]) -> Any:
+        """Deserialize a value written by encode() or a legacy JSON entry."""
+        if isinstance(raw, str):
+            return json.loads(raw)
+        if not raw or raw[0] != FORMAT_VERSION:
+            return json.loads(raw)
+
+        codec_id = raw[1:2]
+        flags = raw[2]
+        payload = raw[3:]
+        if flags & FLAG_COMPRESSED:
+            payload = zlib.decompress(payload)
+
+        codec = self._codecs.get(codec_id)
+        if codec is None:
+            raise ValueError(f"Cache codec {codec_id!r} not available in this process")
+        return codec[1](payload)
+
+
+# Singleton instance
+cache_codec = CacheCodec(preferred=os.environ.get('CACHE_CODEC'))
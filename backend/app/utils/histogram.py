@@ -0,0 +1,85 @@
+"""
+Fixed-bucket latency histogram.
+
+Cheap to update (one bisect + two adds), mergeable across workers and
+renderable as Prometheus histogram buckets.
+
+Usage:
+    from app.utils.histogram import LatencyHistogram
+
+    hist = LatencyHistogram()
+    hist.observe(3.2)          # milliseconds
+    hist.quantile(0.95)        # -> upper bound of the p95 bucket
+"""
+
+from bisect import bisect_left
+from typing import Dict, Any, List, Sequence
+
+# Bucket upper bounds in milliseconds (roughly log-spaced)
+DEFAULT_BUCKETS_MS = (
+    0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000,
+)
+
+
+class LatencyHistogram:
+    """Histogram of latencies in milliseconds over fixed buckets (+Inf last)."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        """Record one latency sample."""
+        self.counts[bisect_left(self.buckets, ms)] += 1
+        self.count += 1
+        self.sum_ms += ms
+
+    def merge(self, other: 'LatencyHistogram') -> None:
+        """Add another histogram with the same buckets into this one."""
+        if other.buckets != self.buckets:
+            raise ValueError("Cannot merge histograms with different buckets")
+        for i, c in enumerate(other.counts):
+            self.counts[i] += c
+        self.count += other.count
+        self.sum_ms += other.sum_ms
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate quantile q (0..1) by linear interpolation inside its bucket.
+
+        Samples in the +Inf bucket are reported as the largest finite bound.
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, c in enumerate(self.counts):
+            if c and cumulative + c >= rank:
+                if i >= len(self.buckets):
+                    return float(self.buckets[-1])
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i]
+                return lower + (upper - lower) * ((rank - cumulative) / c)
+            cumulative += c
+        return float(self.buckets[-1])
+
+    def cumulative_buckets(self) -> List[tuple]:
+        """[(le, cumulative_count), ...] ending with ('+Inf', count)."""
+        result = []
+        cumulative = 0
+        for bound, c in zip(self.buckets, self.counts):
+            cumulative += c
+            result.append((bound, cumulative))
+        result.append(('+Inf', self.count))
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'avg_ms': round(self.sum_ms / self.count, 3) if self.count else 0.0,
+            'p50_ms': round(self.quantile(0.50), 3),
+            'p95_ms': round(self.quantile(0.95), 3),
+            'p99_ms': round(self.quantile(0.99), 3),
+        }
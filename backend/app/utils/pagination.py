@@ -0,0 +1,41 @@
+"""
+Opaque keyset (cursor) pagination helpers.
+
+A cursor encodes the sort key of the last row on a page, e.g.
+(liked_at, id); the next page is WHERE (liked_at, id) < cursor, which
+an index on the same columns serves at constant cost per page.
+
+Usage:
+    from app.utils.pagination import encode_cursor, decode_cursor
+
+    cursor = encode_cursor(row.liked_at, row.id)
+    liked_at, row_id = decode_cursor(cursor)
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+from .errors import ValidationError
+
+
+def encode_cursor(sort_value: datetime, row_id: int) -> str:
+    """Encode a (timestamp, id) sort key as a URL-safe cursor."""
+    raw = json.dumps([sort_value.isoformat(), row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValidationError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise ValidationError('Invalid cursor')
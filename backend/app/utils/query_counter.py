@@ -0,0 +1,154 @@
+"""
+Query Counter - Count SQL statements and spot repeated ones (N+1 patterns).
+
+count_queries() activates a QueryCounter for the current context (thread /
+request); a single Engine-wide cursor listener adds every executed
+statement to whichever counter is active. Worker threads doing part of a
+request's work join its counter with attached(counter). Statements are compared by their
+SQL text with placeholders, so the same query with different parameters
+counts as a repeat.
+
+Usage:
+    with count_queries() as counter:
+        service.get_weekly_activity(user_id)
+    counter.total, counter.repeated()
+
+    # In tests
+    with assert_max_queries(3):
+        client.get('/api/v2/plan/today', headers=auth_headers)
+"""
+
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_active: ContextVar[Optional['QueryCounter']] = ContextVar('query_counter', default=None)
+
+_listener_installed = False
+_listener_lock = threading.Lock()
+
+
+class QueryCounter:
+    """SQL statements executed while active, keyed by normalized text."""
+
+    def __init__(self):
+        self.statements: Counter = Counter()
+        # Worker threads attached to a request add to the same counter
+        self._lock = threading.Lock()
+
+    def add(self, statement: str) -> None:
+        sql = ' '.join(statement.split())
+        with self._lock:
+            self.statements[sql] += 1
+
+    @property
+    def total(self) -> int:
+        with self._lock:
+            return sum(self.statements.values())
+
+    def repeated(self, threshold: int = 2) -> Dict[str, int]:
+        """Statements executed at least threshold times, most repeated first."""
+        with self._lock:
+            common = self.statements.most_common()
+        return {sql: count for sql, count in common if count >= threshold}
+
+    def report(self, limit: int = 10, statement_chars: int = 200) -> Dict[str, Any]:
+        """Summary for logs and assertion messages."""
+        repeated = self.repeated()
+        return {
+            'total': self.total,
+            'distinct': len(self.statements),
+            'repeated': [
+                {'sql': sql[:statement_chars], 'count': count}
+                for sql, count in list(repeated.items())[:limit]
+            ],
+        }
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    counter = _active.get()
+    if counter is not None:
+        counter.add(statement)
+
+
+def _install_listener() -> None:
+    """Listen on every Engine once per process."""
+    global _listener_installed
+    with _listener_lock:
+        if not _listener_installed:
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            _listener_installed = True
+
+
+def start() -> Any:
+    """Activate a new counter in this context; returns a token for stop()."""
+    _install_listener()
+    return _active.set(QueryCounter())
+
+
+def current() -> Optional[QueryCounter]:
+    """Counter active in this context, if any."""
+    return _active.get()
+
+
+def stop(token: Any) -> Optional[QueryCounter]:
+    """Deactivate the counter started with token and return it."""
+    counter = _active.get()
+    _active.reset(token)
+    return counter
+
+
+@contextmanager
+def attached(counter: Optional[QueryCounter]):
+    """Count statements executed inside the block (e.g. in a worker thread) into counter."""
+    if counter is None:
+        yield None
+        return
+    token = _active.set(counter)
+    try:
+        yield counter
+    finally:
+        _active.reset(token)
+
+
+@contextmanager
+def count_queries():
+    """Count statements executed inside the block."""
+    token = start()
+    counter = _active.get()
+    try:
+        yield counter
+    finally:
+        _active.reset(token)
+
+
+@contextmanager
+def assert_max_queries(budget: int, max_repeats: Optional[int] = None):
+    """
+    Fail if the block runs more than budget statements.
+
+    Args:
+        budget: Maximum number of statements
+        max_repeats: Also fail if any single statement runs more often than this
+
+    Raises:
+        AssertionError: With the statement report when a limit is exceeded
+    """
+    with count_queries() as counter:
+        yield counter
+
+    problems: List[str] = []
+    if counter.total > budget:
+        problems.append(f"{counter.total} queries, budget {budget}")
+    if max_repeats is not None:
+        worst = max(counter.statements.values(), default=0)
+        if worst > max_repeats:
+            problems.append(f"a statement ran {worst} times, max {max_repeats}")
+
+    if problems:
+        raise AssertionError(f"{'; '.join(problems)}: {counter.report()}")
@@ -1,12 +1,15 @@
 from flask import jsonify
 
+from app.utils.server_timing import track
+
 def success_response(data=None, message=None, status_code=200):
     response = {'success': True}
     if data is not None:
         response['data'] = data
     if message:
         response['message'] = message
-    return jsonify(response), status_code
+    with track('serialize'):
+        return jsonify(response), status_code
 
 def error_response(code, message, details=None, status_code=400):
     response = {
@@ -15,4 +18,5 @@ def error_response(code, message, details=None, status_code=400):
     }
     if details:
         response['error']['details'] = details
-    return jsonify(response), status_code
+    with track('serialize'):
+        return jsonify(response), status_code
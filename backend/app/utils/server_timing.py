@@ -0,0 +1,94 @@
+"""
+Server Timing - Per-request time breakdown by component.
+
+Code that waits on something slow wraps it in track('<component>') or calls
+record(); the time is added to the current request's RequestTimings (kept in
+flask.g by ServerTimingMiddleware). Worker threads serving a request (e.g.
+plan step fetches) call attach() in their app context to report to it too.
+Without timings in g, or with the middleware disabled, both are no-ops.
+
+Components used in this app: db (SQLAlchemy cursor execute), cache
+(CacheService get/set), ai (provider HTTP calls), serialize (jsonify).
+
+Usage:
+    from app.utils.server_timing import track
+
+    with track('ai'):
+        response = client.post(...)
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from flask import g, has_app_context
+
+
+class RequestTimings:
+    """Accumulated component timings for one request (shared with its worker threads)."""
+
+    __slots__ = ('durations', 'counts', 'queries', 'sampled', 'max_queries', 'statement_chars', '_lock')
+
+    def __init__(self, sampled: bool = False, max_queries: int = 100, statement_chars: int = 500):
+        self.durations: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.queries: List[Dict[str, Any]] = []
+        self.sampled = sampled
+        self.max_queries = max_queries
+        self.statement_chars = statement_chars
+        self._lock = threading.Lock()
+
+    def add(self, component: str, seconds: float) -> None:
+        """Add one timed call for component."""
+        with self._lock:
+            self.durations[component] = self.durations.get(component, 0.0) + seconds
+            self.counts[component] = self.counts.get(component, 0) + 1
+
+    def add_query(self, statement: str, seconds: float) -> None:
+        """Keep the statement for the slow-request log (sampled requests only)."""
+        if self.sampled and len(self.queries) < self.max_queries:
+            with self._lock:
+                self.queries.append({
+                    'sql': ' '.join(statement.split())[:self.statement_chars],
+                    'ms': round(seconds * 1000, 2),
+                })
+
+    def header(self, total_seconds: float) -> str:
+        """Server-Timing header value, e.g. 'db;dur=12.1;desc="4 calls", total;dur=20.3'."""
+        parts = [
+            f'{name};dur={seconds * 1000:.1f};desc="{self.counts[name]} calls"'
+            for name, seconds in sorted(self.durations.items())
+        ]
+        parts.append(f'total;dur={total_seconds * 1000:.1f}')
+        return ', '.join(parts)
+
+
+def current() -> Optional[RequestTimings]:
+    """Timings of the current request (or attached ones), None outside an instrumented request."""
+    if not has_app_context():
+        return None
+    return g.get('server_timings')
+
+
+def attach(timings: Optional[RequestTimings]) -> None:
+    """Report this app context's timings (e.g. a worker thread's SQL) to a request's timings."""
+    if timings is not None:
+        g.server_timings = timings
+
+
+def record(component: str, seconds: float) -> None:
+    """Add seconds to component for the current request (no-op outside one)."""
+    timings = current()
+    if timings is not None:
+        timings.add(component, seconds)
+
+
+@contextmanager
+def track(component: str):
+    """Time the wrapped block as component."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(component, time.perf_counter() - start)
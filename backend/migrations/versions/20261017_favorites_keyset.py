@@ -0,0 +1,71 @@
+"""Keyset index for favorites and stored per-user favorites count.
+
+Revision ID: 20261017_favorites_keyset
+Revises: 20261017_video_impressions
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = '20261017_favorites_keyset'
+down_revision = '20261017_video_impressions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Replace (user_id, liked_at) index and add user_behavior_stats.favorites_count."""
+    # Serves ORDER BY liked_at DESC, id DESC and (liked_at, id) < cursor
+    op.execute("""
+        CREATE INDEX idx_user_liked_videos_user_liked_id
+        ON user_liked_videos (user_id, liked_at DESC, id DESC)
+    """)
+    op.drop_index('idx_user_liked_videos_liked_at', table_name='user_liked_videos')
+
+    op.add_column(
+        'user_behavior_stats',
+        sa.Column('favorites_count', sa.Integer(), server_default='0', nullable=False)
+    )
+
+    # Backfill existing stats rows
+    op.execute("""
+        UPDATE user_behavior_stats s
+        SET favorites_count = f.cnt
+        FROM (
+            SELECT user_id, COUNT(*) AS cnt
+            FROM user_liked_videos
+            GROUP BY user_id
+        ) f
+        WHERE s.user_id = f.user_id
+    """)
+
+    # Users with favorites but no stats row yet (column defaults are
+    # Python-side in the model, so spell them out here)
+    op.execute("""
+        INSERT INTO user_behavior_stats (
+            user_id, favorites_count,
+            total_actions_completed, total_days_active, avg_completion_rate,
+            current_streak_days, max_streak_days, current_difficulty,
+            preferred_creators, preferred_topics,
+            current_level, total_xp, achievements
+        )
+        SELECT
+            f.user_id, COUNT(*),
+            0, 0, 0,
+            0, 0, 5,
+            '{}', '{}',
+            'Beginner', 0, '[]'
+        FROM user_liked_videos f
+        LEFT JOIN user_behavior_stats s ON s.user_id = f.user_id
+        WHERE s.user_id IS NULL
+        GROUP BY f.user_id
+    """)
+
+
+def downgrade():
+    """Restore the (user_id, liked_at) index and drop favorites_count."""
+    op.drop_column('user_behavior_stats', 'favorites_count')
+    op.create_index('idx_user_liked_videos_liked_at', 'user_liked_videos', ['user_id', 'liked_at'])
+    op.execute("DROP INDEX IF EXISTS idx_user_liked_videos_user_liked_id")
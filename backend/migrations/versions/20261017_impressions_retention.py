@@ -0,0 +1,30 @@
+"""Index video_impressions.shown_at for the daily retention delete.
+
+Revision ID: 20261017_impressions_retention
+Revises: 20261017_partition_logs
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+# revision identifiers
+revision = '20261017_impressions_retention'
+down_revision = '20261017_partition_logs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add shown_at index (prune_video_impressions: WHERE shown_at < cutoff)."""
+    # CONCURRENTLY so writes from plan generation aren't blocked while it builds
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_video_impressions_shown_at "
+            "ON video_impressions (shown_at)"
+        )
+
+
+def downgrade():
+    """Drop shown_at index."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_video_impressions_shown_at")
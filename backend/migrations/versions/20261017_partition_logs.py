@@ -0,0 +1,186 @@
+"""Range-partition request_logs and analytics_events on created_at.
+
+The existing tables are not copied: each is renamed to <table>_legacy and
+attached as the partition covering everything up to the end of the current
+interval (or of the newest row, if later), so live rows written today stay
+valid. A validated CHECK constraint matching that bound and a unique
+(id, created_at) index are built first, outside the main transaction, so
+ATTACH PARTITION can skip its full-table validation scan and adopt the
+index instead of building it while holding ACCESS EXCLUSIVE. New
+partitions start where the legacy one ends and are kept ahead by
+app.tasks.partition_tasks.maintain_partitions, which also expires the
+legacy partition once it falls out of retention. A DEFAULT partition
+catches rows past the newest partition if maintenance falls behind.
+
+Revision ID: 20261017_partition_logs
+Revises: 20261017_favorites_keyset
+Create Date: 2026-10-17
+"""
+from datetime import datetime, timedelta, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = '20261017_partition_logs'
+down_revision = '20261017_favorites_keyset'
+branch_labels = None
+depends_on = None
+
+# Same alignment as app.tasks.partition_tasks.interval_start
+PARTITION_EPOCH = datetime(1970, 1, 5, tzinfo=timezone.utc)
+
+# table -> (interval_days, premake_days); matches LOG_PARTITIONS at the time of writing
+TABLES = {
+    'request_logs': (1, 7),
+    'analytics_events': (7, 28),
+}
+
+COLUMNS = {
+    'request_logs': """
+        endpoint VARCHAR(100) NOT NULL,
+        method VARCHAR(10) NOT NULL,
+        status INTEGER NOT NULL,
+        latency_ms INTEGER NOT NULL,
+        user_id BIGINT REFERENCES users(id) ON DELETE SET NULL,
+        ip_address VARCHAR(45),
+    """,
+    'analytics_events': """
+        user_id BIGINT REFERENCES users(id) ON DELETE SET NULL,
+        event_type VARCHAR(50) NOT NULL,
+        event_data JSONB NOT NULL DEFAULT '{}',
+    """,
+}
+
+# Indexes created on the partitioned table (and so on every partition)
+INDEXES = {
+    'request_logs': [
+        ('idx_logs_endpoint', 'endpoint'),
+        ('idx_logs_user', 'user_id'),
+        ('idx_logs_created_at', 'created_at'),
+    ],
+    'analytics_events': [
+        ('idx_events_user', 'user_id'),
+        ('idx_events_type_date', 'event_type, created_at'),
+        ('idx_events_created_at', 'created_at'),
+    ],
+}
+
+# Index names that may exist on the unpartitioned tables
+LEGACY_INDEXES = {
+    'request_logs': ['idx_logs_endpoint', 'idx_logs_user', 'idx_logs_created_at'],
+    'analytics_events': ['idx_events_user', 'idx_events_type_date',
+                         'idx_events_created_at', 'ix_analytics_events_user_id'],
+}
+
+
+# Rows may keep arriving between the CHECK validation and the rename; the
+# legacy bound covers at least this far past the start of the migration
+WRITE_MARGIN = timedelta(hours=1)
+
+
+def _interval_start(moment, interval_days):
+    days = (moment - PARTITION_EPOCH).days
+    return PARTITION_EPOCH + timedelta(days=days - days % interval_days)
+
+
+def _legacy_upper_bound(conn, table, interval_days, now):
+    """End of the interval containing now + WRITE_MARGIN or the newest row, whichever is later."""
+    newest = conn.execute(sa.text(f"SELECT max(created_at) FROM {table}")).scalar()
+    latest = max(now + WRITE_MARGIN, newest or now)
+    return _interval_start(latest, interval_days) + timedelta(days=interval_days)
+
+
+def upgrade():
+    """Convert both tables to RANGE (created_at) partitioning."""
+    conn = op.get_bind()
+    now = datetime.now(timezone.utc)
+    bounds = {}
+
+    # Prove the legacy bound up front: NOT VALID takes a brief lock without
+    # scanning; VALIDATE scans under SHARE UPDATE EXCLUSIVE, so writes go on.
+    # The validated CHECK also lets SET NOT NULL skip its scan.
+    with op.get_context().autocommit_block():
+        for table, (interval_days, _) in TABLES.items():
+            bounds[table] = _legacy_upper_bound(conn, table, interval_days, now)
+            op.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {table}_legacy_bound")
+            op.execute(f"""
+                ALTER TABLE {table} ADD CONSTRAINT {table}_legacy_bound
+                CHECK (created_at IS NOT NULL AND created_at < '{bounds[table].isoformat()}') NOT VALID
+            """)
+            op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {table}_legacy_bound")
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN created_at SET NOT NULL")
+
+            # Index for the parent's PRIMARY KEY (id, created_at), built without
+            # blocking writes; dropped first in case a failed run left it invalid
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {table}_legacy_pkey")
+            op.execute(f"CREATE UNIQUE INDEX CONCURRENTLY {table}_legacy_pkey ON {table} (id, created_at)")
+
+    for table, (interval_days, premake_days) in TABLES.items():
+        sequence = conn.execute(sa.text(f"SELECT pg_get_serial_sequence('{table}', 'id')")).scalar()
+
+        # ATTACH only adopts a unique index that backs a matching constraint
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {table}_pkey")
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_legacy_pkey PRIMARY KEY USING INDEX {table}_legacy_pkey")
+
+        op.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+        for index in LEGACY_INDEXES[table]:
+            op.execute(f"ALTER INDEX IF EXISTS {index} RENAME TO {index}_legacy")
+
+        op.execute(f"""
+            CREATE TABLE {table} (
+                id BIGINT NOT NULL DEFAULT nextval('{sequence}'),
+                {COLUMNS[table]}
+                created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                PRIMARY KEY (id, created_at)
+            ) PARTITION BY RANGE (created_at)
+        """)
+        # Keep the sequence when the legacy partition is eventually dropped
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+
+        for name, columns in INDEXES[table]:
+            op.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+
+        # Old rows stay where they are, as one partition ending at the
+        # validated bound (the CHECK lets ATTACH skip its validation scan)
+        start = bounds[table]
+        op.execute(f"""
+            ALTER TABLE {table} ATTACH PARTITION {table}_legacy
+            FOR VALUES FROM (MINVALUE) TO ('{start.isoformat()}')
+        """)
+        op.execute(f"ALTER TABLE {table}_legacy DROP CONSTRAINT {table}_legacy_bound")
+
+        while start <= now + timedelta(days=premake_days):
+            end = start + timedelta(days=interval_days)
+            op.execute(f"""
+                CREATE TABLE {table}_p{start:%Y%m%d} PARTITION OF {table}
+                FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')
+            """)
+            start = end
+
+        # Rows past the newest partition land here instead of failing their
+        # whole BatchWriter batch; maintain_partitions reports any it finds
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+
+def downgrade():
+    """Copy rows back into plain tables (detached archive partitions are not included)."""
+    conn = op.get_bind()
+
+    for table in TABLES:
+        sequence = conn.execute(sa.text(f"SELECT pg_get_serial_sequence('{table}', 'id')")).scalar()
+
+        op.execute(f"ALTER TABLE {table} RENAME TO {table}_partitioned")
+        op.execute(f"CREATE TABLE {table} (LIKE {table}_partitioned INCLUDING DEFAULTS)")
+        op.execute(f"INSERT INTO {table} SELECT * FROM {table}_partitioned")
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+        op.execute(f"DROP TABLE {table}_partitioned")
+
+        op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id)")
+        op.execute(f"""
+            ALTER TABLE {table} ADD FOREIGN KEY (user_id)
+            REFERENCES users(id) ON DELETE SET NULL
+        """)
+        for name, columns in INDEXES[table]:
+            op.execute(f"CREATE INDEX {name} ON {table} ({columns})")
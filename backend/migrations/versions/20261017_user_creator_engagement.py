@@ -0,0 +1,48 @@
+"""Add user_creator_engagement aggregate for toxic detection.
+
+Revision ID: 20261017_user_creator_engagement
+Revises: 20251225_add_user_liked_videos
+Create Date: 2026-10-17
+
+Populate existing data after upgrading:
+    python -c "from app.tasks.engagement_tasks import backfill_user_creator_engagement; backfill_user_creator_engagement()"
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = '20261017_user_creator_engagement'
+down_revision = '20251225_add_user_liked_videos'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create user_creator_engagement table."""
+    op.create_table(
+        'user_creator_engagement',
+        sa.Column('id', sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column('user_id', sa.BigInteger(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('creator_username', sa.String(256), nullable=False),
+        sa.Column('view_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('completion_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('last_seen_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+
+        # Upsert target
+        sa.UniqueConstraint('user_id', 'creator_username', name='uq_user_creator_engagement_user_creator'),
+    )
+
+    # Toxic lookup: WHERE user_id = ? AND view_count >= ? ORDER BY view_count DESC
+    op.create_index(
+        'idx_user_creator_engagement_views',
+        'user_creator_engagement',
+        ['user_id', 'view_count']
+    )
+
+
+def downgrade():
+    """Drop user_creator_engagement table."""
+    op.drop_index('idx_user_creator_engagement_views', table_name='user_creator_engagement')
+    op.drop_table('user_creator_engagement')
@@ -0,0 +1,48 @@
+"""Add video_category_candidates index for curation.
+
+Revision ID: 20261017_video_category_candidates
+Revises: 20261017_user_creator_engagement
+Create Date: 2026-10-17
+
+Populate after upgrading:
+    python -c "from app.tasks.curation_tasks import refresh_curation_index; refresh_curation_index()"
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = '20261017_video_category_candidates'
+down_revision = '20261017_user_creator_engagement'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create video_category_candidates table."""
+    op.create_table(
+        'video_category_candidates',
+        sa.Column('id', sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column('category_id', sa.BigInteger(), sa.ForeignKey('categories.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('video_id', sa.String(50), sa.ForeignKey('tiktok_videos.video_id', ondelete='CASCADE'), nullable=False),
+        sa.Column('creator_username', sa.String(100), nullable=False),
+        sa.Column('quality_score', sa.Numeric(5, 4), nullable=False),
+        sa.Column('category_score', sa.Numeric(5, 4), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+
+        sa.UniqueConstraint('category_id', 'video_id', name='uq_video_category_candidates_category_video'),
+    )
+
+    # Top-K per category: WHERE category_id = ? ORDER BY quality_score DESC
+    op.execute("""
+        CREATE INDEX idx_video_category_candidates_rank
+        ON video_category_candidates (category_id, quality_score DESC)
+    """)
+    op.create_index('idx_video_category_candidates_video', 'video_category_candidates', ['video_id'])
+
+
+def downgrade():
+    """Drop video_category_candidates table."""
+    op.drop_index('idx_video_category_candidates_video', table_name='video_category_candidates')
+    op.execute("DROP INDEX IF EXISTS idx_video_category_candidates_rank")
+    op.drop_table('video_category_candidates')
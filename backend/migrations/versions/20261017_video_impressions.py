@@ -0,0 +1,35 @@
+"""Add video_impressions log for curation dedup.
+
+Revision ID: 20261017_video_impressions
+Revises: 20261017_video_category_candidates
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = '20261017_video_impressions'
+down_revision = '20261017_video_category_candidates'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create video_impressions table."""
+    op.create_table(
+        'video_impressions',
+        sa.Column('id', sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column('user_id', sa.BigInteger(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('video_id', sa.String(50), nullable=False),
+        sa.Column('shown_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+
+    # Recent impressions: WHERE user_id = ? AND shown_at >= ?
+    op.create_index('idx_video_impressions_user_shown', 'video_impressions', ['user_id', 'shown_at'])
+
+
+def downgrade():
+    """Drop video_impressions table."""
+    op.drop_index('idx_video_impressions_user_shown', table_name='video_impressions')
+    op.drop_table('video_impressions')
@@ -0,0 +1,82 @@
+"""
+Unit tests for the v2 analytics batch endpoint.
+
+Run with: pytest tests/test_analytics_v2.py -v
+"""
+
+from unittest.mock import patch
+
+import jwt
+import pytest
+
+from app import create_app
+from config import Config
+
+
+@pytest.fixture
+def client():
+    app = create_app('testing')
+    app.config['RATELIMIT_ENABLED'] = False
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers():
+    token = jwt.encode({'sub': '7', 'type': 'access'}, Config.JWT_SECRET_KEY, algorithm='HS256')
+    return {'Authorization': f'Bearer {token}'}
+
+
+class TestTrackBatch:
+    """Tests for POST /api/v2/analytics/track/batch."""
+
+    @patch('app.routes.analytics_v2.analytics_service')
+    def test_tracks_all_events(self, mock_analytics, client, auth_headers):
+        """Valid events are passed to the service in one call."""
+        mock_analytics.track_events.return_value = 2
+        events = [
+            {'event_type': 'detox_completed', 'event_data': {'plan_id': 'p1'}},
+            {'event_type': 'video_liked'},
+        ]
+
+        response = client.post('/api/v2/analytics/track/batch', json={'events': events}, headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.get_json()['data'] == {'tracked': 2}
+        mock_analytics.track_events.assert_called_once_with(7, events)
+
+    @patch('app.routes.analytics_v2.analytics_service')
+    def test_invalid_event_rejects_batch(self, mock_analytics, client, auth_headers):
+        """Any invalid event fails the whole batch and is reported by index."""
+        events = [
+            {'event_type': 'detox_completed'},
+            {'event_type': 'not_a_type'},
+            'oops',
+        ]
+
+        response = client.post('/api/v2/analytics/track/batch', json={'events': events}, headers=auth_headers)
+
+        assert response.status_code == 400
+        details = response.get_json()['error']['details']
+        assert [d['index'] for d in details] == [1, 2]
+        mock_analytics.track_events.assert_not_called()
+
+    @patch('app.routes.analytics_v2.analytics_service')
+    def test_rejects_empty_and_oversized(self, mock_analytics, client, auth_headers):
+        """Empty and too-large batches are rejected."""
+        from app.routes.analytics_v2 import MAX_BATCH_EVENTS
+
+        empty = client.post('/api/v2/analytics/track/batch', json={'events': []}, headers=auth_headers)
+        too_many = client.post(
+            '/api/v2/analytics/track/batch',
+            json={'events': [{'event_type': 'video_liked'}] * (MAX_BATCH_EVENTS + 1)},
+            headers=auth_headers
+        )
+
+        assert empty.status_code == 400
+        assert too_many.status_code == 400
+        mock_analytics.track_events.assert_not_called()
+
+    def test_requires_auth(self, client):
+        """Anonymous requests are rejected."""
+        response = client.post('/api/v2/analytics/track/batch', json={'events': []})
+        assert response.status_code == 401
@@ -0,0 +1,146 @@
+"""
+Unit tests for BatchWriter and buffered analytics ingestion.
+
+Run with: pytest tests/test_batch_writer.py -v
+"""
+
+import importlib
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app import create_app
+from app.utils.batch_writer import BatchWriter
+
+
+@pytest.fixture
+def app_ctx():
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+
+
+class TestBatchWriter:
+    """Tests for the bounded write buffer."""
+
+    def test_flush_writes_in_batches(self):
+        """flush() hands queued rows to flush_fn in max_batch chunks."""
+        batches = []
+        writer = BatchWriter('test', flush_fn=batches.append, max_batch=2, flush_interval=60)
+        writer._ensure_thread = MagicMock()
+
+        for i in range(5):
+            assert writer.submit({'i': i}) is True
+
+        assert writer.flush() == 5
+        assert [len(b) for b in batches] == [2, 2, 1]
+        assert writer.stats()['written'] == 5
+        assert writer.stats()['batches'] == 3
+
+    def test_full_queue_drops(self):
+        """Rows beyond max_queue are dropped, not blocked on."""
+        writer = BatchWriter('test', flush_fn=MagicMock(), max_queue=2, flush_interval=60)
+        writer._ensure_thread = MagicMock()
+
+        assert writer.submit({}) is True
+        assert writer.submit({}) is True
+        assert writer.submit({}) is False
+        assert writer.stats()['dropped'] == 1
+        assert writer.stats()['pending'] == 2
+
+    def test_failed_batch_is_counted(self):
+        """A failing flush_fn doesn't raise; the rows are counted as failed."""
+        writer = BatchWriter('test', flush_fn=MagicMock(side_effect=RuntimeError('db down')), flush_interval=60)
+        writer._ensure_thread = MagicMock()
+        writer.submit({})
+        writer.submit({})
+
+        writer.flush()
+
+        assert writer.stats()['failed'] == 2
+        assert writer.stats()['written'] == 0
+
+    def test_background_thread_flushes_on_interval(self):
+        """A partial batch is written once flush_interval elapses."""
+        written = threading.Event()
+        writer = BatchWriter('test', flush_fn=lambda rows: written.set(), max_batch=100, flush_interval=0.05)
+
+        writer.submit({'i': 1})
+
+        assert written.wait(2)
+        writer.close()
+
+    def test_close_flushes_and_rejects_new_rows(self):
+        """close() writes pending rows; later submits are dropped."""
+        batches = []
+        writer = BatchWriter('test', flush_fn=batches.append, flush_interval=60)
+        writer._ensure_thread = MagicMock()
+        writer.submit({'i': 1})
+
+        writer.close()
+
+        assert batches == [[{'i': 1}]]
+        assert writer.submit({'i': 2}) is False
+
+
+class TestAnalyticsIngestion:
+    """Tests for AnalyticsService buffering."""
+
+    def test_testing_app_disables_buffer(self, app_ctx):
+        """Under TESTING events are inserted immediately."""
+        from app.services.analytics_service import analytics_service
+
+        assert analytics_service._buffered is False
+
+    def test_buffered_track_enqueues(self):
+        """With buffering on, track_event only queues the row."""
+        from app.services.analytics_service import AnalyticsService
+
+        service = AnalyticsService()
+        service._buffered = True
+        service._writer = MagicMock()
+        service._writer.submit.return_value = True
+
+        assert service.track_event('plan_viewed', user_id=7, properties={'day': 1}) is True
+
+        row = service._writer.submit.call_args[0][0]
+        assert row['user_id'] == 7
+        assert row['event_type'] == 'plan_viewed'
+        assert row['event_data'] == {'day': 1}
+        assert row['created_at'] is not None
+
+    def test_insert_events_is_one_statement(self, app_ctx):
+        """A batch is written with a single multi-row INSERT."""
+        module = importlib.import_module('app.services.analytics_service')
+
+        rows = [
+            {'user_id': 1, 'event_type': 'plan_viewed', 'event_data': {}, 'created_at': None},
+            {'user_id': 2, 'event_type': 'plan_viewed', 'event_data': {}, 'created_at': None},
+        ]
+        with patch.object(module.db.session, 'execute') as execute, \
+                patch.object(module.db.session, 'commit') as commit:
+            module.AnalyticsService._insert_events(rows)
+
+        assert execute.call_count == 1
+        sql = str(execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert sql.startswith('INSERT INTO analytics_events')
+        assert sql.count('%(user_id_m') == 2
+        commit.assert_called_once()
+
+    def test_track_events_unbuffered_single_insert(self):
+        """Without buffering a batch of events is one _insert_events call."""
+        from app.services.analytics_service import AnalyticsService
+
+        service = AnalyticsService()
+        with patch.object(AnalyticsService, '_insert_events') as insert_events:
+            tracked = service.track_events(7, [
+                {'event_type': 'video_liked'},
+                {'event_type': 'video_shared', 'event_data': {'video_id': '1'}},
+            ])
+
+        assert tracked == 2
+        rows = insert_events.call_args[0][0]
+        assert [r['event_type'] for r in rows] == ['video_liked', 'video_shared']
+        assert rows[0]['event_data'] == {}
@@ -0,0 +1,58 @@
+"""
+Unit tests for the cache codec.
+
+Run with: pytest tests/test_cache_codec.py -v
+"""
+
+import json
+
+from app.utils.cache_codec import CacheCodec, FORMAT_VERSION, FLAG_COMPRESSED
+
+
+class TestCacheCodec:
+    """Tests for CacheCodec."""
+
+    def test_roundtrip_default_codec(self):
+        """Values survive encode/decode with the preferred codec."""
+        codec = CacheCodec()
+        value = {'plan_id': 'abc', 'steps': [1, 2, 3], 'ok': True, 'none': None}
+        raw = codec.encode(value)
+
+        assert raw[0] == FORMAT_VERSION
+        assert codec.decode(raw) == value
+
+    def test_json_fallback_codec(self):
+        """Stdlib json is used when explicitly requested."""
+        codec = CacheCodec(preferred='json')
+        raw = codec.encode([1, 2])
+        assert codec.name == 'json'
+        assert raw[1:2] == b'j'
+        assert codec.decode(raw) == [1, 2]
+
+    def test_unknown_preference_falls_back(self):
+        """An unavailable codec name falls back to an available one."""
+        codec = CacheCodec(preferred='does-not-exist')
+        assert codec.decode(codec.encode({'a': 1})) == {'a': 1}
+
+    def test_large_payload_is_compressed(self):
+        """Payloads above the threshold are zlib-compressed."""
+        codec = CacheCodec(compress_threshold=100)
+        value = {'videos': [{'description': 'x' * 50, 'id': i} for i in range(50)]}
+        raw = codec.encode(value)
+
+        assert raw[2] & FLAG_COMPRESSED
+        assert len(raw) < len(json.dumps(value))
+        assert codec.decode(raw) == value
+
+    def test_legacy_json_entries_readable(self):
+        """Entries written before the codec (plain JSON) still decode."""
+        codec = CacheCodec()
+        legacy = json.dumps({'a': [1, 2]})
+        assert codec.decode(legacy.encode('utf-8')) == {'a': [1, 2]}
+        assert codec.decode(legacy) == {'a': [1, 2]}
+
+    def test_entries_readable_across_codecs(self):
+        """A json-encoded entry decodes in a process preferring another codec."""
+        writer = CacheCodec(preferred='json')
+        reader = CacheCodec()
+        assert reader.decode(writer.encode({'k': 'v'})) == {'k': 'v'}
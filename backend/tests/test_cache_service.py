@@ -0,0 +1,596 @@
+"""
+Unit tests for CacheService.
+
+Run with: pytest tests/test_cache_service.py -v
+"""
+
+import pytest
+from unittest.mock import patch, MagicMock
+
+from app.services import cache_service as cache_module
+from app.services.cache_service import CacheService, LocalLRUCache
+
+
+_real_get_redis = cache_module._get_redis
+
+
+@pytest.fixture(autouse=True)
+def memory_backend():
+    """Force the in-memory fallback so tests never touch a real Redis."""
+    with patch.object(cache_module, '_get_redis', return_value=None):
+        cache_module._memory_cache.clear()
+        cache_module._pending_invalidations.take()
+        yield
+        cache_module._memory_cache.clear()
+        cache_module._pending_invalidations.take()
+
+
+class TestLocalLRUCache:
+    """Tests for the per-worker L1 tier."""
+
+    def test_get_miss_then_hit(self):
+        """Miss and hit are counted per prefix."""
+        lru = LocalLRUCache(max_entries=10)
+        assert lru.get('categories:active') is None
+        lru.set('categories:active', [1, 2], ttl=60)
+        assert lru.get('categories:active') == [1, 2]
+
+        stats = lru.stats()['categories']
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['hit_ratio'] == 0.5
+
+    def test_lru_eviction(self):
+        """Least recently used entry is evicted when full."""
+        lru = LocalLRUCache(max_entries=2)
+        lru.set('settings:a', 1, ttl=60)
+        lru.set('settings:b', 2, ttl=60)
+        lru.get('settings:a')  # a is now most recent
+        lru.set('settings:c', 3, ttl=60)
+
+        assert lru.get('settings:b') is None
+        assert lru.get('settings:a') == 1
+        assert lru.stats()['settings']['evictions'] == 1
+
+    def test_expired_entry_is_miss(self):
+        """Entries past their TTL are not returned."""
+        lru = LocalLRUCache(max_entries=10)
+        with patch.object(cache_module.time, 'monotonic', return_value=1000.0):
+            lru.set('user_cats:1', ['x'], ttl=30)
+        with patch.object(cache_module.time, 'monotonic', return_value=1031.0):
+            assert lru.get('user_cats:1') is None
+
+    def test_delete_prefix(self):
+        """Prefix delete only removes matching keys."""
+        lru = LocalLRUCache(max_entries=10)
+        lru.set('guided_plan:1:a', 1, ttl=60)
+        lru.set('guided_plan:2:a', 2, ttl=60)
+        assert lru.delete_prefix('guided_plan:1:') == 1
+        assert lru.get('guided_plan:2:a') == 2
+
+    def test_max_bytes_evicts_oldest(self):
+        """Byte budget evicts LRU entries and rejects oversize values."""
+        lru = LocalLRUCache(max_entries=100, max_bytes=30)
+        lru.set('plan:a', 'x' * 10, ttl=60)
+        lru.set('plan:b', 'y' * 10, ttl=60)
+        lru.set('plan:c', 'z' * 10, ttl=60)
+
+        assert lru.get('plan:a') is None
+        assert lru.total_bytes <= 30
+        assert lru.set('plan:big', 'w' * 100, ttl=60) is False
+
+    def test_sweep_drops_expired_entries(self):
+        """Expired entries are removed by the amortised sweep on set()."""
+        with patch.object(cache_module.time, 'monotonic', return_value=1000.0):
+            lru = LocalLRUCache(max_entries=100, sweep_interval=10)
+            lru.set('plan:a', 1, ttl=5)
+            lru.set('plan:b', 2, ttl=5)
+        with patch.object(cache_module.time, 'monotonic', return_value=1011.0):
+            lru.set('plan:c', 3, ttl=5)
+        assert len(lru) == 1
+
+    def test_concurrent_sets_stay_bounded(self):
+        """Concurrent writers never push the store past max_entries."""
+        import threading
+        lru = LocalLRUCache(max_entries=50)
+
+        def writer(n):
+            for i in range(500):
+                lru.set(f'plan:{n}:{i}', i, ttl=60)
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(lru) == 50
+
+
+class TestCacheServiceL1:
+    """Tests for CacheService with the L1 tier enabled."""
+
+    def test_hot_prefix_served_from_l1(self):
+        """Second get of a hot prefix does not reach the L2 tier."""
+        service = CacheService(l1_enabled=True)
+        service.set_categories([{'id': 1}])
+
+        with patch.object(service, '_get_l2') as l2:
+            assert service.get_categories() == [{'id': 1}]
+            l2.assert_not_called()
+
+    def test_cold_prefix_skips_l1(self):
+        """Prefixes without an L1 TTL always go to L2."""
+        service = CacheService(l1_enabled=True)
+        service.set('plan:1:2:2025-01-01', {'a': 1}, ttl=60)
+        assert service.l1.get('plan:1:2:2025-01-01') is None
+        assert service.get('plan:1:2:2025-01-01') == {'a': 1}
+
+    def test_invalidation_clears_l1(self):
+        """Invalidation removes entries from L1 as well."""
+        service = CacheService(l1_enabled=True)
+        service.set_guided_plan(1, 'fitness', {'plan_id': 'p'})
+        service.invalidate_user_guided_plans(1)
+        assert service.get_guided_plan(1, 'fitness') is None
+
+    def test_top_level_mutation_does_not_leak(self):
+        """Callers tweaking top-level fields don't corrupt the L1 entry."""
+        service = CacheService(l1_enabled=True)
+        service.set_guided_plan(1, 'fitness', {'plan_id': 'p'})
+
+        cached = service.get_guided_plan(1, 'fitness')
+        cached['from_cache'] = True
+
+        assert 'from_cache' not in service.get_guided_plan(1, 'fitness')
+
+    def test_l1_stats_lists_hot_prefixes(self):
+        """Stats include every hot prefix, even before first use."""
+        service = CacheService(l1_enabled=True)
+        stats = service.get_l1_stats()
+        for prefix in ('settings', 'categories', 'user_cats', 'guided_plan'):
+            assert prefix in stats
+
+    def test_l1_disabled(self):
+        """With L1 disabled the service behaves as before."""
+        service = CacheService(l1_enabled=False)
+        service.set_settings({'a': 1})
+        assert service.get_settings() == {'a': 1}
+        assert service.get_l1_stats() == {}
+
+
+class TestTagInvalidation:
+    """Tests for tag-set based invalidation on the Redis tier."""
+
+    def _redis(self, tags_since=0.0):
+        redis = MagicMock()
+        redis.get.return_value = str(tags_since).encode()
+        pipe = redis.pipeline.return_value
+        pipe.execute.return_value = [2, 2]
+        return redis, pipe
+
+    def test_tag_for_keys(self):
+        """Keys map to their tag by configured depth."""
+        service = CacheService(l1_enabled=False)
+        assert service._tag_for('categories:active_True_en') == 'categories:'
+        assert service._tag_for('guided_plan:42:fitness:2025-01-01') == 'guided_plan:42:'
+        assert service._tag_for('settings:all') is None
+
+    def test_set_registers_key_in_tag(self):
+        """Tagged keys are added to their tag set in one pipeline."""
+        service = CacheService(l1_enabled=False)
+        redis, pipe = self._redis()
+        with patch.object(cache_module, '_get_redis', return_value=redis):
+            service.set_guided_plan(42, 'fitness', {'plan_id': 'p'})
+
+        pipe.zadd.assert_called_once()
+        assert pipe.zadd.call_args[0][0] == 'ztag:guided_plan:42:'
+        pipe.zremrangebyscore.assert_called_once()
+        redis.setex.assert_not_called()
+
+    def test_tag_set_stays_bounded(self):
+        """Members are scored by expiry and pruned once expired."""
+        service = CacheService(l1_enabled=False)
+        redis, pipe = self._redis()
+        with patch.object(cache_module, '_get_redis', return_value=redis), \
+                patch.object(cache_module.time, 'time', return_value=1000.0):
+            service.set('guided_plan:42:fitness:2025-01-01', {'p': 1}, ttl=60)
+
+        pipe.zadd.assert_called_once_with(
+            'ztag:guided_plan:42:', {'guided_plan:42:fitness:2025-01-01': 1060.0}
+        )
+        pipe.zremrangebyscore.assert_called_once_with('ztag:guided_plan:42:', '-inf', 1000.0)
+
+    def test_delete_removes_tag_member(self):
+        """Deleting a tagged key also drops it from its tag set."""
+        service = CacheService(l1_enabled=False)
+        redis, pipe = self._redis()
+        with patch.object(cache_module, '_get_redis', return_value=redis):
+            service.invalidate_guided_plan(42, 'fitness')
+            service.delete_many(['categories:a', 'categories:b', 'settings:all'])
+
+        assert pipe.zrem.call_args_list[0][0][0] == 'ztag:guided_plan:42:'
+        pipe.zrem.assert_called_with('ztag:categories:', 'categories:a', 'categories:b')
+
+    def test_invalidate_uses_tag_not_keys(self):
+        """Invalidating a user's plans reads the tag set, never KEYS."""
+        service = CacheService(l1_enabled=False)
+        redis, pipe = self._redis()
+        redis.zrange.side_effect = [['guided_plan:42:a:d', 'guided_plan:42:b:d'], []]
+        with patch.object(cache_module, '_get_redis', return_value=redis):
+            count = service.invalidate_user_guided_plans(42)
+
+        assert count == 2
+        redis.keys.assert_not_called()
+        assert [c[0][0] for c in redis.zrange.call_args_list] == [
+            'ztag:guided_plan:42:', 'ztag:guided_plan_draft:42:',
+        ]
+        pipe.zrem.assert_called_once()
+
+    def test_scans_while_untagged_keys_may_be_live(self):
+        """Within a TTL of tags first being used, pre-tag keys are found by SCAN."""
+        import time
+        service = CacheService(l1_enabled=False)
+        redis, pipe = self._redis(tags_since=time.time() - 60)
+        redis.scan_iter.return_value = iter(['guided_plan:42:a:d'])
+        with patch.object(cache_module, '_get_redis', return_value=redis):
+            service.delete_pattern('guided_plan:42:*')
+
+        redis.scan_iter.assert_called_once()
+        redis.zrange.assert_not_called()
+        pipe.delete.assert_called_once_with('guided_plan:42:a:d')
+        pipe.zrem.assert_called_once_with('ztag:guided_plan:42:', 'guided_plan:42:a:d')
+
+    def test_untagged_pattern_uses_scan(self):
+        """Patterns without a tag fall back to SCAN."""
+        service = CacheService(l1_enabled=False)
+        redis, pipe = self._redis()
+        redis.scan_iter.return_value = iter(['plan:1:2:d'])
+        pipe.execute.return_value = [1]
+        with patch.object(cache_module, '_get_redis', return_value=redis):
+            assert service.delete_pattern('plan:*') == 1
+        redis.keys.assert_not_called()
+
+
+class TestRedisCircuitBreaker:
+    """Tests for reconnection via the circuit breaker."""
+
+    def _breaker(self, client):
+        settings = {
+            'max_connections': 5, 'socket_timeout': 0.1, 'retries': 0,
+            'failure_threshold': 2, 'reset_timeout': 10,
+        }
+        breaker = cache_module.RedisCircuitBreaker(settings)
+        breaker._connect = MagicMock(return_value=client)
+        return breaker
+
+    def test_failed_boot_recovers_after_probe(self):
+        """A failed first ping is retried after reset_timeout."""
+        import redis
+        client = MagicMock()
+        client.ping.side_effect = [redis.ConnectionError('down'), True]
+        breaker = self._breaker(client)
+
+        with patch.object(cache_module.time, 'monotonic', return_value=100.0):
+            assert breaker.get_client() is None
+            assert breaker.stats()['state'] == 'open'
+            assert breaker.get_client() is None  # still cooling down
+
+        with patch.object(cache_module.time, 'monotonic', return_value=111.0):
+            assert breaker.get_client() is client
+
+        stats = breaker.stats()
+        assert stats['state'] == 'closed'
+        assert stats['transitions'] == {
+            'closed->open': 1, 'open->half_open': 1, 'half_open->closed': 1,
+        }
+
+    def test_consecutive_errors_open_circuit(self):
+        """Connection errors past the threshold open the circuit."""
+        import redis
+        breaker = self._breaker(MagicMock())
+        assert breaker.get_client() is not None
+
+        breaker.record_failure(redis.ConnectionError('x'))
+        assert breaker.stats()['state'] == 'closed'
+        breaker.record_failure(redis.TimeoutError('x'))
+        assert breaker.stats()['state'] == 'open'
+        assert breaker.get_client() is None
+
+    def test_non_connection_errors_ignored(self):
+        """Data errors don't count towards opening the circuit."""
+        breaker = self._breaker(MagicMock())
+        breaker.get_client()
+        for _ in range(5):
+            breaker.record_failure(ValueError('bad json'))
+        assert breaker.stats()['state'] == 'closed'
+
+
+class TestOutageInvalidations:
+    """Invalidations Redis missed while unavailable are replayed on recovery."""
+
+    def test_replayed_when_redis_returns(self):
+        """Deletes and writes done on the memory fallback become Redis deletes later."""
+        service = CacheService(l1_enabled=False)
+        service.invalidate_settings()
+        service.set_user_categories(7, [1])
+        service.invalidate_user_guided_plans(42)
+
+        redis = MagicMock()
+        redis.get.return_value = b'0'
+        pipe = redis.pipeline.return_value
+        pipe.execute.return_value = [1]
+        with patch.object(cache_module, '_get_redis', _real_get_redis), \
+                patch.object(cache_module._breaker, 'get_client', return_value=redis), \
+                patch.object(cache_module, 'cache_service', service):
+            service.get('waitlist:1')
+
+        deleted = {k for c in pipe.delete.call_args_list for k in c[0]} | \
+            {c[0][0] for c in redis.delete.call_args_list}
+        assert {'settings:all', 'user_cats:7'} <= deleted
+        assert {c[0][0] for c in redis.zrange.call_args_list} == {
+            'ztag:guided_plan:42:', 'ztag:guided_plan_draft:42:',
+        }
+        assert not cache_module._pending_invalidations
+
+    def test_failed_delete_is_remembered(self):
+        """A delete failing before the breaker opens is kept for replay."""
+        import redis as redis_lib
+        service = CacheService(l1_enabled=False)
+        redis = MagicMock()
+        redis.delete.side_effect = redis_lib.ConnectionError('down')
+
+        with patch.object(cache_module, '_get_redis', return_value=redis):
+            assert service.delete('settings:all') is False
+
+        assert cache_module._pending_invalidations.take() == ({'settings:all'}, set())
+
+    def test_bounded(self):
+        """Past max_items, keys collapse into their prefix pattern."""
+        pending = cache_module.PendingInvalidations(max_items=1)
+        pending.add_keys(['user_cats:1', 'user_cats:2', 'user_cats:3'])
+        assert pending.take() == ({'user_cats:1'}, {'user_cats:*'})
+
+
+class TestSingleFlight:
+    """Tests for dogpile protection in get_or_compute / @cached."""
+
+    def test_concurrent_misses_compute_once(self):
+        """Threads missing the same key share one computation."""
+        import threading
+        service = CacheService(l1_enabled=False)
+        calls = []
+        started = threading.Event()
+
+        def compute():
+            calls.append(1)
+            started.wait(0.2)
+            return {'plan_id': 'p'}
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                service.get_or_create_guided_plan(1, 'fitness', compute)))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        started.set()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert results == [{'plan_id': 'p'}] * 8
+
+    def test_peer_worker_holding_lock_is_awaited(self):
+        """When another worker holds the Redis lock we poll instead of computing."""
+        service = CacheService(l1_enabled=False)
+        redis = MagicMock()
+        redis.get.side_effect = [None, None, cache_module.cache_codec.encode({'v': 1})]
+        redis.set.return_value = None  # lock held elsewhere
+        compute = MagicMock()
+
+        with patch.object(cache_module, '_get_redis', return_value=redis), \
+                patch.dict(cache_module.CACHE_SINGLE_FLIGHT, {'poll_interval': 0}):
+            assert service.get_or_compute('plan:1', compute, ttl=60) == {'v': 1}
+        compute.assert_not_called()
+
+    def test_stale_value_served_while_refreshing(self):
+        """Expired entries inside the stale window are returned without waiting."""
+        service = CacheService(l1_enabled=False)
+        with patch.object(cache_module.time, 'time', return_value=1000.0):
+            service.get_or_compute('plan:swr', lambda: 'old', ttl=10, stale_ttl=60)
+
+        with patch.object(cache_module.time, 'time', return_value=1020.0):
+            # This caller refreshes; the entry is past ttl but inside stale_ttl
+            assert service.get_or_compute('plan:swr', lambda: 'new', ttl=10, stale_ttl=60) == 'new'
+            assert service.get_or_compute('plan:swr', lambda: 'newer', ttl=10, stale_ttl=60) == 'new'
+
+    def test_cached_decorator_coalesces(self):
+        """@cached uses get_or_compute and skips the function on a hit."""
+        calls = []
+
+        @cache_module.cached('test_prefix', ttl=60, key_func=lambda x: x)
+        def expensive(x):
+            calls.append(x)
+            return x * 2
+
+        assert expensive(3) == 6
+        assert expensive(3) == 6
+        assert calls == [3]
+
+
+class TestBatchOperations:
+    """Tests for get_many / set_many / delete_many."""
+
+    def test_memory_roundtrip(self):
+        """Batch ops work against the memory fallback."""
+        service = CacheService(l1_enabled=True)
+        assert service.set_many({'settings:all': {'a': 1}, 'waitlist:7': [3]}, ttl=60)
+
+        result = service.get_many(['settings:all', 'waitlist:7', 'waitlist:8'])
+        assert result == {'settings:all': {'a': 1}, 'waitlist:7': [3]}
+
+        assert service.delete_many(['waitlist:7', 'waitlist:8']) == 1
+        assert service.get_many(['waitlist:7']) == {}
+
+    def test_redis_uses_single_mget(self):
+        """Misses go to Redis in one MGET; L1 hits are not re-fetched."""
+        service = CacheService(l1_enabled=True)
+        service.l1.set('categories:active', [1], ttl=60)
+        redis = MagicMock()
+        redis.mget.return_value = [cache_module.cache_codec.encode([5]), None]
+
+        with patch.object(cache_module, '_get_redis', return_value=redis):
+            result = service.get_many(['categories:active', 'waitlist:1', 'user_cats:1'])
+
+        redis.mget.assert_called_once_with(['waitlist:1', 'user_cats:1'])
+        assert result == {'categories:active': [1], 'waitlist:1': [5]}
+
+    def test_set_many_pipelines_with_tags(self):
+        """set_many queues every SETEX (and tag ZADD) on one pipeline."""
+        service = CacheService(l1_enabled=False)
+        redis = MagicMock()
+        pipe = redis.pipeline.return_value
+
+        with patch.object(cache_module, '_get_redis', return_value=redis):
+            service.set_many({'categories:a': 1, 'settings:all': 2}, ttl=60)
+
+        assert pipe.setex.call_count == 2
+        pipe.zadd.assert_called_once()
+        assert pipe.zadd.call_args[0][0] == 'ztag:categories:'
+        assert list(pipe.zadd.call_args[0][1]) == ['categories:a']
+        pipe.execute.assert_called_once()
+
+
+class TestCacheMetrics:
+    """Tests for per-prefix counters and exposition."""
+
+    def test_hits_and_misses_per_prefix(self):
+        """get() records hits/misses against the key prefix."""
+        service = CacheService(l1_enabled=True)
+        service.get('settings:all')
+        service.set('settings:all', {'a': 1}, ttl=60)
+        service.get('settings:all')
+        service.get('waitlist:1')
+
+        stats = service.get_stats()['prefixes']
+        assert stats['settings']['hits'] == 1
+        assert stats['settings']['misses'] == 1
+        assert stats['settings']['sets'] == 1
+        assert stats['settings']['hit_ratio'] == 0.5
+        assert stats['settings']['get_latency']['count'] == 2
+        assert stats['waitlist']['misses'] == 1
+
+    def test_get_or_compute_counts_one_miss(self):
+        """A cold get_or_compute is one miss; the re-check under the lock is not counted."""
+        service = CacheService(l1_enabled=False)
+        service.get_or_compute('settings:all', lambda: {'a': 1}, ttl=60)
+        service.get_or_compute('settings:all', lambda: {'a': 2}, ttl=60)
+
+        stats = service.get_stats()['prefixes']['settings']
+        assert stats['misses'] == 1
+        assert stats['hits'] == 1
+        assert stats['hit_ratio'] == 0.5
+
+    def test_batch_calls_recorded_per_prefix(self):
+        """get_many/set_many count against each key's prefix, not a shared bucket."""
+        service = CacheService(l1_enabled=False)
+        service.set_many({'categories:a': [1], 'waitlist:1': [2]}, ttl=60)
+        service.get_many(['categories:a', 'categories:b', 'waitlist:1'])
+
+        stats = service.get_stats()['prefixes']
+        assert 'batch' not in stats
+        assert (stats['categories']['hits'], stats['categories']['misses']) == (1, 1)
+        assert stats['categories']['sets'] == 1
+        assert stats['categories']['get_latency']['count'] == 2
+        assert stats['waitlist']['hit_ratio'] == 1.0
+
+    def test_errors_counted(self):
+        """Redis errors on get are counted and the call degrades to a miss."""
+        service = CacheService(l1_enabled=False)
+        redis = MagicMock()
+        redis.get.side_effect = RuntimeError('boom')
+
+        with patch.object(cache_module, '_get_redis', return_value=redis):
+            assert service.get('settings:all') is None
+
+        assert service.get_stats()['prefixes']['settings']['errors'] == 1
+
+    def test_prometheus_format(self):
+        """render_prometheus() emits counters and histogram series."""
+        service = CacheService(l1_enabled=True)
+        service.set('categories:active', [1], ttl=60)
+        service.get('categories:active')
+
+        text = service.render_prometheus()
+        assert 'fyp_cache_hits_total{prefix="categories"} 1' in text
+        assert '# TYPE fyp_cache_get_latency_ms histogram' in text
+        assert 'fyp_cache_get_latency_ms_bucket{prefix="categories",le="+Inf"} 1' in text
+        assert 'fyp_cache_get_latency_ms_count{prefix="categories"} 1' in text
+        assert 'fyp_cache_redis_circuit_open' in text
+
+
+class TestRecentSets:
+    """Tests for add_recent / get_recent."""
+
+    def test_add_recent_trims_in_one_pipeline(self):
+        """ZADD, both trims and EXPIRE go out in one pipeline."""
+        service = CacheService(l1_enabled=False)
+        redis = MagicMock()
+        pipe = redis.pipeline.return_value
+
+        with patch.object(cache_module, '_get_redis', return_value=redis):
+            assert service.add_recent('impressions:1', ['a', 'b'], window_seconds=60, max_items=10)
+
+        pipe.zadd.assert_called_once()
+        pipe.zremrangebyscore.assert_called_once()
+        pipe.zremrangebyrank.assert_called_once_with('impressions:1', 0, -11)
+        pipe.expire.assert_called_once_with('impressions:1', 60)
+        pipe.execute.assert_called_once()
+
+    def test_get_recent_decodes_members(self):
+        """Members come back as a set of str."""
+        service = CacheService(l1_enabled=False)
+        redis = MagicMock()
+        redis.zrangebyscore.return_value = [b'a', b'b']
+
+        with patch.object(cache_module, '_get_redis', return_value=redis):
+            assert service.get_recent('impressions:1', 60) == {'a', 'b'}
+
+    def test_none_without_redis(self):
+        """Callers can tell 'no Redis' apart from 'nothing recent'."""
+        service = CacheService(l1_enabled=False)
+        assert service.get_recent('impressions:1', 60) is None
+        assert service.add_recent('impressions:1', ['a'], 60, 10) is False
+
+
+class TestHashCounters:
+    """Tests for incr_hash / get_hashes."""
+
+    def test_incr_hash_uses_int_and_float_increments(self):
+        """Ints go through HINCRBY, floats through HINCRBYFLOAT, one pipeline."""
+        service = CacheService(l1_enabled=False)
+        redis = MagicMock()
+        pipe = redis.pipeline.return_value
+
+        with patch.object(cache_module, '_get_redis', return_value=redis):
+            assert service.incr_hash('latency:1', {'a|n': 2, 'a|s': 1.5}, ttl=600)
+
+        pipe.hincrby.assert_called_once_with('latency:1', 'a|n', 2)
+        pipe.hincrbyfloat.assert_called_once_with('latency:1', 'a|s', 1.5)
+        pipe.expire.assert_called_once_with('latency:1', 600)
+        pipe.execute.assert_called_once()
+
+    def test_get_hashes_decodes(self):
+        """Each key's hash comes back as a str dict."""
+        service = CacheService(l1_enabled=False)
+        redis = MagicMock()
+        redis.pipeline.return_value.execute.return_value = [{b'a|n': b'2'}, {}]
+
+        with patch.object(cache_module, '_get_redis', return_value=redis):
+            assert service.get_hashes(['latency:1', 'latency:2']) == [{'a|n': '2'}, {}]
+
+    def test_none_without_redis(self):
+        """No Redis: nothing stored and None on read."""
+        service = CacheService(l1_enabled=False)
+        assert service.incr_hash('latency:1', {'a|n': 1}, ttl=60) is False
+        assert service.get_hashes(['latency:1']) is None
@@ -0,0 +1,95 @@
+"""
+Unit tests for CurationPool.
+
+Run with: pytest tests/test_curation_pool.py -v
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from app.services.curation_pool import CurationPool
+
+
+def _row(video_id, creator, expires_in=3600):
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=expires_in)
+    return ({'video_id': video_id, 'creator_name': creator}, creator, expires_at)
+
+
+class FakeLoaders:
+    """Candidate/exclusion loaders that count their calls."""
+
+    def __init__(self, rows, blocked=(), watched=()):
+        self.rows = rows
+        self.blocked = list(blocked)
+        self.watched = list(watched)
+        self.candidate_calls = 0
+        self.exclusion_calls = 0
+
+    def candidates(self, category_id, limit):
+        self.candidate_calls += 1
+        return self.rows[:limit]
+
+    def exclusions(self, user_id):
+        self.exclusion_calls += 1
+        return self.blocked, self.watched
+
+
+def _pool(loaders, **kwargs):
+    return CurationPool(loaders.candidates, loaders.exclusions, **kwargs)
+
+
+class TestCurationPool:
+    """Tests for in-memory curation."""
+
+    def test_diversity_and_exclusions(self):
+        """Blocked creators, watched videos and repeat creators are skipped."""
+        loaders = FakeLoaders(
+            [_row('a', 'x'), _row('b', 'x'), _row('c', 'bad'), _row('d', 'y'), _row('e', 'z')],
+            blocked=['bad'],
+            watched=['d']
+        )
+        curated = _pool(loaders).get_curated(user_id=1, category_id=1, count=2)
+        assert [v['video_id'] for v in curated] == ['a', 'e']
+
+    def test_expired_candidates_skipped(self):
+        """Candidates past expires_at are not returned."""
+        loaders = FakeLoaders([_row('a', 'x', expires_in=-1), _row('b', 'y')])
+        curated = _pool(loaders).get_curated(user_id=1, category_id=1, count=1)
+        assert [v['video_id'] for v in curated] == ['b']
+
+    def test_warm_path_skips_loaders(self):
+        """Second call is served entirely from memory."""
+        loaders = FakeLoaders([_row('a', 'x'), _row('b', 'y')])
+        pool = _pool(loaders)
+
+        pool.get_curated(1, 1, 2)
+        pool.get_curated(1, 1, 2)
+
+        assert loaders.candidate_calls == 1
+        assert loaders.exclusion_calls == 1
+
+    def test_invalidate_user_reloads_exclusions(self):
+        """A block in this worker takes effect on the next call."""
+        loaders = FakeLoaders([_row('a', 'x'), _row('b', 'y')])
+        pool = _pool(loaders)
+        assert pool.get_curated(1, 1, 1)[0]['video_id'] == 'a'
+
+        loaders.blocked = ['x']
+        pool.invalidate_user(1)
+        assert pool.get_curated(1, 1, 1)[0]['video_id'] == 'b'
+
+    def test_truncated_pool_signals_fallback(self):
+        """None when the pool is full but can't satisfy count."""
+        loaders = FakeLoaders([_row('a', 'x'), _row('b', 'x')])
+        assert _pool(loaders, size=2).get_curated(1, 1, 2) is None
+        assert _pool(loaders, size=10).get_curated(1, 1, 2) == [{'video_id': 'a', 'creator_name': 'x'}]
+
+    def test_exclusions_do_not_evict_pools(self):
+        """Per-user IDs stay out of the category snapshot."""
+        loaders = FakeLoaders([_row('a', 'x'), _row('b', 'y')], watched=[f'w{i}' for i in range(1000)])
+        pool = _pool(loaders)
+
+        for user_id in range(20):
+            pool.get_curated(user_id, 1, 2)
+
+        assert loaders.candidate_calls == 1
+        assert pool.stats()['categories'] == {1: 2}
@@ -0,0 +1,175 @@
+"""
+Unit tests for CurationService candidate index.
+
+Run with: pytest tests/test_curation_service.py -v
+"""
+
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+
+from app import create_app
+from app.services import curation_service as curation_module
+from app.services.curation_service import CurationService
+
+
+@pytest.fixture
+def app_ctx():
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+
+
+def _video(video_id, creator, quality=0.9, category_scores=None, topics=None):
+    return SimpleNamespace(
+        video_id=video_id,
+        url=f'https://tiktok.com/{video_id}',
+        thumbnail_url=None,
+        creator_username=creator,
+        creator_display_name=None,
+        duration_sec=30,
+        quality_score=quality,
+        description=None,
+        views=1,
+        likes=1,
+        category_scores=category_scores or {},
+        topics=topics or [],
+        cache_expires_at=None,
+    )
+
+
+class TestCategoryMatching:
+    """Tests for _category_score."""
+
+    def test_category_scores_match_slug_or_code(self):
+        """Scores keyed by slug or code count; low scores don't."""
+        service = CurationService()
+        keys = {'fitness', 'personal_growth'}
+
+        assert service._category_score(_video('a', 'x', category_scores={'Fitness': 0.8}), keys) == 0.8
+        assert service._category_score(_video('b', 'x', category_scores={'fitness': 0.2}), keys) is None
+        assert service._category_score(_video('c', 'x', category_scores={'cooking': 0.9}), keys) is None
+
+    def test_topic_fallback(self):
+        """A matching topic counts when category_scores has no entry."""
+        service = CurationService()
+        video = _video('a', 'x', topics=['personal_growth'])
+        assert service._category_score(video, {'personal_growth'}) == curation_module.MIN_CATEGORY_SCORE
+
+    def test_write_candidates_fans_out_per_category(self):
+        """One row per matching (category, video)."""
+        service = CurationService()
+        categories = [
+            (SimpleNamespace(id=1), {'fitness'}),
+            (SimpleNamespace(id=2), {'mindset'}),
+        ]
+        videos = [
+            _video('a', 'x', category_scores={'fitness': 0.9, 'mindset': 0.6}),
+            _video('b', 'y', category_scores={'fitness': 0.1}),
+        ]
+
+        with patch.object(curation_module.db, 'session') as session:
+            assert service._write_candidates(videos, categories) == 2
+
+        rows = session.bulk_insert_mappings.call_args[0][1]
+        assert {(r['category_id'], r['video_id']) for r in rows} == {(1, 'a'), (2, 'a')}
+
+
+class TestCuratedVideos:
+    """Tests for the streaming top-K pass."""
+
+    def _curate(self, videos, count):
+        result = MagicMock()
+        result.scalars.return_value.__enter__.return_value = iter(videos)
+
+        with patch.object(curation_module.db.session, 'execute', return_value=result):
+            return CurationService(pool_enabled=False).get_curated_videos(user_id=1, category_id=2, count=count)
+
+    def test_one_video_per_creator(self, app_ctx):
+        """Later videos from an already-picked creator are skipped."""
+        videos = [_video('a', 'x'), _video('b', 'x'), _video('c', 'y'), _video('d', 'z')]
+        curated = self._curate(videos, count=3)
+        assert [v['video_id'] for v in curated] == ['a', 'c', 'd']
+
+    def test_stops_at_count(self, app_ctx):
+        """The stream is not consumed past count picks."""
+        videos = iter([_video('a', 'x'), _video('b', 'y'), _video('c', 'z')])
+        curated = self._curate(videos, count=2)
+        assert len(curated) == 2
+        assert next(videos).video_id == 'c'
+
+    def test_empty_index_tops_up_from_quality(self, app_ctx):
+        """With no scored candidates yet, the uncategorized quality query fills the step."""
+        empty, quality = MagicMock(), MagicMock()
+        empty.scalars.return_value.__enter__.return_value = iter([])
+        quality.scalars.return_value.__enter__.return_value = iter([_video('a', 'x'), _video('b', 'y')])
+
+        with patch.object(curation_module.db.session, 'execute', side_effect=[empty, quality]) as execute:
+            curated = CurationService(pool_enabled=False).get_curated_videos(user_id=1, category_id=2, count=2)
+
+        assert [v['video_id'] for v in curated] == ['a', 'b']
+        assert 'video_category_candidates' in str(execute.call_args_list[0][0][0])
+        assert 'video_category_candidates' not in str(execute.call_args_list[1][0][0])
+
+    def test_top_up_keeps_creator_diversity(self, app_ctx):
+        """Top-up skips creators already picked from the category index."""
+        indexed, quality = MagicMock(), MagicMock()
+        indexed.scalars.return_value.__enter__.return_value = iter([_video('a', 'x')])
+        quality.scalars.return_value.__enter__.return_value = iter([_video('b', 'x'), _video('c', 'y')])
+
+        with patch.object(curation_module.db.session, 'execute', side_effect=[indexed, quality]):
+            curated = CurationService(pool_enabled=False).get_curated_videos(user_id=1, category_id=2, count=2)
+
+        assert [v['video_id'] for v in curated] == ['a', 'c']
+
+
+class TestImpressions:
+    """Tests for the impression log."""
+
+    def test_recently_shown_prefers_redis(self, app_ctx):
+        """A Redis answer is used without querying the table."""
+        service = CurationService(pool_enabled=False)
+        with patch.object(curation_module.cache_service, 'get_recent', return_value={'a'}), \
+                patch.object(curation_module.db.session, 'query') as query:
+            assert service.get_recently_shown(1) == {'a'}
+        query.assert_not_called()
+
+    def test_recently_shown_falls_back_to_db(self, app_ctx):
+        """Without Redis the video_impressions index is read."""
+        service = CurationService(pool_enabled=False)
+        with patch.object(curation_module.cache_service, 'get_recent', return_value=None), \
+                patch.object(curation_module.db.session, 'query') as query:
+            query.return_value.filter.return_value.distinct.return_value.all.return_value = [('b',)]
+            assert service.get_recently_shown(1) == {'b'}
+
+    def test_record_writes_db_and_redis(self, app_ctx):
+        """Impressions go to the table and the user's sorted set, deduplicated."""
+        service = CurationService(pool_enabled=False)
+        with patch.object(curation_module.cache_service, 'add_recent') as add_recent, \
+                patch.object(curation_module.db.session, 'bulk_insert_mappings') as insert, \
+                patch.object(curation_module.db.session, 'commit'):
+            assert service.record_videos_shown(1, ['a', 'a', 'b', None])
+
+        rows = insert.call_args[0][1]
+        assert [r['video_id'] for r in rows] == ['a', 'b']
+        assert add_recent.call_args[0][:2] == ('impressions:1', ['a', 'b'])
+
+    def test_prune_deletes_in_batches_past_longest_window(self, app_ctx):
+        """Pruning loops until a short batch and keeps the reinforce window."""
+        service = CurationService(pool_enabled=False)
+        results = [MagicMock(rowcount=2), MagicMock(rowcount=1)]
+        now = datetime(2026, 10, 17)
+
+        with patch.dict(curation_module.CURATION_IMPRESSIONS,
+                        {'window_days': 3, 'reinforce_window_days': 7, 'prune_batch_size': 2}), \
+                patch.object(curation_module.db.session, 'execute', side_effect=results) as execute, \
+                patch.object(curation_module.db.session, 'commit') as commit, \
+                patch.object(curation_module, 'datetime') as fake_datetime:
+            fake_datetime.utcnow.return_value = now
+            assert service.prune_impressions() == 3
+
+        assert execute.call_count == 2
+        assert commit.call_count == 2
+        params = execute.call_args[0][1]
+        assert params == {'cutoff': datetime(2026, 10, 10), 'batch': 2}
@@ -0,0 +1,156 @@
+"""
+Unit tests for FavoritesService.
+
+Run with: pytest tests/test_favorites_service.py -v
+"""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+
+from sqlalchemy.dialects import postgresql
+
+from app import create_app
+from app.services import favorites_service as favorites_module
+from app.services.favorites_service import FavoritesService
+
+
+@pytest.fixture
+def app_ctx():
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+
+
+def _liked(video_id):
+    return SimpleNamespace(video_id=video_id, liked_at=None)
+
+
+class TestRandomFavorite:
+    """Tests for get_random_favorite."""
+
+    def test_single_query_with_random_offset(self, app_ctx):
+        """Sampling is one statement: OFFSET floor(random() * count) LIMIT 1."""
+        result = MagicMock()
+        result.first.return_value = (_liked('a'), None)
+
+        with patch.object(favorites_module.db.session, 'execute', return_value=result) as execute:
+            video = FavoritesService().get_random_favorite(user_id=1)
+
+        assert video['video_id'] == 'a'
+        assert execute.call_count == 1
+        sql = str(execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert 'LEFT OUTER JOIN tiktok_videos' in sql
+        assert 'OFFSET CAST(floor(random() * (SELECT count(user_liked_videos.id)' in sql
+
+    def test_exclude_shown_falls_back_to_any(self, app_ctx):
+        """If every favorite was shown recently, any favorite is returned."""
+        service = FavoritesService()
+        with patch.object(service, '_sample_favorite', side_effect=[None, (_liked('b'), None)]) as sample:
+            video = service.get_random_favorite(user_id=1, exclude_shown_days=7)
+
+        assert video['video_id'] == 'b'
+        assert len(sample.call_args_list[0][0][1]) == 1  # NOT EXISTS impression filter
+        assert sample.call_args_list[1][0][1] == []
+
+    def test_no_favorites(self):
+        """None when the user has no favorites."""
+        service = FavoritesService()
+        with patch.object(service, '_sample_favorite', return_value=None):
+            assert service.get_random_favorite(user_id=1) is None
+
+    def test_metadata_joined(self):
+        """Cached video metadata is included when present."""
+        video = SimpleNamespace(
+            url='u', thumbnail_url='t', creator_username='c', creator_display_name='C',
+            duration_sec=10, description='d'
+        )
+        result = FavoritesService()._favorite_to_dict(_liked('a'), video)
+        assert result['video_url'] == 'u'
+        assert result['creator_name'] == 'c'
+
+
+class TestFavoritesPage:
+    """Tests for keyset pagination and the stored count."""
+
+    def _page(self, rows, cursor=None, limit=2):
+        service = FavoritesService()
+        with patch.object(favorites_module.db.session, 'query') as query, \
+                patch.object(service, 'get_favorites_count', return_value=7):
+            chain = query.return_value.outerjoin.return_value.filter.return_value
+            chain.filter.return_value = chain
+            chain.order_by.return_value.limit.return_value.all.return_value = rows
+            return service.get_favorites_page(1, limit=limit, cursor=cursor), chain
+
+    def test_next_cursor_from_last_row(self, app_ctx):
+        """limit + 1 rows means another page; cursor points at the last row shown."""
+        from datetime import datetime, timezone
+        from app.utils.pagination import decode_cursor
+
+        ts = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        rows = [(SimpleNamespace(video_id=v, liked_at=ts, id=i), None) for i, v in ((3, 'a'), (2, 'b'), (1, 'c'))]
+        page, _ = self._page(rows)
+
+        assert [f['video_id'] for f in page['favorites']] == ['a', 'b']
+        assert decode_cursor(page['next_cursor']) == (ts, 2)
+        assert page['total'] == 7
+
+    def test_last_page_has_no_cursor(self, app_ctx):
+        """Fewer than limit + 1 rows ends pagination."""
+        page, _ = self._page([(_liked('a'), None)])
+        assert page['next_cursor'] is None
+
+    def test_bad_cursor_rejected(self, app_ctx):
+        """Malformed cursors raise ValidationError."""
+        from app.utils.errors import ValidationError
+        with pytest.raises(ValidationError):
+            self._page([], cursor='not-a-cursor')
+
+    def test_count_reads_stored_counter(self, app_ctx):
+        """get_favorites_count doesn't COUNT(*) when the counter exists."""
+        with patch.object(favorites_module.db.session, 'query') as query:
+            query.return_value.filter.return_value.scalar.return_value = 12
+            assert FavoritesService().get_favorites_count(1) == 12
+
+    def test_adjust_count_upserts(self, app_ctx):
+        """Counter changes are one INSERT ... ON CONFLICT that never goes negative."""
+        with patch.object(favorites_module.db.session, 'execute') as execute:
+            FavoritesService()._adjust_count(1, -1)
+
+        sql = str(execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert 'ON CONFLICT (user_id) DO UPDATE' in sql
+        assert 'greatest(user_behavior_stats.favorites_count' in sql
+
+
+class TestImportFavorites:
+    """Tests for bulk favorite import."""
+
+    def test_single_insert_on_conflict(self, app_ctx):
+        """Stubs and favorites are one INSERT each; counts come from RETURNING."""
+        service = FavoritesService()
+        executed = []
+
+        def execute(stmt):
+            executed.append(stmt)
+            result = MagicMock()
+            result.fetchall.return_value = [('a',)]
+            return result
+
+        with patch.object(favorites_module.db.session, 'execute', side_effect=execute), \
+                patch.object(favorites_module.db.session, 'commit'), \
+                patch.object(service, '_adjust_count') as adjust:
+            result = service.import_favorites(1, ['a', 'b', 'a', '', 42])
+
+        assert result == {'added': 1, 'skipped': 2, 'invalid': 2}
+        adjust.assert_called_once_with(1, 1)
+
+        stub_sql, fav_sql = (str(s.compile(dialect=postgresql.dialect())) for s in executed)
+        assert 'INSERT INTO tiktok_videos' in stub_sql and 'ON CONFLICT (video_id) DO NOTHING' in stub_sql
+        assert 'ON CONFLICT ON CONSTRAINT uq_user_liked_videos_user_video DO NOTHING' in fav_sql
+        assert 'RETURNING user_liked_videos.video_id' in fav_sql
+
+    def test_too_many_rejected(self):
+        """Imports above MAX_IMPORT_SIZE are refused."""
+        from app.utils.errors import ValidationError
+        with pytest.raises(ValidationError):
+            FavoritesService().import_favorites(1, ['x'] * (favorites_module.MAX_IMPORT_SIZE + 1))
@@ -0,0 +1,54 @@
+"""
+Unit tests for LatencyHistogram.
+
+Run with: pytest tests/test_histogram.py -v
+"""
+
+import pytest
+
+from app.utils.histogram import LatencyHistogram
+
+
+class TestLatencyHistogram:
+    """Tests for bucketed latency histograms."""
+
+    def test_empty(self):
+        """An empty histogram reports zeros."""
+        hist = LatencyHistogram()
+        assert hist.quantile(0.99) == 0.0
+        assert hist.to_dict()['count'] == 0
+
+    def test_quantile_interpolates(self):
+        """Quantiles fall inside the bucket that holds the rank."""
+        hist = LatencyHistogram(buckets=(10, 20, 30))
+        for ms in (1, 2, 3, 4, 15, 16, 17, 18, 25, 26):
+            hist.observe(ms)
+
+        assert 0 < hist.quantile(0.2) <= 10
+        assert 10 < hist.quantile(0.6) <= 20
+        assert 20 < hist.quantile(0.95) <= 30
+
+    def test_overflow_reports_largest_bound(self):
+        """Samples above the last bucket land in +Inf."""
+        hist = LatencyHistogram(buckets=(10, 20))
+        hist.observe(500)
+        assert hist.quantile(0.5) == 20
+        assert hist.cumulative_buckets() == [(10, 0), (20, 0), ('+Inf', 1)]
+
+    def test_merge(self):
+        """Merging adds counts and sums."""
+        a = LatencyHistogram(buckets=(10, 20))
+        b = LatencyHistogram(buckets=(10, 20))
+        a.observe(5)
+        b.observe(15)
+        b.observe(15)
+        a.merge(b)
+
+        assert a.count == 3
+        assert a.sum_ms == 35
+        assert a.cumulative_buckets() == [(10, 1), (20, 3), ('+Inf', 3)]
+
+    def test_merge_rejects_different_buckets(self):
+        """Histograms with different bucket layouts can't be merged."""
+        with pytest.raises(ValueError):
+            LatencyHistogram(buckets=(10,)).merge(LatencyHistogram(buckets=(20,)))
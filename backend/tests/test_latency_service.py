@@ -0,0 +1,96 @@
+"""
+Unit tests for LatencyService.
+
+Run with: pytest tests/test_latency_service.py -v
+"""
+
+from collections import defaultdict
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.services import latency_service as latency_module
+from app.services.latency_service import LatencyService
+
+
+class FakeHashStore:
+    """In-memory stand-in for CacheService.incr_hash/get_hashes."""
+
+    PREFIX_LATENCY = 'latency'
+
+    def __init__(self):
+        self.hashes = defaultdict(dict)
+
+    def incr_hash(self, key, increments, ttl):
+        for field, value in increments.items():
+            self.hashes[key][field] = self.hashes[key].get(field, 0) + value
+        return True
+
+    def get_hashes(self, keys):
+        return [{f: str(v) for f, v in self.hashes.get(key, {}).items()} for key in keys]
+
+
+@pytest.fixture
+def store():
+    fake = FakeHashStore()
+    with patch.object(latency_module, 'cache_service', fake):
+        yield fake
+
+
+@pytest.fixture
+def service():
+    svc = LatencyService(flush_interval=60, window_minutes=5, retention_minutes=30)
+    svc._ensure_thread = MagicMock()
+    return svc
+
+
+class TestLatencyService:
+    """Tests for recording, flushing and merging histograms."""
+
+    def test_flush_then_summary(self, store, service):
+        """Flushed samples are merged back per endpoint."""
+        for ms in (5, 6, 7, 8):
+            service.observe('GET', '/api/v2/plan/today', ms)
+        service.observe('POST', '/api/v2/plan/generate', 900)
+
+        assert service.flush() is True
+        summary = service.get_summary()
+
+        assert summary['overall']['count'] == 5
+        slowest = summary['endpoints'][0]
+        assert (slowest['method'], slowest['endpoint']) == ('POST', '/api/v2/plan/generate')
+        today = summary['endpoints'][1]
+        assert today['count'] == 4
+        assert 5 <= today['p50_ms'] <= 10
+
+    def test_workers_merge(self, store):
+        """Two workers writing the same minute add up."""
+        a = LatencyService()
+        b = LatencyService()
+        for svc in (a, b):
+            svc._ensure_thread = MagicMock()
+            svc.observe('GET', '/api/x', 10)
+            svc.flush()
+
+        assert a.get_summary(1)['overall']['count'] == 2
+
+    def test_flush_resets_pending(self, store, service):
+        """A sample is pushed only once."""
+        service.observe('GET', '/api/x', 10)
+        service.flush()
+        service.flush()
+
+        assert service.get_summary()['overall']['count'] == 1
+
+    def test_no_redis_returns_none(self, service):
+        """Without Redis callers get None and fall back to request_logs."""
+        cache = MagicMock()
+        cache.PREFIX_LATENCY = 'latency'
+        cache.get_hashes.return_value = None
+        with patch.object(latency_module, 'cache_service', cache):
+            assert service.get_summary() is None
+            assert service.get_p95() is None
+
+    def test_p95_none_without_samples(self, store, service):
+        """An empty window is treated like missing data."""
+        assert service.get_p95() is None
@@ -0,0 +1,201 @@
+"""
+Unit tests for MetricsService daily rollups.
+
+Run with: pytest tests/test_metrics_service.py -v
+"""
+
+import importlib
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app import create_app
+
+metrics_module = importlib.import_module('app.services.metrics_service')
+MetricsService = metrics_module.MetricsService
+_metric_key = metrics_module._metric_key
+
+
+@pytest.fixture
+def app_ctx():
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+
+
+def _totals(values):
+    totals = MagicMock()
+    totals.__getitem__.side_effect = lambda key: values.get(key, 0.0)
+    return totals
+
+
+class TestRollupEvents:
+    """Tests for _rollup_events."""
+
+    def test_builds_additive_rows(self, app_ctx):
+        """One aggregate query plus one funnel query per funnel event type."""
+        service = MetricsService()
+        n_columns = (len(metrics_module.ROLLUP_EVENT_TYPES)
+                     + len(metrics_module.SIGNAL_EVENT_TYPES) + 2)
+        aggregate = tuple(range(1, n_columns + 1))
+
+        with patch.object(metrics_module.db.session, 'query') as query, \
+                patch.object(metrics_module.db.session, 'execute') as execute:
+            query.return_value.filter.return_value.one.return_value = aggregate
+            execute.return_value.one.return_value = (5, 3, None, 1)
+            rows = service._rollup_events(date(2026, 10, 1), date(2026, 10, 2))
+
+        assert execute.call_count == len(metrics_module.FUNNEL_EVENT_TYPES)
+        by_key = {_metric_key(name, **dims): value for name, dims, value in rows}
+        assert by_key[_metric_key('event_count', event_type='plan_viewed')] == 1
+        assert by_key[_metric_key('duration_count', event_type='plan_completed')] == n_columns
+        assert by_key[_metric_key('funnel_new_users', event_type='plan_completed', day=1)] == 3
+        assert by_key[_metric_key('funnel_new_users', event_type='plan_completed', day=3)] == 0
+
+
+    def test_json_casts_guarded(self, app_ctx):
+        """Non-numeric client-sent event_data values become NULL instead of failing the cast."""
+        service = MetricsService()
+        n_columns = (len(metrics_module.ROLLUP_EVENT_TYPES)
+                     + len(metrics_module.SIGNAL_EVENT_TYPES) + 2)
+
+        with patch.object(metrics_module.db.session, 'query') as query, \
+                patch.object(metrics_module.db.session, 'execute') as execute:
+            query.return_value.filter.return_value.one.return_value = (0,) * n_columns
+            execute.return_value.one.return_value = (0, 0, 0, 0)
+            service._rollup_events(date(2026, 10, 1), date(2026, 10, 2))
+
+        dialect = postgresql.dialect()
+        sql = ' '.join(
+            str(column.compile(dialect=dialect)) for column in query.call_args.args
+        )
+        assert sql.count('CASE WHEN (jsonb_typeof(') == len(metrics_module.SIGNAL_EVENT_TYPES) + 2
+        assert 'INTEGER' not in sql
+
+        funnel_sql = str(metrics_module.FUNNEL_FIRST_REACHED_SQL)
+        assert '::int' not in funnel_sql
+        assert funnel_sql.count("jsonb_typeof") == 2
+
+
+class TestRollupDay:
+    """Tests for rollup_day."""
+
+    def test_replaces_day_and_marks_done(self, app_ctx):
+        """Existing rows for the day are deleted before the new ones are inserted."""
+        service = MetricsService()
+        rows = [('event_count', {'event_type': 'plan_viewed'}, 4)]
+
+        with patch.object(service, '_rollup_events', return_value=rows), \
+                patch.object(metrics_module.MetricsDaily, 'query') as query, \
+                patch.object(metrics_module.db.session, 'bulk_insert_mappings') as insert, \
+                patch.object(metrics_module.db.session, 'commit') as commit:
+            written = service.rollup_day(date(2026, 10, 1))
+
+        assert written == 1
+        query.filter.return_value.delete.assert_called_once()
+        mappings = insert.call_args[0][1]
+        assert [m['metric_name'] for m in mappings] == ['event_count', metrics_module.ROLLUP_MARKER]
+        assert all(m['metric_date'] == date(2026, 10, 1) for m in mappings)
+        commit.assert_called_once()
+
+        # The marker row is deleted with the metrics, or a re-run violates uq_metrics_daily
+        name_filter = query.filter.call_args[0][1].compile(
+            dialect=postgresql.dialect(), compile_kwargs={'literal_binds': True}
+        )
+        assert f"'{metrics_module.ROLLUP_MARKER}'" in str(name_filter)
+
+
+class TestRollupDayDatabase:
+    """rollup_day against real metrics_daily rows (needs the test database)."""
+
+    def test_rerun_same_day_replaces_rows(self, app):
+        """Rolling up a day twice keeps one set of rows and one marker."""
+        from app.models import MetricsDaily
+
+        service = MetricsService()
+        day = date(2026, 10, 1)
+        rows = [('event_count', {'event_type': 'plan_viewed'}, 4)]
+
+        with app.app_context():
+            with patch.object(service, '_rollup_events', return_value=rows):
+                service.rollup_day(day)
+            with patch.object(service, '_rollup_events', return_value=[('event_count', {'event_type': 'plan_viewed'}, 6)]):
+                service.rollup_day(day)
+
+            stored = MetricsDaily.query.filter_by(metric_date=day).all()
+            by_name = {m.metric_name: float(m.metric_value) for m in stored}
+            assert len(stored) == 2
+            assert by_name == {'event_count': 6.0, metrics_module.ROLLUP_MARKER: 1.0}
+            assert service.get_last_rollup_date() == day
+
+
+class TestEventTotals:
+    """Tests for _event_totals."""
+
+    def test_adds_live_partial_to_rollups(self, app_ctx):
+        """Stored sums and the live aggregate since the last rollup are combined."""
+        service = MetricsService()
+        stored = [('event_count', {'event_type': 'plan_viewed'}, 10)]
+        live = [('event_count', {'event_type': 'plan_viewed'}, 2)]
+
+        with patch.object(service, 'get_last_rollup_date', return_value=date(2026, 10, 16)), \
+                patch.object(service, '_rollup_events', return_value=live) as rollup, \
+                patch.object(metrics_module.db.session, 'query') as query:
+            query.return_value.filter.return_value.group_by.return_value.all.return_value = stored
+            totals = service._event_totals()
+
+        assert totals[_metric_key('event_count', event_type='plan_viewed')] == 12
+        assert rollup.call_args[0][0].date() == date(2026, 10, 17)
+
+    def test_no_rollups_aggregates_everything_live(self, app_ctx):
+        """Before the first rollup the whole history is aggregated live."""
+        service = MetricsService()
+
+        with patch.object(service, 'get_last_rollup_date', return_value=None), \
+                patch.object(service, '_rollup_events', return_value=[]) as rollup, \
+                patch.object(metrics_module.db.session, 'query') as query:
+            service._event_totals()
+
+        query.assert_not_called()
+        assert rollup.call_args[0][0] == metrics_module.ROLLUP_EPOCH
+
+
+class TestDashboardMetrics:
+    """Tests for the challenge and plan metrics read from totals."""
+
+    def test_plan_metrics(self):
+        """Step completion and signal averages come from counts and sums."""
+        service = MetricsService()
+        totals = _totals({
+            _metric_key('event_count', event_type='plan_viewed'): 10,
+            _metric_key('event_count', event_type='detox_completed'): 5,
+            _metric_key('signal_sum', event_type='detox_completed', signal='blocks'): 15,
+            _metric_key('duration_sum', event_type='plan_completed'): 1200,
+            _metric_key('duration_count', event_type='plan_completed'): 2,
+        })
+
+        with patch.object(service, '_event_totals', return_value=totals):
+            data = service.get_plan_metrics()
+
+        assert data['step_completion']['clear'] == 50.0
+        assert data['step_completion']['watch'] == 0
+        assert data['signals']['blocks'] == 3.0
+        assert data['signals']['likes'] == 0
+        assert data['avg_duration_seconds'] == 600
+
+    def test_challenge_funnel_falls_back_to_plan_events(self):
+        """Without challenge events the funnel uses plan_viewed/plan_completed."""
+        service = MetricsService()
+        totals = _totals({
+            _metric_key('funnel_new_users', event_type='plan_viewed', day=0): 20,
+            _metric_key('funnel_new_users', event_type='plan_completed', day=1): 10,
+            _metric_key('funnel_new_users', event_type='plan_completed', day=7): 2,
+        })
+
+        with patch.object(service, '_event_totals', return_value=totals):
+            data = service.get_challenge_metrics()
+
+        assert [step['count'] for step in data['funnel']] == [20, 10, 0, 2]
+        assert data['d7_completion_rate'] == 10.0
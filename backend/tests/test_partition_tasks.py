@@ -0,0 +1,122 @@
+"""
+Unit tests for log table partition maintenance.
+
+Run with: pytest tests/test_partition_tasks.py -v
+"""
+
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+
+from app import create_app, db
+from app.tasks import partition_tasks
+
+
+@pytest.fixture
+def app_ctx():
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class TestBoundaries:
+    """Tests for interval alignment, naming and bound parsing."""
+
+    def test_daily_interval(self):
+        """Daily partitions start at UTC midnight."""
+        assert partition_tasks.interval_start(utc(2026, 10, 17, 15, 30), 1) == utc(2026, 10, 17)
+
+    def test_weekly_interval_starts_monday(self):
+        """Weekly partitions start on Monday."""
+        start = partition_tasks.interval_start(utc(2026, 10, 17, 15, 30), 7)
+        assert start == utc(2026, 10, 12)
+        assert start.weekday() == 0
+
+    def test_partition_name(self):
+        """Names carry the start date."""
+        assert partition_tasks.partition_name('request_logs', utc(2026, 10, 17)) == 'request_logs_p20261017'
+
+    def test_parse_bound(self):
+        """pg_get_expr bounds parse to aware datetimes; MINVALUE is open."""
+        assert partition_tasks._parse_bound("'2026-10-17 00:00:00+00'") == utc(2026, 10, 17)
+        assert partition_tasks._parse_bound('MINVALUE') is None
+
+
+class TestEnsurePartitions:
+    """Tests for ensure_partitions."""
+
+    def test_creates_only_missing(self, app_ctx):
+        """Intervals already covered (including by the legacy partition) are skipped."""
+        existing = [
+            ('request_logs_legacy', None, utc(2026, 10, 17)),
+            ('request_logs_p20261017', utc(2026, 10, 17), utc(2026, 10, 18)),
+        ]
+        with patch.object(partition_tasks, 'list_partitions', return_value=existing), \
+                patch.object(partition_tasks, '_default_rows', return_value=False), \
+                patch.object(db, 'session') as session:
+            created = partition_tasks.ensure_partitions(
+                'request_logs', interval_days=1, premake_days=2, now=utc(2026, 10, 17, 12)
+            )
+
+        assert created == ['request_logs_p20261018', 'request_logs_p20261019']
+        sql = str(session.execute.call_args_list[0][0][0])
+        assert "PARTITION OF request_logs FOR VALUES FROM ('2026-10-18T00:00:00+00:00')" in sql
+        session.commit.assert_called_once()
+
+    def test_moves_rows_out_of_default(self, app_ctx):
+        """An interval with rows in the DEFAULT partition is created with those rows moved in."""
+        existing = [('request_logs_legacy', None, utc(2026, 10, 17))]
+        with patch.object(partition_tasks, 'list_partitions', return_value=existing), \
+                patch.object(partition_tasks, '_default_rows', side_effect=[True, False]), \
+                patch.object(db, 'session') as session:
+            created = partition_tasks.ensure_partitions(
+                'request_logs', interval_days=1, premake_days=1, now=utc(2026, 10, 17, 12)
+            )
+
+        assert created == ['request_logs_p20261017', 'request_logs_p20261018']
+        statements = [' '.join(str(c[0][0]).split()) for c in session.execute.call_args_list]
+        assert statements[0] == 'ALTER TABLE request_logs DETACH PARTITION request_logs_default'
+        assert statements[2].startswith('INSERT INTO request_logs_p20261017 SELECT * FROM request_logs_default')
+        assert statements[3].startswith('DELETE FROM request_logs_default')
+        assert statements[4] == 'ALTER TABLE request_logs ATTACH PARTITION request_logs_default DEFAULT'
+        assert 'PARTITION OF request_logs' in statements[5]
+
+
+class TestExpirePartitions:
+    """Tests for expire_partitions."""
+
+    PARTITIONS = [
+        ('request_logs_legacy', None, utc(2026, 9, 1)),
+        ('request_logs_p20260916', utc(2026, 9, 16), utc(2026, 9, 17)),
+        ('request_logs_p20261017', utc(2026, 10, 17), utc(2026, 10, 18)),
+    ]
+
+    def test_drops_expired(self, app_ctx):
+        """Partitions ending before the cutoff are dropped."""
+        with patch.object(partition_tasks, 'list_partitions', return_value=self.PARTITIONS), \
+                patch.object(db, 'session') as session:
+            removed = partition_tasks.expire_partitions(
+                'request_logs', retention_days=30, archive=False, now=utc(2026, 10, 17)
+            )
+
+        assert removed == ['request_logs_legacy', 'request_logs_p20260916']
+        assert str(session.execute.call_args_list[0][0][0]) == 'DROP TABLE request_logs_legacy'
+
+    def test_archive_detaches(self, app_ctx):
+        """With archive set, expired partitions are detached instead."""
+        with patch.object(partition_tasks, 'list_partitions', return_value=self.PARTITIONS), \
+                patch.object(db, 'session') as session:
+            partition_tasks.expire_partitions('request_logs', retention_days=30, archive=True, now=utc(2026, 10, 17))
+
+        assert 'DETACH PARTITION request_logs_legacy' in str(session.execute.call_args_list[0][0][0])
+
+    def test_zero_retention_keeps_everything(self):
+        """retention_days=0 never touches the database."""
+        with patch.object(partition_tasks, 'list_partitions') as list_partitions:
+            assert partition_tasks.expire_partitions('analytics_events', 0, archive=True) == []
+        list_partitions.assert_not_called()
@@ -0,0 +1,170 @@
+"""
+Unit tests for PlanServiceV2 step assembly.
+
+Run with: pytest tests/test_plan_service_v2.py -v
+"""
+
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+
+from sqlalchemy import create_engine, text
+
+from app import create_app
+from app.services import plan_service_v2 as plan_module
+from app.services.plan_service_v2 import PlanServiceV2
+from app.utils.query_counter import count_queries
+
+
+@pytest.fixture
+def app_ctx():
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+
+
+def _slow(result, delay):
+    def fetch(**kwargs):
+        time.sleep(delay)
+        return result
+    return fetch
+
+
+class TestStepAssembly:
+    """Tests for concurrent CLEAR/WATCH/REINFORCE fetches."""
+
+    def _collect(self, clear, watch, reinforce):
+        service = PlanServiceV2()
+        with patch.object(plan_module.toxic_detection_service, 'get_toxic_creators', side_effect=clear), \
+                patch.object(plan_module.curation_service, 'get_curated_videos', side_effect=watch), \
+                patch.object(plan_module.favorites_service, 'get_random_favorite', side_effect=reinforce):
+            futures = service._submit_step_fetches(user_id=1, category_id=2)
+            return service._collect_step_results(futures)
+
+    def test_steps_run_concurrently(self, app_ctx):
+        """Total wait is roughly the slowest step, not the sum."""
+        start = time.monotonic()
+        results, degraded = self._collect(
+            _slow(['c'], 0.3), _slow(['v'], 0.3), _slow({'id': 'f'}, 0.3)
+        )
+        elapsed = time.monotonic() - start
+
+        assert results == {'clear': ['c'], 'watch': ['v'], 'reinforce': {'id': 'f'}}
+        assert degraded == []
+        assert elapsed < 0.8
+
+    def test_timeout_degrades_only_that_step(self, app_ctx):
+        """A step past its deadline gets its default value."""
+        timeouts = {'clear': 1.0, 'watch': 0.1, 'reinforce': 1.0}
+        with patch.dict(plan_module.PLAN_STEP_TIMEOUTS, timeouts):
+            results, degraded = self._collect(
+                _slow(['c'], 0), _slow(['v'], 0.5), _slow({'id': 'f'}, 0)
+            )
+
+        assert results == {'clear': ['c'], 'watch': [], 'reinforce': {'id': 'f'}}
+        assert degraded == ['watch']
+
+    def test_exception_degrades_step(self, app_ctx):
+        """A failing step doesn't fail the plan."""
+        def boom(**kwargs):
+            raise RuntimeError('db down')
+
+        results, degraded = self._collect(_slow(['c'], 0), _slow(['v'], 0), boom)
+
+        assert results['reinforce'] is None
+        assert degraded == ['reinforce']
+
+    def test_step_queries_counted_into_request(self, app_ctx):
+        """SQL run by the step threads lands in the caller's query counter."""
+        engine = create_engine('sqlite://')
+
+        def query(result):
+            def fetch(**kwargs):
+                with engine.connect() as conn:
+                    conn.execute(text('SELECT 1'))
+                return result
+            return fetch
+
+        with count_queries() as counter:
+            self._collect(query(['c']), query(['v']), query({'id': 'f'}))
+
+        assert counter.total == 3
+
+
+class TestGeneratePlanCaching:
+    """Tests for caching of degraded plans."""
+
+    def test_degraded_plan_is_not_kept_in_cache(self):
+        """A plan with degraded steps is invalidated so the next call retries."""
+        service = PlanServiceV2()
+        plan = {'plan_id': 'x', 'degraded_steps': ['watch']}
+
+        with patch.object(plan_module.cache_service, 'get_or_create_guided_plan', return_value=plan), \
+                patch.object(plan_module.cache_service, 'invalidate_guided_plan') as invalidate:
+            assert service.generate_plan(1, 2, category_slug='fitness') == plan
+
+        invalidate.assert_called_once_with(1, 'fitness')
+
+
+class TestWarmPlanDrafts:
+    """Warm-up drafts are persisted only when the user asks for the plan."""
+
+    def _draft(self):
+        return {
+            'plan_id': 'd',
+            'day_of_challenge': 1,
+            'degraded_steps': [],
+            'steps': {
+                'watch': {'videos': [{'video_id': 5}]},
+                'reinforce': {'favorite_video': {'video_id': 9}, 'show_share': False},
+            },
+        }
+
+    def test_warm_plan_writes_nothing(self, app_ctx):
+        """warm_plan stores a draft without challenge, impressions or Plan row."""
+        service = PlanServiceV2()
+        draft = self._draft()
+
+        with patch.object(service, '_submit_step_fetches'), \
+                patch.object(service, '_preview_challenge_day', return_value=4), \
+                patch.object(service, '_assemble_plan', return_value=draft) as assemble, \
+                patch.object(service, '_get_or_create_challenge') as challenge, \
+                patch.object(service, '_save_plan') as save, \
+                patch.object(plan_module.curation_service, 'record_videos_shown') as shown, \
+                patch.object(plan_module.cache_service, 'set_guided_plan_draft', return_value=True) as store:
+            assert service.warm_plan(1, 2, 'fitness') is True
+
+        assert assemble.call_args[0][3] == 4
+        store.assert_called_once_with(1, 'fitness', draft)
+        challenge.assert_not_called()
+        save.assert_not_called()
+        shown.assert_not_called()
+
+    def test_degraded_draft_not_stored(self, app_ctx):
+        service = PlanServiceV2()
+        draft = dict(self._draft(), degraded_steps=['watch'])
+
+        with patch.object(service, '_submit_step_fetches'), \
+                patch.object(service, '_preview_challenge_day', return_value=1), \
+                patch.object(service, '_assemble_plan', return_value=draft), \
+                patch.object(plan_module.cache_service, 'set_guided_plan_draft') as store:
+            assert service.warm_plan(1, 2, 'fitness') is False
+        store.assert_not_called()
+
+    def test_build_plan_persists_draft(self, app_ctx):
+        """The first real request persists the draft for the actual challenge day."""
+        service = PlanServiceV2()
+        challenge = MagicMock(id=3, current_day=3)
+
+        with patch.object(plan_module.cache_service, 'pop_guided_plan_draft', return_value=self._draft()), \
+                patch.object(service, '_submit_step_fetches') as fetch, \
+                patch.object(service, '_get_or_create_challenge', return_value=challenge), \
+                patch.object(service, '_save_plan', return_value=MagicMock(id=77)), \
+                patch.object(plan_module.curation_service, 'record_videos_shown') as shown:
+            plan = service._build_plan(1, 2, 'fitness')
+
+        fetch.assert_not_called()
+        shown.assert_called_once_with(1, [5, 9])
+        assert plan['db_id'] == 77
+        assert plan['day_of_challenge'] == 3
+        assert plan['steps']['reinforce']['show_share'] is True
@@ -0,0 +1,104 @@
+"""
+Unit tests for the daily plan warm-up task.
+
+Run with: pytest tests/test_plan_warmup_tasks.py -v
+"""
+
+from unittest.mock import patch, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query
+
+from app import create_app
+from app.tasks import plan_warmup_tasks
+
+
+@pytest.fixture
+def app_ctx():
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+
+
+class TestWarmChunk:
+    """Tests for _warm_chunk."""
+
+    def _run(self, targets, cached=None, fail_for=()):
+        cache = MagicMock()
+        cache.get_guided_plan.side_effect = lambda uid, slug: (cached or {}).get(uid)
+        cache.get_guided_plan_draft.return_value = None
+        plans = MagicMock()
+
+        def warm(user_id, category_id, category_slug):
+            if user_id in fail_for:
+                raise RuntimeError('boom')
+            return True
+        plans.warm_plan.side_effect = warm
+
+        with patch('app.services.cache_service.cache_service', cache), \
+                patch('app.services.plan_service_v2.plan_service_v2', plans), \
+                patch('app.db') as db:
+            result = plan_warmup_tasks._warm_chunk(MagicMock(), targets)
+        return result, plans, db
+
+    def test_skips_cached_and_generates_missing(self):
+        """Cached plans are not rebuilt; misses are warmed as drafts, never generated."""
+        targets = [(1, 10, 'fitness'), (2, 10, 'fitness')]
+        result, plans, db = self._run(targets, cached={1: {'plan_id': 'a'}})
+
+        assert result == {'cached': 1, 'generated': 1}
+        plans.warm_plan.assert_called_once_with(
+            user_id=2, category_id=10, category_slug='fitness'
+        )
+        plans.generate_plan.assert_not_called()
+        db.session.remove.assert_called_once()
+
+    def test_failure_does_not_stop_chunk(self):
+        """One failing user is rolled back and the rest still run."""
+        targets = [(1, 10, 'fitness'), (2, 10, 'fitness')]
+        result, _, db = self._run(targets, fail_for=(1,))
+
+        assert result == {'failed': 1, 'generated': 1}
+        db.session.rollback.assert_called_once()
+
+
+class TestActivePlanTargets:
+    """Tests for get_active_plan_targets."""
+
+    def test_requires_request_activity(self, app_ctx):
+        """Plans alone don't make a user active; a recent request does."""
+        captured = []
+
+        def fake_all(query):
+            captured.append(query.statement)
+            return [(1, 10, None, 'fitness')]
+
+        with patch.object(Query, 'all', fake_all):
+            targets = plan_warmup_tasks.get_active_plan_targets(3)
+
+        sql = str(captured[0].compile(dialect=postgresql.dialect()))
+        assert 'FROM request_logs' in sql
+        assert 'plans.user_id IN (SELECT DISTINCT request_logs.user_id' in sql
+        assert targets == [(1, 10, 'fitness')]
+
+
+class TestWarmDailyPlans:
+    """Tests for warm_daily_plans."""
+
+    def test_chunks_targets_across_pool(self):
+        """Targets are split into chunks and the per-chunk totals summed."""
+        targets = [(i, 1, 'fitness') for i in range(5)]
+        seen = []
+
+        def fake_chunk(app, chunk):
+            seen.append(chunk)
+            return plan_warmup_tasks.Counter(generated=len(chunk))
+
+        with patch('app.create_app'), \
+                patch.object(plan_warmup_tasks, 'get_active_plan_targets', return_value=targets), \
+                patch.object(plan_warmup_tasks, '_warm_chunk', side_effect=fake_chunk):
+            summary = plan_warmup_tasks.warm_daily_plans(chunk_size=2, max_workers=2)
+
+        assert sorted(len(c) for c in seen) == [1, 2, 2]
+        assert summary == {'targets': 5, 'generated': 5, 'cached': 0, 'failed': 0}
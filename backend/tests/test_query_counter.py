@@ -0,0 +1,195 @@
+"""
+Unit tests for query counting, the query guard middleware and query budgets.
+
+Run with: pytest tests/test_query_counter.py -v
+"""
+
+import importlib
+import logging
+from datetime import date, timedelta
+from unittest.mock import patch, MagicMock
+
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, text
+
+from app import create_app
+from app.middleware.query_guard import QueryGuardMiddleware
+from app.utils.query_counter import QueryCounter, count_queries, assert_max_queries
+
+analytics_module = importlib.import_module('app.services.analytics_service')
+
+
+@pytest.fixture
+def engine():
+    return create_engine('sqlite://')
+
+
+@pytest.fixture
+def guarded_app(engine):
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    middleware = QueryGuardMiddleware(app)
+
+    @app.route('/api/items/<int:item_id>')
+    def item(item_id):
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 0'))
+            for i in range(6):
+                conn.execute(text('SELECT :i'), {'i': i})
+        return {'id': item_id}
+
+    return app, middleware
+
+
+@pytest.fixture
+def app_ctx():
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+
+
+class TestQueryCounter:
+    """Tests for counting and repeat detection."""
+
+    def test_counts_and_repeats(self, engine):
+        """Same SQL with different parameters counts as a repeat."""
+        with count_queries() as counter, engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+            for i in range(3):
+                conn.execute(text('SELECT :i'), {'i': i})
+
+        assert counter.total == 4
+        assert counter.repeated() == {'SELECT ?': 3}
+
+    def test_inactive_outside_block(self, engine):
+        """Statements after the block are not counted."""
+        with count_queries() as counter:
+            pass
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+
+        assert counter.total == 0
+
+    def test_whitespace_normalized(self):
+        """Formatting differences do not split one statement into several."""
+        counter = QueryCounter()
+        counter.add('SELECT *\n  FROM users')
+        counter.add('SELECT * FROM users')
+
+        assert counter.report()['repeated'] == [{'sql': 'SELECT * FROM users', 'count': 2}]
+
+    def test_assert_max_queries_passes_within_budget(self, engine):
+        with assert_max_queries(2), engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+            conn.execute(text('SELECT 2'))
+
+    def test_assert_max_queries_fails_over_budget(self, engine):
+        """Exceeding the budget raises with the statement report."""
+        with pytest.raises(AssertionError, match='3 queries, budget 2'):
+            with assert_max_queries(2), engine.connect() as conn:
+                for i in range(3):
+                    conn.execute(text('SELECT 1'))
+
+    def test_assert_max_queries_fails_on_repeats(self, engine):
+        """max_repeats catches N+1 loops even within the total budget."""
+        with pytest.raises(AssertionError, match='ran 3 times, max 1'):
+            with assert_max_queries(10, max_repeats=1), engine.connect() as conn:
+                for i in range(3):
+                    conn.execute(text('SELECT :i'), {'i': i})
+
+
+class TestQueryGuardMiddleware:
+    """Tests for the Flask hooks."""
+
+    def test_header_opt_in(self, guarded_app):
+        """Only requests sending X-Query-Guard are counted."""
+        app, _ = guarded_app
+        client = app.test_client()
+
+        plain = client.get('/api/items/1')
+        guarded = client.get('/api/items/1', headers={'X-Query-Guard': '1'})
+
+        assert 'X-Query-Count' not in plain.headers
+        assert guarded.headers['X-Query-Count'] == '7'
+
+    def test_repeated_statement_logged_and_aggregated(self, guarded_app, caplog):
+        """A statement over repeat_threshold is logged and kept in per-route stats."""
+        app, middleware = guarded_app
+
+        with caplog.at_level(logging.WARNING, logger='app.middleware.query_guard'):
+            app.test_client().get('/api/items/2', headers={'X-Query-Guard': '1'})
+
+        assert 'SELECT ?' in caplog.records[-1].getMessage()
+        route = middleware.stats()['routes'][0]
+        assert route['route'] == '/api/items/<int:item_id>'
+        assert route['max_queries'] == 7
+        assert route['repeated'] == [{'sql': 'SELECT ?', 'count': 6}]
+
+    def test_enabled_for_all_requests_by_env(self, engine):
+        """QUERY_GUARD_ENABLED=true counts without the header, even outside debug/tests."""
+        app = Flask(__name__)
+        with patch.dict('os.environ', {'QUERY_GUARD_ENABLED': 'true'}):
+            QueryGuardMiddleware(app)
+
+        @app.route('/ping')
+        def ping():
+            with engine.connect() as conn:
+                conn.execute(text('SELECT 1'))
+            return 'pong'
+
+        assert app.test_client().get('/ping').headers['X-Query-Count'] == '1'
+
+    def test_header_ignored_in_production(self):
+        """Without debug/testing the header cannot switch counting on."""
+        app = Flask(__name__)
+        QueryGuardMiddleware(app)
+
+        @app.route('/ping')
+        def ping():
+            return 'pong'
+
+        response = app.test_client().get('/ping', headers={'X-Query-Guard': '1'})
+        assert 'X-Query-Count' not in response.headers
+
+
+class TestWeeklyActivity:
+    """get_weekly_activity used to run one COUNT per day."""
+
+    def test_single_grouped_query(self, app_ctx):
+        """All seven days come from one query; missing days are zero."""
+        today = date.today()
+        query = MagicMock()
+        query.filter.return_value.group_by.return_value.all.return_value = [
+            (today, 3), (today - timedelta(days=2), 1),
+        ]
+
+        with patch.object(analytics_module.db.session, 'query', return_value=query) as mock_query:
+            week = analytics_module.analytics_service.get_weekly_activity(1)
+
+        assert mock_query.call_count == 1
+        assert len(week) == 7
+        assert week[-1] == {'date': str(today), 'dayName': today.strftime('%a'), 'actionsCompleted': 3}
+        assert [d['actionsCompleted'] for d in week] == [0, 0, 0, 0, 1, 0, 3]
+
+
+class TestQueryBudgets:
+    """Query budgets for key endpoints (need the test database)."""
+
+    def test_weekly_activity_budget(self, client, auth_headers):
+        with assert_max_queries(2):
+            response = client.get('/api/analytics/me/weekly', headers=auth_headers)
+        assert response.status_code == 200
+
+    def test_user_stats_budget(self, client, auth_headers):
+        with assert_max_queries(8, max_repeats=2):
+            response = client.get('/api/user/stats', headers=auth_headers)
+        assert response.status_code == 200
+
+    def test_guard_header_on_app(self, client, auth_headers):
+        """The app's own middleware reports counts when asked."""
+        response = client.get(
+            '/api/analytics/me/weekly',
+            headers={**auth_headers, 'X-Query-Guard': '1'}
+        )
+        assert int(response.headers['X-Query-Count']) <= 2
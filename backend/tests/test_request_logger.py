@@ -0,0 +1,78 @@
+"""
+Unit tests for RequestLoggerMiddleware.
+
+Run with: pytest tests/test_request_logger.py -v
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flask import Flask
+
+from app.middleware.request_logger import RequestLoggerMiddleware
+
+
+@pytest.fixture
+def logged_app():
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    middleware = RequestLoggerMiddleware(app)
+
+    @app.route('/api/ping')
+    def ping():
+        return 'pong'
+
+    @app.route('/api/health')
+    def health():
+        return 'ok'
+
+    return app, middleware
+
+
+class TestRequestLogger:
+    """Tests for request log queuing."""
+
+    def test_buffered_request_is_queued(self, logged_app):
+        """With buffering on, the row goes to the writer, not the database."""
+        app, middleware = logged_app
+        middleware._buffered = True
+        middleware._writer = MagicMock()
+
+        with patch.object(RequestLoggerMiddleware, '_insert_logs') as insert_logs:
+            response = app.test_client().get('/api/ping', headers={'X-Forwarded-For': '1.2.3.4, 10.0.0.1'})
+
+        assert response.status_code == 200
+        insert_logs.assert_not_called()
+        row = middleware._writer.submit.call_args[0][0]
+        assert row['endpoint'] == '/api/ping'
+        assert row['method'] == 'GET'
+        assert row['status'] == 200
+        assert row['ip_address'] == '1.2.3.4'
+        assert row['created_at'] is not None
+
+    def test_unbuffered_request_is_inserted(self, logged_app):
+        """Without buffering the row is inserted immediately."""
+        app, middleware = logged_app
+
+        with patch.object(RequestLoggerMiddleware, '_insert_logs') as insert_logs:
+            app.test_client().get('/api/ping')
+
+        assert insert_logs.call_args[0][0][0]['endpoint'] == '/api/ping'
+
+    def test_health_check_is_skipped(self, logged_app):
+        """Health checks are not logged."""
+        app, middleware = logged_app
+        middleware._buffered = True
+        middleware._writer = MagicMock()
+
+        app.test_client().get('/api/health')
+
+        middleware._writer.submit.assert_not_called()
+
+    def test_testing_config_disables_buffer(self):
+        """TESTING apps log synchronously."""
+        app = Flask(__name__)
+        app.config['TESTING'] = True
+        middleware = RequestLoggerMiddleware(app)
+
+        assert middleware._buffered is False
@@ -0,0 +1,150 @@
+"""
+Unit tests for Server-Timing instrumentation.
+
+Run with: pytest tests/test_server_timing.py -v
+"""
+
+import json
+import logging
+import threading
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, text
+
+from app.middleware import server_timing as middleware_module
+from app.middleware.server_timing import ServerTimingMiddleware
+from app.utils.server_timing import RequestTimings, attach, current, record, track
+
+
+@pytest.fixture
+def timed_app():
+    app = Flask(__name__)
+    middleware = ServerTimingMiddleware(app)
+    engine = create_engine('sqlite://')
+
+    @app.route('/api/items/<int:item_id>')
+    def item(item_id):
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+            conn.execute(text('SELECT 2'))
+        with track('cache'):
+            pass
+        return {'id': item_id}
+
+    return app, middleware
+
+
+class TestRequestTimings:
+    """Tests for the per-request accumulator."""
+
+    def test_header_format(self):
+        """Components are listed with duration and call count, then total."""
+        timings = RequestTimings()
+        timings.add('db', 0.010)
+        timings.add('db', 0.005)
+
+        assert timings.header(0.020) == 'db;dur=15.0;desc="2 calls", total;dur=20.0'
+
+    def test_queries_only_kept_when_sampled(self):
+        """Statement capture is limited to sampled requests and max_queries."""
+        unsampled = RequestTimings(sampled=False)
+        unsampled.add_query('SELECT 1', 0.001)
+        sampled = RequestTimings(sampled=True, max_queries=1)
+        sampled.add_query('SELECT\n   1', 0.001)
+        sampled.add_query('SELECT 2', 0.001)
+
+        assert unsampled.queries == []
+        assert sampled.queries == [{'sql': 'SELECT 1', 'ms': 1.0}]
+
+    def test_record_outside_request_is_noop(self):
+        """Background code can call record()/track() safely."""
+        record('db', 1.0)
+        with track('ai'):
+            pass
+
+
+class TestServerTimingMiddleware:
+    """Tests for the Flask hooks."""
+
+    def test_header_includes_db_and_cache(self, timed_app):
+        """SQL and tracked blocks show up in the Server-Timing header."""
+        app, _ = timed_app
+
+        response = app.test_client().get('/api/items/5')
+
+        header = response.headers['Server-Timing']
+        assert 'db;dur=' in header
+        assert 'desc="2 calls"' in header
+        assert 'cache;dur=' in header
+        assert 'total;dur=' in header
+
+    def test_stats_grouped_by_route_template(self, timed_app):
+        """Different IDs aggregate under one route."""
+        app, middleware = timed_app
+        client = app.test_client()
+        client.get('/api/items/1')
+        client.get('/api/items/2')
+
+        routes = middleware.stats()['routes']
+        assert len(routes) == 1
+        assert routes[0]['route'] == '/api/items/<int:item_id>'
+        assert routes[0]['count'] == 2
+        assert routes[0]['components']['db']['count'] == 2
+        assert 'app' in routes[0]['components']
+
+    def test_sampled_request_logs_queries(self, timed_app, caplog):
+        """Sampled requests are written to the slow-request log with their statements."""
+        app, _ = timed_app
+
+        with patch.dict(middleware_module.SERVER_TIMING, {'sample_rate': 1.0}), \
+                caplog.at_level(logging.INFO, logger='slow_requests'):
+            app.test_client().get('/api/items/3')
+
+        entry = json.loads(caplog.records[-1].getMessage())
+        assert entry['route'] == '/api/items/<int:item_id>'
+        assert [q['sql'] for q in entry['queries']] == ['SELECT 1', 'SELECT 2']
+
+    def test_worker_thread_sql_attributed_to_request(self):
+        """SQL run in a worker thread that attaches to the request's timings is counted."""
+        app = Flask(__name__)
+        ServerTimingMiddleware(app)
+        engine = create_engine('sqlite://')
+
+        def step(timings):
+            with app.app_context():
+                attach(timings)
+                with engine.connect() as conn:
+                    conn.execute(text('SELECT 1'))
+
+        @app.route('/plan')
+        def plan():
+            worker = threading.Thread(target=step, args=(current(),))
+            worker.start()
+            worker.join()
+            return 'ok'
+
+        header = app.test_client().get('/plan').headers['Server-Timing']
+        assert 'db;dur=' in header
+        assert 'desc="1 calls"' in header
+
+    def test_failed_statement_clears_start(self, timed_app):
+        """A statement that errors doesn't leave its start time on the connection."""
+        engine = create_engine('sqlite://')
+        with engine.connect() as conn:
+            with pytest.raises(Exception):
+                conn.execute(text('SELECT * FROM missing_table'))
+            assert conn.info.get('server_timing_start') == []
+
+    def test_disabled_by_env(self):
+        """SERVER_TIMING_ENABLED=false skips the hooks entirely."""
+        app = Flask(__name__)
+        with patch.dict('os.environ', {'SERVER_TIMING_ENABLED': 'false'}):
+            ServerTimingMiddleware(app)
+
+        @app.route('/ping')
+        def ping():
+            return 'pong'
+
+        assert 'Server-Timing' not in app.test_client().get('/ping').headers
@@ -0,0 +1,59 @@
+"""
+Unit tests for ToxicDetectionService engagement aggregate.
+
+Run with: pytest tests/test_toxic_detection_service.py -v
+"""
+
+from unittest.mock import patch, MagicMock
+
+from sqlalchemy.dialects import postgresql
+
+from app.services import toxic_detection_service as toxic_module
+from app.services.toxic_detection_service import ToxicDetectionService
+
+
+def _compile(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+class TestRecordStepProgress:
+    """Tests for incremental user_creator_engagement updates."""
+
+    def _record(self, creator_counts, viewed, completed):
+        session = MagicMock()
+        session.query.return_value.filter.return_value.group_by.return_value.all.return_value = creator_counts
+
+        with patch.object(toxic_module.db, 'session', session):
+            ToxicDetectionService().record_step_progress(1, 7, viewed, completed)
+        return session
+
+    def test_upserts_increment_per_creator(self):
+        """One INSERT ... ON CONFLICT for all creators in the step."""
+        session = self._record([('@a', 2), ('@b', 1)], viewed=True, completed=True)
+
+        stmt = session.execute.call_args[0][0]
+        sql = _compile(stmt)
+        assert 'ON CONFLICT ON CONSTRAINT uq_user_creator_engagement_user_creator' in sql
+        assert 'view_count = (user_creator_engagement.view_count + excluded.view_count)' in sql
+
+        params = stmt.compile(dialect=postgresql.dialect()).params
+        assert params['view_count_m0'] == 2
+        assert params['completion_count_m1'] == 1
+
+    def test_completion_only_does_not_count_view(self):
+        """Completing an existing progress row adds completions, not views."""
+        session = self._record([('@a', 3)], viewed=False, completed=True)
+
+        params = session.execute.call_args[0][0].compile(dialect=postgresql.dialect()).params
+        assert params['view_count_m0'] == 0
+        assert params['completion_count_m0'] == 3
+
+    def test_noop_without_changes(self):
+        """Re-completing an already completed step writes nothing."""
+        session = self._record([('@a', 1)], viewed=False, completed=False)
+        session.execute.assert_not_called()
+
+    def test_noop_without_creators(self):
+        """Steps without creator items write nothing."""
+        session = self._record([], viewed=True, completed=True)
+        session.execute.assert_not_called()